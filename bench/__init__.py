@@ -0,0 +1 @@
+# 오프라인 벤치마크 / 부하 테스트 (python -m bench.run --help)
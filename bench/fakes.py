@@ -0,0 +1,228 @@
+# ---------------------------------------------------------
+# 오프라인 대역: Google Maps / Gemini / 공개 API(환율, 날씨, 구/LOR 경계 GeoJSON)
+# 지연(latency_s)과 실패율(failure_rate)을 설정할 수 있다.
+# ---------------------------------------------------------
+import json
+import os
+import random
+import sys
+import threading
+import time
+import zlib
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import BaseAdapter
+
+from guide.chat_engine import FakeBackend
+
+BERLIN_BBOX = (52.34, 13.09, 52.68, 13.76)   # south, west, north, east
+DISTRICTS = ['Mitte', 'Friedrichshain-Kreuzberg', 'Pankow', 'Charlottenburg-Wilmersdorf', 'Spandau',
+             'Steglitz-Zehlendorf', 'Tempelhof-Schöneberg', 'Neukölln', 'Treptow-Köpenick',
+             'Marzahn-Hellersdorf', 'Lichtenberg', 'Reinickendorf']
+
+
+class FakeConfig:
+    """대역 공통 설정. jitter는 latency_s에 곱하는 무작위 폭(0.5 -> 0.5~1.5배)."""
+
+    def __init__(self, latency_s=0.05, failure_rate=0.0, jitter=0.5, seed=0):
+        self.latency_s = latency_s
+        self.failure_rate = failure_rate
+        self.jitter = jitter
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+
+    def wait(self):
+        """지연을 흉내 내고, 실패시킬 차례면 True."""
+        with self._lock:
+            self.calls += 1
+            factor = 1 + self._rng.uniform(-self.jitter, self.jitter)
+            fail = self._rng.random() < self.failure_rate
+            if fail:
+                self.failures += 1
+        time.sleep(max(0.0, self.latency_s * factor))
+        return fail
+
+
+def _stable_rng(*parts):
+    # 같은 요청에는 같은 결과 (캐시 적중률 측정이 실행마다 흔들리지 않도록)
+    return random.Random(zlib.crc32(repr(parts).encode()))
+
+
+# --- Google Maps -------------------------------------------------------------
+class FakeGoogleMaps:
+    """googlemaps.Client 대역. places_nearby / geocode / distance_matrix만 흉내 낸다."""
+
+    PAGE_SIZE = 20
+    MAX_PAGES = 3
+    TOKEN_TTL_S = 300        # 실제 next_page_token처럼 몇 분 뒤에는 INVALID_REQUEST
+
+    def __init__(self, config=None, key=None, **kwargs):
+        self.config = config or FakeConfig()
+
+    def _maybe_fail(self):
+        if self.config.wait():
+            from googlemaps.exceptions import TransportError
+            raise TransportError("fake transport failure")
+
+    def places_nearby(self, location=None, radius=None, type=None, page_token=None, **kwargs):
+        self._maybe_fail()
+        if page_token:
+            lat, lng, type, radius, page, issued_at = json.loads(page_token)
+            if time.time() - issued_at > self.TOKEN_TTL_S:
+                from googlemaps.exceptions import ApiError
+                raise ApiError("INVALID_REQUEST")
+        else:
+            (lat, lng), page = location, 0
+        rng = _stable_rng(round(lat, 5), round(lng, 5), type, radius, page)
+        spread = (radius or 2000) / 111_000
+        results = [{
+            "name": f"{type} {page}-{i}",
+            "rating": round(rng.uniform(3.0, 5.0), 1),
+            "vicinity": f"Fakestraße {rng.randint(1, 200)}",
+            "geometry": {"location": {"lat": lat + rng.uniform(-spread, spread), "lng": lng + rng.uniform(-spread, spread)}},
+        } for i in range(self.PAGE_SIZE)]
+        resp = {"status": "OK", "results": results}
+        if page + 1 < self.MAX_PAGES:
+            resp["next_page_token"] = json.dumps([lat, lng, type, radius, page + 1, time.time()])
+        return resp
+
+    def geocode(self, address, **kwargs):
+        self._maybe_fail()
+        if "nowhere" in address.lower():
+            return []
+        rng = _stable_rng(address.lower())
+        s, w, n, e = BERLIN_BBOX
+        return [{"geometry": {"location": {"lat": rng.uniform(s, n), "lng": rng.uniform(w, e)}},
+                 "formatted_address": f"{address} (fake)"}]
+
+    def distance_matrix(self, origins, destinations, mode="walking", **kwargs):
+        self._maybe_fail()
+        from guide.geo_utils import haversine_m
+        rows = []
+        for o in origins:
+            elements = []
+            for d in destinations:
+                m = int(haversine_m(o[0], o[1], d[0], d[1]) * 1.3)   # 도보 경로는 직선보다 길다
+                elements.append({"status": "OK", "distance": {"value": m}, "duration": {"value": int(m / 1.3)}})
+            rows.append({"elements": elements})
+        return {"status": "OK", "rows": rows}
+
+
+# --- Gemini --------------------------------------------------------------------
+class FlakyChatBackend(FakeBackend):
+    """FakeBackend + 실패율. 실패하면 첫 토큰 전에 예외를 던진다."""
+
+    def __init__(self, config=None, token_interval_s=0.01):
+        self.config = config or FakeConfig(latency_s=0.3)
+        super().__init__(first_token_s=0.0, token_interval_s=token_interval_s)
+
+    def stream(self, history, prompt):
+        if self.config.wait():
+            raise RuntimeError("fake gemini failure")
+        yield from super().stream(history, prompt)
+
+
+# --- 공개 HTTP API -------------------------------------------------------------
+def fake_bezirke_geojson():
+    """12개 구를 4x3 격자 사각형으로 나눈 가짜 구 경계 (이름은 CSV와 같다)."""
+    s, w, n, e = BERLIN_BBOX
+    dlat, dlng = (n - s) / 3, (e - w) / 4
+    features = []
+    for i, name in enumerate(DISTRICTS):
+        r, c = divmod(i, 4)
+        y0, x0 = s + r * dlat, w + c * dlng
+        ring = [[x0, y0], [x0 + dlng, y0], [x0 + dlng, y0 + dlat], [x0, y0 + dlat], [x0, y0]]
+        features.append({"type": "Feature", "properties": {"name": name},
+                         "geometry": {"type": "Polygon", "coordinates": [ring]}})
+    return {"type": "FeatureCollection", "features": features}
+
+
+FAKE_LOR_URL = "https://lor.fake.local/berlin_lor.geojson"
+
+
+def fake_lor_geojson(csv_file="Berlin_crimes.csv"):
+    """가짜 구 사각형을 그 구의 LOR 수만큼 세로 띠로 나눈 LOR 경계 (코드/이름은 범죄 CSV와 같다).
+
+    작업 폴더의 CSV(세션 벤치는 합성 CSV를 그 이름으로 연결해 둔다)를 읽고, 없으면 원본을 쓴다.
+    """
+    import pandas as pd
+    from bench.synth import SOURCE_CSV
+
+    path = csv_file if os.path.exists(csv_file) else SOURCE_CSV
+    lors = pd.read_csv(path, usecols=['District', 'Code', 'Location']).drop_duplicates('Code').sort_values('Code')
+    features = []
+    for district in fake_bezirke_geojson()['features']:
+        (x0, y0), _, (x1, y1) = district['geometry']['coordinates'][0][:3]
+        rows = lors[lors['District'] == district['properties']['name']]
+        width = (x1 - x0) / max(len(rows), 1)
+        for i, (code, name) in enumerate(zip(rows['Code'], rows['Location'])):
+            a, b = x0 + i * width, x0 + (i + 1) * width
+            ring = [[a, y0], [b, y0], [b, y1], [a, y1], [a, y0]]
+            features.append({"type": "Feature", "properties": {"BZR_ID": f"{int(code):06d}", "BZR_NAME": name},
+                             "geometry": {"type": "Polygon", "coordinates": [ring]}})
+    return {"type": "FeatureCollection", "features": features}
+
+
+def _route(url):
+    host, path = urlparse(url).netloc, urlparse(url).path
+    if host == "api.exchangerate-api.com":
+        return {"base": "EUR", "rates": {"KRW": 1450.0 + random.uniform(-20, 20), "USD": 1.08}}
+    if host == "api.open-meteo.com":
+        return {"current_weather": {"temperature": round(random.uniform(-5, 30), 1), "weathercode": 1}}
+    if host == "raw.githubusercontent.com" and path.endswith("berlin_bezirke.geojson"):
+        return fake_bezirke_geojson()
+    if url == FAKE_LOR_URL:
+        return fake_lor_geojson()
+    return None
+
+
+class FakeHTTPAdapter(BaseAdapter):
+    """requests 어댑터 대역. 알려진 호스트만 응답하고, 실패 차례에는 503을 돌려준다."""
+
+    def __init__(self, config=None):
+        super().__init__()
+        self.config = config or FakeConfig()
+
+    def send(self, request, **kwargs):
+        resp = requests.Response()
+        resp.url = request.url
+        resp.request = request
+        body = None if self.config.wait() else _route(request.url)
+        if body is None:
+            resp.status_code = 503 if self.config.failure_rate else 404
+            resp._content = b""
+        else:
+            resp.status_code = 200
+            resp._content = json.dumps(body).encode()
+            resp.headers["Content-Type"] = "application/json"
+        return resp
+
+    def close(self):
+        pass
+
+
+# --- 설치 ----------------------------------------------------------------------
+def install(maps=None, chat=None, http=None):
+    """프로세스 전역으로 대역을 끼운다. 앱 스크립트보다 먼저 불러야 한다."""
+    import googlemaps
+    import guide.chat_engine
+    import guide.http_client
+
+    maps = maps or FakeConfig()
+    chat = chat or FakeConfig(latency_s=0.3)
+    http = http or FakeConfig()
+    googlemaps.Client = lambda key=None, **kw: FakeGoogleMaps(maps, key)
+    fake_gemini = lambda *a, **kw: FlakyChatBackend(chat)  # noqa: E731
+    guide.chat_engine.GeminiBackend = fake_gemini
+    if "guide.services" in sys.modules:
+        sys.modules["guide.services"].GeminiBackend = fake_gemini
+    session = requests.Session()
+    adapter = FakeHTTPAdapter(http)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    with guide.http_client._session_lock:
+        guide.http_client._session = session
+    return {"maps": maps, "chat": chat, "http": http}
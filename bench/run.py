@@ -0,0 +1,381 @@
+# ---------------------------------------------------------
+# 벤치마크 실행기
+#   python -m bench.run sessions --sessions 8 --rounds 2 --latency 0.05 --failure-rate 0.1
+#   python -m bench.run data --scales 1 10 100 1000
+#   python -m bench.run startup --repeat 3
+#   python -m bench.run geo [--lor-url URL | --fake]
+# 외부 서비스는 모두 bench/fakes.py의 대역으로 바꾸고, 캐시는 임시 폴더를 쓴다.
+# ---------------------------------------------------------
+import argparse
+import importlib
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+def rss_bytes():
+    """현재 프로세스 RSS (Linux는 /proc, 그 외는 최대 RSS로 대신)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _summary(values):
+    arr = np.asarray(values, dtype=float) * 1000
+    return {"count": len(arr), "p50_ms": float(np.percentile(arr, 50)), "p95_ms": float(np.percentile(arr, 95)),
+            "max_ms": float(arr.max())}
+
+
+def _print_table(rows, columns):
+    widths = [max(len(str(c)), *(len(_fmt(r.get(c))) for r in rows)) for c in columns]
+    print("  ".join(str(c).ljust(w) for c, w in zip(columns, widths)))
+    for r in rows:
+        print("  ".join(_fmt(r.get(c)).ljust(w) for c, w in zip(columns, widths)))
+
+
+def _fmt(v):
+    if isinstance(v, float):
+        return f"{v:.1f}"
+    return "" if v is None else str(v)
+
+
+# --- 세션 부하 ------------------------------------------------------------------
+# 세션은 한 프로세스 안의 스레드로 동시에 돌린다: 실제 서버처럼 st.cache_resource, Google 스케줄러,
+# 미리 가져오기 풀, 수다방 저장 스레드와 GIL을 모든 세션이 함께 쓴다.
+def _session_thread(args, k):
+    from bench.sessions import bind_thread_session, new_app, run_session
+
+    bind_thread_session(f"bench-{k}")
+    at = new_app()
+    return [step for r in range(args.rounds) for step in run_session(at, k * args.rounds + r)]
+
+
+def bench_sessions(args):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from bench import fakes
+    from bench.sessions import SCRIPT, concurrent_apps
+    from guide.profiler import PROFILER
+
+    if args.scale > 1:
+        # 앱은 작업 폴더의 Berlin_crimes.csv를 읽으므로, 합성 CSV를 그 이름으로 연결한 폴더에서 돌린다
+        from bench.synth import synth_crime_csv
+        workdir = Path(args.cache_dir) / f"app_x{args.scale}"
+        workdir.mkdir(parents=True, exist_ok=True)
+        link = workdir / "Berlin_crimes.csv"
+        if not link.exists():
+            link.symlink_to(synth_crime_csv(args.scale))
+        os.chdir(workdir)
+    else:
+        os.chdir(Path(__file__).resolve().parent.parent)
+
+    configs = fakes.install(
+        maps=fakes.FakeConfig(args.latency, args.failure_rate, seed=100),
+        chat=fakes.FakeConfig(args.chat_latency, args.failure_rate, seed=200),
+        http=fakes.FakeConfig(args.latency, args.failure_rate, seed=300),
+    )
+    secrets = {
+        "google_maps_api_key": "bench",
+        "gemini_api_key": "bench",
+        "distance_backend": "google",
+        "community_db_path": str(Path(args.cache_dir) / "community.sqlite"),
+        "crime_store_dir": str(Path(args.cache_dir) / f"crime_x{args.scale}"),
+        "lor_geojson_url": fakes.FAKE_LOR_URL,
+        "google_rate_per_s": args.google_rate,
+        "google_daily_budget": args.google_budget,
+        "prefetch_hourly_budget": args.prefetch_budget,
+    }
+    # 라이브러리 import 비용은 세션 메모리에서 빼고 따로 보고한다
+    for name in ("folium", "plotly.express", "streamlit_folium"):
+        importlib.import_module(name)
+    rss_before = rss_bytes()
+
+    t0 = time.perf_counter()
+    with concurrent_apps(secrets), ThreadPoolExecutor(max_workers=args.sessions) as pool:
+        sessions = list(pool.map(_session_thread, [args] * args.sessions, range(args.sessions)))
+    wall = time.perf_counter() - t0
+    rss_after = rss_bytes()
+    snapshot = PROFILER.snapshot()
+
+    by_step = {name: [] for name, _ in SCRIPT}
+    errors = {}
+    cache, fake_calls, google, prefetch = {}, {}, {}, {}
+    for steps in sessions:
+        for name, seconds, error in steps:
+            by_step[name].append(seconds)
+            if error:
+                errors.setdefault(name, []).append(error)
+    for name, c in snapshot["cache"].items():
+        cache[name] = (c["hit"], c["miss"])
+    for name, n in snapshot["counters"].items():
+        for prefix, out in (("google_", google), ("prefetch_", prefetch)):
+            if name.startswith(prefix):
+                out[name[len(prefix):]] = n
+    for name, c in configs.items():
+        fake_calls[name] = {"calls": c.calls, "failures": c.failures}
+    reruns = sum(len(steps) for steps in sessions)
+    rows = [{"step": name, **_summary(v), "errors": len(errors.get(name, []))} for name, v in by_step.items() if v]
+    result = {
+        "config": vars(args),
+        "steps": rows,
+        "wall_s": wall,
+        "reruns": reruns,
+        "reruns_per_s": reruns / wall,
+        "rss_mb_per_session": (rss_after - rss_before) / 2**20 / args.sessions,
+        "rss_mb_process_base": rss_before / 2**20,
+        "cache": {k: {"hit": h, "miss": m, "hit_rate": h / (h + m) if h + m else None} for k, (h, m) in cache.items()},
+        "fake_calls": fake_calls,
+        "google": google,
+        "prefetch": {**prefetch, "hit_rate": prefetch.get("used", 0) / prefetch["fetched"] if prefetch.get("fetched") else None},
+        "errors": {k: sorted(set(v))[:5] for k, v in errors.items()},
+    }
+
+    print(f"\n세션 {args.sessions}개(한 프로세스, 스레드) x {args.rounds}회, 지연 {args.latency * 1000:.0f}ms, "
+          f"실패율 {args.failure_rate:.0%}, 데이터 x{args.scale}")
+    _print_table(rows, ["step", "count", "p50_ms", "p95_ms", "max_ms", "errors"])
+    print(f"\n처리량 {result['reruns_per_s']:.2f} rerun/s ({reruns}회 / {wall:.1f}s), "
+          f"세션당 메모리 {result['rss_mb_per_session']:.1f} MB (라이브러리 로드 후 기본 {result['rss_mb_process_base']:.0f} MB)")
+    for name, c in result["cache"].items():
+        if c["hit_rate"] is not None:
+            print(f"  캐시 {name}: {c['hit_rate']:.0%} ({c['hit']}/{c['hit'] + c['miss']})")
+    for name, c in fake_calls.items():
+        print(f"  대역 {name}: 호출 {c['calls']}회, 실패 {c['failures']}회")
+    if google:
+        print("  Google 스케줄러: " + ", ".join(f"{k} {v}" for k, v in sorted(google.items())))
+    if prefetch:
+        p = result["prefetch"]
+        rate = f", 적중률 {p['hit_rate']:.0%}" if p["hit_rate"] is not None else ""
+        print("  미리 가져오기: " + ", ".join(f"{k} {v}" for k, v in sorted(prefetch.items())) + rate)
+    for name, msgs in result["errors"].items():
+        print(f"  ! {name}: {msgs[0]}")
+    # 대역 실패를 일부러 넣지 않았는데 예외가 났다면 회귀
+    return result, bool(errors) and args.failure_rate == 0
+
+
+# --- 콜드 스타트 ------------------------------------------------------------------
+HEAVY_MODULES = ["google.generativeai", "googlemaps", "plotly.express", "folium", "streamlit_folium", "branca"]
+
+
+def startup_probe(tab, cache_dir):
+    """새 프로세스 안에서: 대역 설치 후 지정한 탭으로 첫 실행 1회. 결과는 JSON 한 줄로 출력."""
+    os.environ["BERLIN_GUIDE_CACHE_DIR"] = cache_dir
+    importlib.import_module("streamlit.testing.v1")   # 기준선에 포함
+
+    from bench import fakes
+    from bench.sessions import TAB_LABELS, new_app
+
+    fakes.install()
+    before = set(sys.modules)
+    rss_before = rss_bytes()
+    at = new_app({"google_maps_api_key": "bench", "gemini_api_key": "bench"})
+    at.session_state["main_tab"] = TAB_LABELS[tab]
+    t0 = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - t0
+    print(json.dumps({
+        "tab": tab,
+        "first_run_ms": elapsed * 1000,
+        "import_rss_mb": (rss_bytes() - rss_before) / 2**20,
+        "modules_loaded": len(set(sys.modules) - before),
+        "heavy": [m for m in HEAVY_MODULES if m in sys.modules and m not in before],
+        "errors": len(at.exception),
+    }))
+
+
+def bench_startup(args):
+    import subprocess
+
+    from bench.sessions import TAB_LABELS
+
+    root = Path(__file__).resolve().parent.parent
+    rows = []
+    for tab in args.tabs or list(TAB_LABELS):
+        samples = []
+        for i in range(args.repeat):
+            # 매번 새 인터프리터 + 새 캐시 폴더 = 진짜 콜드 스타트
+            code = f"from bench.run import startup_probe; startup_probe({tab!r}, {tempfile.mkdtemp(prefix='berlin-cold-')!r})"
+            out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+            samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+        rows.append({
+            "tab": tab,
+            "first_run_ms": statistics.median(s["first_run_ms"] for s in samples),
+            "import_rss_mb": statistics.median(s["import_rss_mb"] for s in samples),
+            "modules_loaded": samples[-1]["modules_loaded"],
+            "heavy": ", ".join(samples[-1]["heavy"]) or "-",
+            "errors": sum(s["errors"] for s in samples),
+        })
+    print()
+    _print_table(rows, ["tab", "first_run_ms", "import_rss_mb", "modules_loaded", "heavy", "errors"])
+    return {"config": vars(args), "rows": rows}, any(r["errors"] for r in rows)
+
+
+# --- LOR 경계 점검 ----------------------------------------------------------------
+def bench_geo(args):
+    """LOR 인덱스가 실제로 만들어지고 범죄 데이터의 LOR 코드를 덮는지 확인한다."""
+    from guide.crime_store import CrimeStore
+    from guide.geo_boundaries import configure_source
+    from guide.lor_index import SafetyScorer, build_lor_index
+
+    url = args.lor_url
+    if args.fake:
+        from bench import fakes
+        fakes.install()
+        url = fakes.FAKE_LOR_URL
+    configure_source("lor", url)
+    store = CrimeStore(Path(args.cache_dir) / "crime_geo")
+    store.sync([Path(__file__).resolve().parent.parent / "Berlin_crimes.csv"])
+    values = {int(k): int(v) for k, v in store.lor_totals(store.latest_year).items()}
+
+    t0 = time.perf_counter()
+    index = build_lor_index()
+    build_ms = (time.perf_counter() - t0) * 1000
+    if index is None:
+        print("\n! LOR 인덱스를 만들지 못했습니다: data/geo/berlin_lor.geojson 또는 --lor-url을 확인하세요.")
+        return {"config": vars(args), "built": False}, True
+    coverage = index.coverage(values)
+    scorer = SafetyScorer(index, values)
+    lat, lng = index.centroids[0]
+    result = {"config": vars(args), "built": True, "lors": len(index), "crime_codes": len(values),
+              "coverage": coverage, "build_ms": build_ms, "sample_score": scorer.score(lat, lng)}
+    print(f"\nLOR {len(index)}개, 범죄 데이터 코드 {len(values)}개 중 {coverage:.0%} 일치, "
+          f"인덱스 {build_ms:.0f} ms, 안전 점수 예시 {result['sample_score']}")
+    failed = coverage < args.min_coverage or result['sample_score'] is None
+    if failed:
+        print(f"  ! 일치율이 {args.min_coverage:.0%} 미만이거나 점수를 계산하지 못했습니다")
+    return result, failed
+
+
+# --- 데이터 경로 ------------------------------------------------------------------
+def _timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times) * 1000
+
+
+def bench_data(args):
+    import pandas as pd
+
+    from bench.synth import synth_crime_csv
+    from guide.crime_store import CrimeStore, load_crime_cube
+
+    rows = []
+    for scale in args.scales:
+        t0 = time.perf_counter()
+        csv_file = synth_crime_csv(scale) if scale > 1 else Path(__file__).resolve().parent.parent / "Berlin_crimes.csv"
+        gen_s = time.perf_counter() - t0
+        cube_dir = Path(args.cache_dir) / f"crime_x{scale}"
+
+        t0 = time.perf_counter()
+        cube = load_crime_cube(csv_file, cube_dir)
+        cold_ms = (time.perf_counter() - t0) * 1000
+        if cube is None:
+            rows.append({"scale": scale, "error": "load_crime_cube 실패"})
+            continue
+        year = cube.latest_year
+        t0 = time.perf_counter()
+        frame = pd.read_csv(csv_file)
+        pandas_read_ms = (time.perf_counter() - t0) * 1000
+        drop_file = Path(args.cache_dir) / f"drop_x{scale}.csv"
+
+        def append_year():
+            # 최신 연도를 한 해 뒤로 복사한 CSV 한 개를 더 반영 (원본 서명은 그대로라 그 연도 파티션만 새로 쓴다) + 큐브 갱신
+            drop = frame[frame['Year'] == frame['Year'].max()].assign(Year=lambda d: d['Year'] + 1)
+            drop.to_csv(drop_file, index=False)
+            store = CrimeStore(cube_dir)
+            t0 = time.perf_counter()
+            store.sync([csv_file, drop_file])
+            store.cube()
+            return time.perf_counter() - t0
+
+        row = {
+            "scale": scale,
+            "rows": cube.n_rows,
+            "csv_mb": os.path.getsize(csv_file) / 2**20,
+            "gen_s": gen_s,
+            "pandas_read_ms": pandas_read_ms,
+            "cold_load_ms": cold_ms,
+            "warm_load_ms": _timed(lambda: load_crime_cube(csv_file, cube_dir), args.repeat),
+            "district_ms": _timed(lambda: cube.district_totals(year), args.repeat),
+            "types_ms": _timed(lambda: cube.type_totals(year), args.repeat),
+            "yearly_ms": _timed(lambda: cube.yearly_totals(), args.repeat),
+            "lor_ms": _timed(lambda: cube.lor_totals(year), args.repeat),
+            "append_ms": append_year() * 1000,
+        }
+        rows.append(row)
+
+    print()
+    _print_table(rows, ["scale", "rows", "csv_mb", "pandas_read_ms", "cold_load_ms", "warm_load_ms",
+                        "district_ms", "types_ms", "yearly_ms", "lor_ms", "append_ms"])
+    failed = False
+    if args.fail_over_ms:
+        # 캐시가 있는 상태의 로드/질의가 기준을 넘으면 실패 (회귀 감지용)
+        for r in rows:
+            slow = [k for k in ("warm_load_ms", "district_ms", "types_ms", "yearly_ms", "lor_ms")
+                    if r.get(k, 0) > args.fail_over_ms]
+            if slow or "error" in r:
+                failed = True
+                print(f"  ! x{r['scale']}: {', '.join(slow) or r.get('error')} > {args.fail_over_ms}ms")
+    return {"config": vars(args), "rows": rows}, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench.run", description="베를린 가이드 오프라인 벤치마크")
+    parser.add_argument("--cache-dir", help="캐시/DB 폴더 (기본: 새 임시 폴더 = 콜드 스타트)")
+    parser.add_argument("--json", help="결과를 JSON으로 저장할 경로")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    s = sub.add_parser("sessions", help="AppTest 시나리오 세션을 동시에 돌린다")
+    s.add_argument("--sessions", type=int, default=4, help="동시 세션 수")
+    s.add_argument("--rounds", type=int, default=2, help="세션마다 시나리오 반복 횟수")
+    s.add_argument("--latency", type=float, default=0.05, help="Google/HTTP 대역 지연[s]")
+    s.add_argument("--chat-latency", type=float, default=0.3, help="Gemini 대역 첫 토큰 지연[s]")
+    s.add_argument("--failure-rate", type=float, default=0.0, help="모든 대역의 실패 확률")
+    s.add_argument("--scale", type=int, default=1, help="범죄 CSV 배수 (1 = 원본)")
+    s.add_argument("--google-rate", type=float, default=10.0, help="Google 호출 토큰 버킷 속도[회/s]")
+    s.add_argument("--google-budget", type=int, default=5000, help="Google 일일 호출 예산 (세션 전체 공유)")
+    s.add_argument("--prefetch-budget", type=int, default=300, help="프로세스당 시간당 미리 가져오기 호출 수 (0 = 끔)")
+
+    d = sub.add_parser("data", help="합성 범죄 CSV로 데이터 경로만 측정한다")
+    d.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100, 1000])
+    d.add_argument("--repeat", type=int, default=5)
+    d.add_argument("--fail-over-ms", type=float, help="캐시 로드/질의 중앙값이 이 값을 넘으면 종료 코드 1")
+
+    c = sub.add_parser("startup", help="탭별 콜드 스타트 시간과 import 메모리 (새 프로세스에서)")
+    c.add_argument("--tabs", nargs="+", help="explore / courses / community / stats (기본: 전부)")
+    c.add_argument("--repeat", type=int, default=3)
+
+    g = sub.add_parser("geo", help="LOR 경계로 인덱스가 만들어지고 범죄 데이터 코드를 덮는지 확인")
+    g.add_argument("--lor-url", help="data/geo/에 파일이 없을 때 받을 LOR GeoJSON URL")
+    g.add_argument("--fake", action="store_true", help="대역 LOR 경계로 점검 (경로 자체의 회귀 확인용)")
+    g.add_argument("--min-coverage", type=float, default=0.9)
+
+    args = parser.parse_args(argv)
+    args.cache_dir = args.cache_dir or tempfile.mkdtemp(prefix="berlin-bench-")
+    # guide 모듈을 불러오기 전에 캐시 위치를 바꿔야 실제 .cache/를 건드리지 않는다
+    os.environ["BERLIN_GUIDE_CACHE_DIR"] = args.cache_dir
+
+    commands = {"sessions": bench_sessions, "data": bench_data, "startup": bench_startup, "geo": bench_geo}
+    result, failed = commands[args.cmd](args)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2, default=str)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+# ---------------------------------------------------------
+# AppTest로 앱을 화면 없이 돌리는 시나리오 세션 (검색 -> 필터 -> 테마 -> 채팅 -> TAB 4 필터)
+# ---------------------------------------------------------
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from views import TABS
+
+APP_PATH = Path(__file__).resolve().parent.parent / "streamlit_app.py"
+TAB_LABELS = {module: label for label, module in TABS}
+
+SEARCHES = ["Potsdamer Platz", "Alexanderplatz", "Checkpoint Charlie", "Mauerpark", "Nowhere Strasse"]
+PROMPTS = ["베를린에서 꼭 가봐야 할 곳 추천해줘", "크로이츠베르크 맛집 알려줘", "박물관 섬 입장료 얼마야?"]
+
+
+def _by_label(elements, text):
+    return next(e for e in elements if text in e.label)
+
+
+def _open_tab(at, module):
+    # 선택된 탭만 실행되므로 조작할 위젯이 있는 탭을 연다.
+    # AppTest는 탭 선택을 기억하지 못하므로(브라우저와 달리) 매 단계마다 다시 지정한다.
+    at.session_state["main_tab"] = TAB_LABELS[module]
+
+
+def _with_tab(module, action=None):
+    def step(at, i):
+        _open_tab(at, module)
+        if action is not None:
+            action(at, i)
+    return step
+
+
+def _search(at, i):
+    at.sidebar.text_input[0].set_value(SEARCHES[i % len(SEARCHES)])
+
+
+def _filters(at, i):
+    for text in ("숙박시설", "관광지", "동네(LOR)"):
+        t = _by_label(at.sidebar.toggle, text)
+        t.set_value(not t.value)
+
+
+def _theme(at, i):
+    radio = at.radio[0]
+    options = list(radio.options)
+    radio.set_value(options[(i + 1) % len(options)])
+
+
+def _optimize(at, i):
+    t = _by_label(at.toggle, "최적 동선")
+    t.set_value(not t.value)
+
+
+def _chat(at, i):
+    at.chat_input[0].set_value(PROMPTS[i % len(PROMPTS)])
+
+
+def _tab4(at, i):
+    year = _by_label(at.selectbox, "분석 연도")
+    options = list(year.options)
+    year.set_value(options[(i + 1) % len(options)])
+    districts = _by_label(at.multiselect, "구(District)")
+    opts = list(districts.options)
+    districts.set_value(opts[: max(1, len(opts) - 1 - i % 4)])
+
+
+# (단계 이름, 위젯 조작). 각 단계 뒤에 rerun 한 번
+SCRIPT = [
+    ("first_run", None),
+    ("rerun", _with_tab("explore")),
+    ("search", _with_tab("explore", _search)),
+    ("filters", _with_tab("explore", _filters)),
+    ("open_courses", _with_tab("courses")),
+    ("theme", _with_tab("courses", _theme)),
+    ("optimize", _with_tab("courses", _optimize)),
+    ("open_community", _with_tab("community")),
+    ("chat", _with_tab("community", _chat)),
+    ("open_stats", _with_tab("stats")),
+    ("tab4", _with_tab("stats", _tab4)),
+]
+
+
+def new_app(secrets=None, timeout=120):
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+    for k, v in (secrets or {}).items():
+        at.secrets[k] = v
+    return at
+
+
+# --- 한 프로세스 안의 동시 세션 ----------------------------------------------------
+_thread = threading.local()
+
+
+def bind_thread_session(session_id):
+    """이 스레드가 돌리는 AppTest 실행의 세션 id (AppTest는 모두 "test session id"를 쓴다)."""
+    _thread.session_id = session_id
+
+
+@contextmanager
+def concurrent_apps(secrets):
+    """AppTest 여러 개를 스레드에서 동시에 돌릴 수 있게 한다. 이 안에서는 new_app()에 secrets를 넘기지 않는다.
+
+    AppTest.run은 실행마다 Runtime 인스턴스, st.secrets, global.appTest 설정을 바꿔 끼우고 끝나면
+    되돌린다. 그대로 동시에 돌리면 한 세션이 끝날 때 다른 세션의 실행 도중에 Runtime이 사라진다.
+    그래서 secrets와 설정은 여기서 한 번 고정하고, Runtime을 None으로 되돌리는 것만 무시한다.
+    """
+    import streamlit as st
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.secrets import Secrets
+    from streamlit.testing.v1 import app_test
+    from streamlit.testing.v1.util import patch_config_options
+
+    class _KeepInstance(type):
+        def __setattr__(cls, name, value):
+            if name == "_instance":
+                if value is not None:
+                    Runtime._instance = value
+                return
+            super().__setattr__(name, value)
+
+    class _ThreadSessionRunner(app_test.LocalScriptRunner):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self._session_id = getattr(_thread, "session_id", self._session_id)
+
+    saved = st.secrets, app_test.Runtime, app_test.LocalScriptRunner
+    shared = Secrets()
+    shared._secrets = dict(secrets)
+    st.secrets = shared
+    app_test.Runtime = _KeepInstance("Runtime", (Runtime,), {})
+    app_test.LocalScriptRunner = _ThreadSessionRunner
+    try:
+        with patch_config_options({"global.appTest": True}):
+            yield
+    finally:
+        st.secrets, app_test.Runtime, app_test.LocalScriptRunner = saved
+        Runtime._instance = None
+
+
+def run_session(at, session_no=0, script=SCRIPT):
+    """시나리오 한 번. [(단계, 초, 예외 메시지 or None)]"""
+    out = []
+    for name, action in script:
+        error = None
+        t0 = time.perf_counter()
+        try:
+            if action is not None:
+                action(at, session_no)
+            at.run()
+            if at.exception:
+                error = at.exception[0].message
+        except Exception as exc:   # 위젯을 못 찾는 등 시나리오 자체의 실패
+            error = f"{type(exc).__name__}: {exc}"
+        out.append((name, time.perf_counter() - t0, error))
+    return out
@@ -0,0 +1,47 @@
+# ---------------------------------------------------------
+# 합성 범죄 CSV: Berlin_crimes.csv를 N배로 키운다 (연도를 과거로 늘리고, 남는 배수는 가상 LOR로)
+# ---------------------------------------------------------
+import csv
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from guide.crime_store import CRIME_TYPES
+
+ROOT = Path(__file__).resolve().parent.parent
+SOURCE_CSV = ROOT / "Berlin_crimes.csv"
+SYNTH_DIR = ROOT / ".cache" / "bench"   # 실행마다 새로 만들지 않도록 고정 위치에 둔다
+MAX_EXTRA_YEARS = 10
+COUNT_COLUMNS = CRIME_TYPES + ['Local']
+
+
+def synth_crime_csv(scale, out_dir=SYNTH_DIR, source=SOURCE_CSV, seed=0):
+    """scale배 행을 가진 CSV 경로. 이미 만들어 둔 파일이 있으면 그대로 쓴다."""
+    out_dir = Path(out_dir)
+    out = out_dir / f"Berlin_crimes_x{scale}.csv"
+    if out.exists():
+        return out
+    out_dir.mkdir(parents=True, exist_ok=True)
+    base = pd.read_csv(source)
+    years = base['Year'].nunique()
+    rng = np.random.default_rng(seed)
+
+    # 복제 j번째: 연도를 (j % year_copies) * years 만큼 과거로, 나머지 배수는 LOR 코드/이름을 새로 만든다
+    year_copies = min(scale, MAX_EXTRA_YEARS)
+    n = len(base)
+    reps = np.arange(scale)
+    frame = base.loc[np.tile(np.arange(n), scale)].reset_index(drop=True)
+    rep = np.repeat(reps, n)
+    year_shift = (rep % year_copies) * years
+    lor_copy = rep // year_copies
+    frame['Year'] = frame['Year'].to_numpy() - year_shift
+    frame['Code'] = frame['Code'].to_numpy() + lor_copy * 100000
+    frame['Location'] = np.where(lor_copy > 0, frame['Location'] + " #" + lor_copy.astype(str), frame['Location'])
+    noise = rng.lognormal(0.0, 0.15, size=(len(frame), len(COUNT_COLUMNS)))
+    frame[COUNT_COLUMNS] = np.rint(frame[COUNT_COLUMNS].to_numpy() * noise).astype(np.int64)
+
+    tmp = out.with_suffix(".tmp")
+    frame.to_csv(tmp, index=False, quoting=csv.QUOTE_NONNUMERIC)
+    tmp.replace(out)
+    return out
@@ -0,0 +1 @@
+# 베를린 가이드 앱의 데이터/서비스 계층 모듈 모음
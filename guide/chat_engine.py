@@ -0,0 +1,175 @@
+# ---------------------------------------------------------
+# Gemini 채팅 엔진: 스트리밍 + 토큰 예산 내 대화 문맥 + 응답 캐시 + 교체 가능한 백엔드
+# ---------------------------------------------------------
+import re
+import threading
+import time
+from collections import OrderedDict
+from difflib import SequenceMatcher
+
+from guide.profiler import PROFILER
+
+DEFAULT_MODEL = 'gemini-pro'
+HISTORY_TOKEN_BUDGET = 2000
+CACHE_MAX_ENTRIES = 500
+CACHE_TTL_S = 7 * 24 * 3600
+SIMILARITY_CUTOFF = 0.85   # 유사 질문 후보 (bigram Jaccard) - 실제 일치는 아래 편집 거리로 판정
+MAX_EDIT_CHARS = 2         # 오타 수준: 정규화한 질문끼리 이만큼 이하의 글자만 다를 때
+BLOCKED_MESSAGE = "\n\n(안전 필터로 답변 일부를 표시할 수 없습니다. 질문을 바꿔 다시 물어봐 주세요.)"
+MIN_CACHEABLE_CHARS = 8   # "더 알려줘" 같은 짧은 후속 질문은 문맥 의존이라 캐시하지 않는다
+
+
+def estimate_tokens(text):
+    # 한글은 글자당 토큰이 많으므로 대략 3글자 = 1토큰으로 본다
+    return max(1, len(text) // 3)
+
+
+def trim_history(messages, budget=HISTORY_TOKEN_BUDGET):
+    """최근 메시지부터 토큰 예산 안에 들어가는 만큼만 남긴다."""
+    kept, used = [], 0
+    for msg in reversed(messages):
+        cost = estimate_tokens(msg['content'])
+        if used + cost > budget:
+            break
+        kept.append(msg)
+        used += cost
+    return kept[::-1]
+
+
+# --- 백엔드 ------------------------------------------------------------------
+class GeminiBackend:
+    """google.generativeai 모델 하나를 재사용하고 stream=True로 토큰을 흘려보낸다."""
+
+    def __init__(self, model_name=DEFAULT_MODEL, api_key=None):
+        # SDK는 무거우므로 처음 만들 때 불러온다
+        import google.generativeai as genai
+        if api_key:
+            genai.configure(api_key=api_key)
+        self.model = genai.GenerativeModel(model_name)
+
+    def stream(self, history, prompt):
+        contents = [{"role": "model" if m['role'] == "assistant" else "user", "parts": [m['content']]}
+                    for m in history]
+        contents.append({"role": "user", "parts": [prompt]})
+        for chunk in self.model.generate_content(contents, stream=True):
+            try:
+                text = chunk.text
+            except ValueError:
+                # 안전 필터에 막힌 조각은 .text가 ValueError를 던진다: 안내만 보내고 끝낸다
+                yield BLOCKED_MESSAGE
+                return
+            if text:
+                yield text
+
+
+class FakeBackend:
+    """오프라인 부하 테스트용 가짜 모델: 첫 토큰 지연과 토큰 간 지연을 흉내 낸다."""
+
+    def __init__(self, first_token_s=0.3, token_interval_s=0.02, reply=None):
+        self.first_token_s = first_token_s
+        self.token_interval_s = token_interval_s
+        self.reply = reply or "베를린에 대한 질문 감사합니다. '{prompt}'에 대해 알려드릴게요."
+        self.calls = 0
+
+    def stream(self, history, prompt):
+        self.calls += 1
+        time.sleep(self.first_token_s)
+        for i, word in enumerate(self.reply.format(prompt=prompt).split(" ")):
+            if i:
+                time.sleep(self.token_interval_s)
+            yield word + " "
+
+
+# --- 응답 캐시 ---------------------------------------------------------------
+def _normalize(prompt):
+    # 구두점/공백 차이는 무시한다 ("추천해줘" == "추천해 줘!")
+    return re.sub(r"[\W_]", "", prompt.lower())
+
+
+def _bigrams(text):
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def _typo_close(a, b, max_chars=MAX_EDIT_CHARS):
+    """오타 수준으로만 다른지. 숫자가 다르거나 단어(구 이름 등)가 바뀌면 다른 질문이다."""
+    if abs(len(a) - len(b)) > max_chars or re.findall(r"\d+", a) != re.findall(r"\d+", b):
+        return False
+    changed = sum(max(i2 - i1, j2 - j1) for tag, i1, i2, j1, j2 in SequenceMatcher(None, a, b).get_opcodes()
+                  if tag != "equal")
+    return changed <= max_chars
+
+
+class ResponseCache:
+    """정확 일치(정규화 후) -> 오타 수준 유사 질문 순서로 찾는 LRU 캐시.
+
+    대화 문맥은 키에 없으므로 ChatEngine은 문맥 없는 첫 질문만 넣고 읽는다.
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, ttl_s=CACHE_TTL_S, cutoff=SIMILARITY_CUTOFF):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.cutoff = cutoff
+        self._items = OrderedDict()   # key -> (bigrams, answer, stored_at)
+        self._lock = threading.Lock()
+
+    def get(self, prompt):
+        key = _normalize(prompt)
+        now = time.time()
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                grams = _bigrams(key)
+                best, best_score = None, self.cutoff
+                for k, (g, _, _) in self._items.items():
+                    score = len(grams & g) / max(1, len(grams | g))
+                    if score >= best_score and _typo_close(key, k):
+                        best, best_score = k, score
+                if best is None:
+                    return None
+                key, item = best, self._items[best]
+            if now - item[2] > self.ttl_s:
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return item[1]
+
+    def put(self, prompt, answer):
+        key = _normalize(prompt)
+        with self._lock:
+            self._items[key] = (_bigrams(key), answer, time.time())
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+
+# --- 엔진 --------------------------------------------------------------------
+class ChatEngine:
+    """백엔드/캐시는 프로세스 공용, 대화 기록은 호출자가(세션별로) 넘긴다."""
+
+    def __init__(self, backend, cache=None, history_budget=HISTORY_TOKEN_BUDGET):
+        self.backend = backend
+        self.cache = cache if cache is not None else ResponseCache()
+        self.history_budget = history_budget
+
+    def respond(self, history, prompt):
+        """응답 텍스트 조각을 yield한다 (st.write_stream에 그대로 넘길 수 있음)."""
+        context = trim_history(history, self.history_budget)
+        # 캐시는 모든 세션이 공유하고 질문만으로 찾으므로, 앞선 대화가 없는 질문만 쓴다
+        cacheable = not context and len(prompt.strip()) >= MIN_CACHEABLE_CHARS
+        if cacheable:
+            cached = self.cache.get(prompt)
+            PROFILER.count_cache("chat_response", cached is not None)
+            if cached is not None:
+                yield cached
+                return
+        parts = []
+        start = time.perf_counter()
+        with PROFILER.call("gemini") as info:
+            for piece in self.backend.stream(context, prompt):
+                if not parts:
+                    PROFILER.record_call("gemini_first_token", time.perf_counter() - start)
+                parts.append(piece)
+                info["bytes"] += len(piece.encode())
+                yield piece
+        if cacheable and parts and parts[-1] != BLOCKED_MESSAGE:
+            self.cache.put(prompt, "".join(parts))
@@ -0,0 +1,180 @@
+# ---------------------------------------------------------
+# 수다방 저장소: 리뷰 / 추천 / 댓글 (SQLite WAL, 고정 ID, 그룹 커밋)
+# ---------------------------------------------------------
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+DB_PATH = Path(__file__).resolve().parent.parent / "data" / "community.sqlite"
+BATCH_WINDOW_S = 0.02   # 이 시간 동안 들어온 쓰기를 한 트랜잭션으로 묶는다
+MAX_BATCH = 200
+WRITE_TIMEOUT_S = 15    # 쓰기 스레드가 이 시간 안에 시작하지 않으면 취소하고 호출부에 TimeoutError
+
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS reviews ("
+    " id INTEGER PRIMARY KEY AUTOINCREMENT, place TEXT NOT NULL, body TEXT NOT NULL, created_at REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS idx_reviews_place ON reviews(place, id)",
+    "CREATE TABLE IF NOT EXISTS recommendations ("
+    " id INTEGER PRIMARY KEY AUTOINCREMENT, place TEXT NOT NULL, reason TEXT NOT NULL, created_at REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS replies ("
+    " id INTEGER PRIMARY KEY AUTOINCREMENT, rec_id INTEGER NOT NULL, body TEXT NOT NULL, created_at REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS idx_replies_rec ON replies(rec_id, id)",
+]
+
+
+class _Write:
+    def __init__(self, statements):
+        self.statements = statements  # [(sql, params), ...] - 같은 트랜잭션에서 실행
+        self.done = threading.Event()
+        self.lastrowid = None
+        self.error = None
+        self.lock = threading.Lock()
+        self.started = False      # 쓰기 스레드가 실행을 시작함 (이후에는 취소할 수 없다)
+        self.cancelled = False    # 호출부가 기다리다 포기함 (쓰기 스레드는 건너뛴다)
+
+    def start(self):
+        with self.lock:
+            self.started = not self.cancelled
+            return self.started
+
+    def cancel(self):
+        """아직 시작하지 않았으면 취소하고 True."""
+        with self.lock:
+            self.cancelled = not self.started
+            return self.cancelled
+
+
+class CommunityStore:
+    """읽기는 스레드별 연결로 바로, 쓰기는 전용 스레드가 모아서 한 번에 커밋한다.
+
+    add_* / delete_*는 자기 쓰기가 커밋될 때까지 기다리므로 호출 직후 읽으면 바로 보인다.
+    """
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = str(db_path)
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        for stmt in _SCHEMA:
+            conn.execute(stmt)
+        conn.commit()
+        self._local = threading.local()
+        self._writes = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="community-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def _reader(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    # --- 쓰기 ----------------------------------------------------------------
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            batch = [self._writes.get()]
+            deadline = time.monotonic() + BATCH_WINDOW_S
+            while len(batch) < MAX_BATCH:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._writes.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            try:
+                # 묶음 전체가 한 트랜잭션, 쓰기마다 SAVEPOINT: 하나가 실패해도 그 쓰기만 되돌리고 나머지는 커밋한다
+                conn.execute("BEGIN IMMEDIATE")
+                for w in batch:
+                    if not w.start():
+                        continue
+                    conn.execute("SAVEPOINT w")
+                    try:
+                        for sql, params in w.statements:
+                            w.lastrowid = conn.execute(sql, params).lastrowid
+                    except Exception as exc:
+                        conn.execute("ROLLBACK TO w")
+                        w.lastrowid, w.error = None, exc
+                    conn.execute("RELEASE w")
+                conn.commit()
+            except Exception as exc:
+                # 커밋 자체가 실패(잠금/디스크)하면 아무것도 저장되지 않았다. 스레드는 계속 돈다
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass
+                for w in batch:
+                    w.lastrowid, w.error = None, w.error or exc
+            for w in batch:
+                w.done.set()
+
+    def _write(self, sql, params=(), *more):
+        w = _Write([(sql, params), *more])
+        self._writes.put(w)
+        if not w.done.wait(WRITE_TIMEOUT_S):
+            if w.cancel():
+                # 대기열에서 빠졌으므로 저장되지 않는다 (다시 시도해도 중복되지 않는다)
+                raise TimeoutError("수다방 저장이 지연되어 취소했습니다. 다시 시도해 주세요")
+            w.done.wait()   # 이미 트랜잭션 안에서 실행 중: 커밋/롤백 결과를 기다린다
+        if w.error is not None:
+            raise w.error
+        return w.lastrowid
+
+    # --- 리뷰 ----------------------------------------------------------------
+    def add_review(self, place, body):
+        return self._write("INSERT INTO reviews (place, body, created_at) VALUES (?, ?, ?)", (place, body, time.time()))
+
+    def delete_review(self, review_id):
+        self._write("DELETE FROM reviews WHERE id = ?", (review_id,))
+
+    def count_reviews(self, place):
+        return self._reader().execute("SELECT COUNT(*) FROM reviews WHERE place = ?", (place,)).fetchone()[0]
+
+    def list_reviews(self, place, page=0, page_size=50):
+        """최신순 한 페이지 (방금 쓴 리뷰가 맨 앞)."""
+        rows = self._reader().execute(
+            "SELECT id, body FROM reviews WHERE place = ? ORDER BY id DESC LIMIT ? OFFSET ?",
+            (place, page_size, page * page_size),
+        ).fetchall()
+        return [{"id": r[0], "body": r[1]} for r in rows]
+
+    # --- 추천 + 댓글 -----------------------------------------------------------
+    def add_recommendation(self, place, reason):
+        return self._write("INSERT INTO recommendations (place, reason, created_at) VALUES (?, ?, ?)",
+                           (place, reason, time.time()))
+
+    def delete_recommendation(self, rec_id):
+        self._write("DELETE FROM replies WHERE rec_id = ?", (rec_id,),
+                    ("DELETE FROM recommendations WHERE id = ?", (rec_id,)))
+
+    def add_reply(self, rec_id, body):
+        return self._write("INSERT INTO replies (rec_id, body, created_at) VALUES (?, ?, ?)", (rec_id, body, time.time()))
+
+    def count_recommendations(self):
+        return self._reader().execute("SELECT COUNT(*) FROM recommendations").fetchone()[0]
+
+    def list_recommendations(self, page=0, page_size=10):
+        """최신순 한 페이지와 그 페이지 글들의 댓글 (쿼리 2번)."""
+        conn = self._reader()
+        rows = conn.execute(
+            "SELECT id, place, reason FROM recommendations ORDER BY id DESC LIMIT ? OFFSET ?",
+            (page_size, page * page_size),
+        ).fetchall()
+        recs = [{"id": r[0], "place": r[1], "desc": r[2], "replies": []} for r in rows]
+        if recs:
+            by_id = {r['id']: r for r in recs}
+            marks = ",".join("?" * len(by_id))
+            for rec_id, body in conn.execute(
+                f"SELECT rec_id, body FROM replies WHERE rec_id IN ({marks}) ORDER BY id", tuple(by_id)
+            ):
+                by_id[rec_id]['replies'].append(body)
+        return recs
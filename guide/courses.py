@@ -0,0 +1,15 @@
+# ---------------------------------------------------------
+# 추천 코스 데이터 (data/courses.json, 프로세스당 한 번만 읽는다)
+# ---------------------------------------------------------
+import json
+from functools import lru_cache
+from pathlib import Path
+
+COURSES_FILE = Path(__file__).resolve().parent.parent / "data" / "courses.json"
+
+
+@lru_cache(maxsize=None)
+def load_courses(path=COURSES_FILE):
+    """테마 이름 -> 장소 목록 (관광-관광-식당-관광-관광 순서). 호출자는 결과를 수정하지 말 것."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,471 @@
+# ---------------------------------------------------------
+# 범죄 데이터 저장소 (CSV를 청크 단위로 읽어 연도별 컬럼형 파티션에 추가 -> 연도 x 구 x 유형 큐브)
+# 새 연도나 정정 행이 들어오면 그 연도의 파티션과 집계만 다시 쓴다.
+# ---------------------------------------------------------
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# TAB 4에서 분석하는 범죄 유형 (CSV 컬럼 이름 그대로)
+CRIME_TYPES = ['Robbery', 'Street_robbery', 'Injury', 'Agg_assault', 'Threat', 'Theft', 'Car', 'From_car',
+               'Bike', 'Burglary', 'Fire', 'Arson', 'Damage', 'Graffiti', 'Drugs']
+OPTIONAL_TYPES = ['Local']   # 없으면 0으로 채운다
+STORE_TYPES = CRIME_TYPES + OPTIONAL_TYPES
+REQUIRED_COLUMNS = ['Year', 'District', 'Code', 'Location'] + CRIME_TYPES
+
+# BERLIN_GUIDE_CACHE_DIR로 위치를 바꿀 수 있다 (벤치마크가 실제 캐시를 건드리지 않도록)
+CACHE_ROOT = Path(os.environ.get("BERLIN_GUIDE_CACHE_DIR") or Path(__file__).resolve().parent.parent / ".cache")
+PARTITION_DIR = CACHE_ROOT / "crime_parts"
+CHUNK_ROWS = 200_000
+STALE_PARTITION_S = 3600   # 교체된 파티션 폴더는 이만큼 지난 뒤 지운다 (다른 프로세스가 아직 읽고 있을 수 있다)
+
+
+def file_signature(csv_file):
+    """파일 경로 + 크기 + 수정시각으로 만든 캐시 키. 파일이 바뀌면 키도 바뀐다."""
+    st_ = os.stat(csv_file)
+    raw = f"{os.path.abspath(csv_file)}:{st_.st_size}:{st_.st_mtime_ns}"
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+class CrimeCube:
+    """(연도, 구, 유형) 합계 큐브와 LOR(Code) 큐브. 차트와 지도는 모두 이 큐브를 슬라이스한다.
+
+    counts[y, d, t] = 해당 연도/구의 유형별 합계, lor_counts[y, l, t] = 해당 연도/LOR의 유형별 합계.
+    """
+
+    def __init__(self, years, districts, types, counts, lor_codes, lor_names, lor_counts,
+                 n_rows=0, versions=None, rows=None):
+        self.years = np.asarray(years)
+        self.districts = districts            # 정렬된 구 이름
+        self.types = types                    # 집계 대상 컬럼 이름 (Local 포함)
+        self.counts = counts
+        self.lor_codes = lor_codes
+        self.lor_names = lor_names
+        self.lor_counts = lor_counts
+        self.n_rows = n_rows
+        self.versions = versions or {}        # 연도 -> 파티션 버전
+        self._rows = rows                     # 행 단위 DataFrame을 만드는 함수 (to_frame)
+
+    @property
+    def latest_year(self):
+        return int(self.years[-1]) if len(self.years) else None
+
+    @property
+    def version(self):
+        """파티션 버전 전체의 요약. 어느 연도든 바뀌면 달라진다."""
+        raw = json.dumps(sorted(self.versions.items()))
+        return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+    @property
+    def crime_types(self):
+        return [c for c in CRIME_TYPES if c in self.types]
+
+    def _type_idx(self, types):
+        if types is None:
+            return slice(None)
+        return [self.types.index(t) for t in types if t in self.types]
+
+    def _district_idx(self, districts):
+        if districts is None:
+            return slice(None)
+        pos = {d: i for i, d in enumerate(self.districts)}
+        return sorted(pos[d] for d in districts if d in pos)
+
+    def _year_slice(self, year):
+        y = np.searchsorted(self.years, year)
+        if y >= len(self.years) or self.years[y] != year:
+            return np.zeros(self.counts.shape[1:], dtype=np.int64)
+        return self.counts[y]
+
+    def district_totals(self, year, types=None, districts=None):
+        """구별 합계 (index=District)."""
+        d_idx = self._district_idx(districts)
+        sub = self._year_slice(year)[d_idx][:, self._type_idx(types)]
+        names = np.asarray(self.districts, dtype=object)[d_idx]
+        return pd.Series(sub.sum(axis=1), index=pd.Index(names, name='District'))
+
+    def type_totals(self, year, types=None, districts=None):
+        """유형별 합계 (index=Type)."""
+        t_idx = self._type_idx(types)
+        sub = self._year_slice(year)[self._district_idx(districts)][:, t_idx]
+        names = np.asarray(self.types, dtype=object)[t_idx]
+        return pd.Series(sub.sum(axis=0), index=pd.Index(names, name='Type'))
+
+    def lor_totals(self, year, types=None):
+        """LOR 코드별 합계 (index=Code)."""
+        y = np.searchsorted(self.years, year)
+        if y >= len(self.years) or self.years[y] != year:
+            return pd.Series(0, index=pd.Index(self.lor_codes, name='Code'), dtype=np.int64)
+        sub = self.lor_counts[y][:, self._type_idx(types)]
+        return pd.Series(sub.sum(axis=1), index=pd.Index(self.lor_codes, name='Code'))
+
+    def yearly_totals(self, types=None, districts=None):
+        """연도별 합계 (index=Year)."""
+        sub = self.counts[:, self._district_idx(districts)][:, :, self._type_idx(types)]
+        return pd.Series(sub.sum(axis=(1, 2)), index=pd.Index(self.years, name='Year'))
+
+    def to_frame(self):
+        """원본과 같은 모양의 DataFrame (District/Location은 category)."""
+        return self._rows() if self._rows else pd.DataFrame()
+
+
+# --- 연도별 파티션 저장소 ----------------------------------------------------------
+_ROW_KEYS = ['code', 'district_codes', 'location_codes', 'values', 'source']
+_SUMMARY_KEYS = ['district_counts', 'lor_codes', 'lor_counts', 'lor_locations']
+STORE_FORMAT = 2   # 행에 원본 번호를 붙인 형식. 다르면 저장소를 처음부터 다시 만든다
+
+
+def _empty_meta():
+    return {"format": STORE_FORMAT, "generation": 0, "next_source": 0,
+            "districts": [], "locations": [], "partitions": {}, "sources": {}}
+
+
+def _live_mask(codes, ranks):
+    """같은 Code의 행 중 우선순위(원본 순서)가 가장 높은 행만 True."""
+    order = np.lexsort((ranks, codes))
+    last = np.ones(len(order), dtype=bool)
+    last[:-1] = codes[order][1:] != codes[order][:-1]
+    live = np.zeros(len(codes), dtype=bool)
+    live[order[last]] = True
+    return live
+
+
+def _summarize(rows, n_districts):
+    """파티션 하나(한 연도)의 구별/LOR별 합계. rows는 살아 있는 행만 (Code가 유일하다)."""
+    values = np.asarray(rows['values'], dtype=np.int64)
+    district_counts = np.zeros((n_districts, values.shape[1]), dtype=np.int64)
+    np.add.at(district_counts, np.asarray(rows['district_codes']), values)
+    order = np.argsort(rows['code'], kind="stable")
+    return {
+        'district_counts': district_counts,
+        'lor_codes': np.asarray(rows['code'])[order],
+        'lor_counts': values[order],
+        'lor_locations': np.asarray(rows['location_codes'])[order],
+    }
+
+
+class CrimeStore:
+    """연도별로 나눈 추가 전용 저장소.
+
+    root/meta.json                   파티션 목록, 구/LOR 이름 사전(추가만 한다), 원본별 서명/번호/연도
+    root/year=2012/<버전>/*.npy       모든 원본의 행(원본 번호 포함) + 살아 있는 행 표시 + 구/LOR 합계
+
+    같은 (연도, Code)는 sync에 넘긴 원본 순서에서 뒤의 원본이 이긴다 (반영한 시각과 무관).
+    원본이 바뀌면 그 원본의 예전 행을 빼고 새 행을 넣으므로, 원본에서 지운 행은 저장소에서도 사라진다.
+
+    파티션은 바꿀 때마다 새 버전 폴더에 쓰고 meta.json을 원자적으로 교체한다.
+    여러 프로세스가 동시에 쓰면 마지막 meta.json이 이긴다 (진 쪽은 다음 sync에서 다시 반영된다).
+    """
+
+    def __init__(self, root=PARTITION_DIR, chunk_rows=CHUNK_ROWS):
+        self.root = Path(root)
+        self.chunk_rows = chunk_rows
+        self._lock = threading.Lock()
+        self._summaries = {}   # 파티션 폴더 -> 집계 (바뀌지 않은 파티션은 다시 읽지 않는다)
+        self._rejected = {}    # 원본 경로 -> (서명, 이유)
+        self.meta = self._read_meta()
+
+    # --- 메타데이터 ---
+    def _read_meta(self):
+        try:
+            with open(self.root / "meta.json", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return _empty_meta()
+        if meta.get("format") != STORE_FORMAT:
+            return _empty_meta()   # 예전 형식의 파티션은 쓰지 않는다 (GC가 정리)
+        return {**_empty_meta(), **meta}
+
+    def _write_meta(self, meta):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / f"meta.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp, self.root / "meta.json")
+
+    @property
+    def years(self):
+        return sorted(int(y) for y in self.meta["partitions"])
+
+    @property
+    def latest_year(self):
+        """가장 최근 연도 (행을 훑지 않고 파티션 목록에서)."""
+        years = self.years
+        return years[-1] if years else None
+
+    def partition_version(self, year):
+        part = self.meta["partitions"].get(str(year))
+        return part["dir"] if part else None
+
+    @property
+    def version(self):
+        raw = json.dumps(sorted((y, p["dir"]) for y, p in self.meta["partitions"].items()))
+        return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+    @property
+    def errors(self):
+        """반영하지 못한 원본 파일 -> 이유."""
+        return {path: reason for path, (_, reason) in self._rejected.items()}
+
+    # --- 수집 ---
+    def sync(self, csv_files):
+        """원본 목록을 저장소에 맞춘다. 다시 쓴 연도 목록.
+
+        csv_files는 전체 원본을 우선순위 순서로(뒤가 이긴다) 넘긴다. 서명이 바뀐 원본만 다시 읽고,
+        목록에서 빠진 원본의 행은 지운다. 순서가 바뀌면 모든 연도의 우선순위를 다시 정한다.
+        """
+        with self._lock:
+            self.meta = self._read_meta()   # 다른 프로세스가 먼저 반영했을 수 있다
+            sources = self.meta["sources"]
+            listed, new_rows, replaced = [], defaultdict(list), set()
+            affected = set()
+            for csv_file in csv_files:
+                key = os.path.abspath(csv_file)
+                try:
+                    sig = file_signature(csv_file)
+                except OSError:
+                    continue
+                listed.append(key)
+                known = sources.get(key)
+                if (known and known["sig"] == sig) or self._rejected.get(key, (None,))[0] == sig:
+                    continue
+                source = known["id"] if known else self.meta["next_source"]
+                try:
+                    by_year = self._ingest(csv_file, source)
+                except (OSError, ValueError, pd.errors.ParserError) as exc:
+                    self._rejected[key] = (sig, str(exc))
+                    continue
+                self._rejected.pop(key, None)
+                if not known:
+                    self.meta["next_source"] += 1
+                for year, rows in by_year.items():
+                    new_rows[year].append(rows)
+                affected |= set(by_year) | set(known["years"] if known else ())
+                replaced.add(source)
+                sources[key] = {"sig": sig, "id": source, "years": sorted(by_year)}
+            for key in [k for k in sources if k not in listed]:
+                affected |= set(sources[key]["years"])
+                replaced.add(sources.pop(key)["id"])
+
+            ranks = {sources[k]["id"]: i for i, k in enumerate(listed) if k in sources}
+            order = [k for k in listed if k in sources]
+            before = self.meta.get("order", [])
+            if [k for k in before if k in order] != [k for k in order if k in before]:
+                affected |= {int(y) for y in self.meta["partitions"]}   # 이미 있던 원본끼리 순서가 바뀌었다
+            self.meta["order"] = order
+            if not affected:
+                if self.meta != self._read_meta():
+                    self._write_meta(self.meta)
+                return []
+
+            self.meta["generation"] += 1
+            for year in sorted(affected):
+                self._write_partition(year, replaced, new_rows.get(year, []), ranks)
+            self._write_meta(self.meta)
+            self._collect_garbage()
+            return sorted(affected)
+
+    def _ingest(self, csv_file, source):
+        """원본 하나를 읽어 {연도: 행 컬럼}. 이름 사전(self.meta)에 새 이름을 더한다."""
+        columns = list(pd.read_csv(csv_file, nrows=0).columns)
+        missing = [c for c in REQUIRED_COLUMNS if c not in columns]
+        if missing:
+            raise ValueError(f"필수 컬럼 없음: {', '.join(missing)}")
+        usecols = REQUIRED_COLUMNS + [c for c in OPTIONAL_TYPES if c in columns]
+        lookup = {name: {n: i for i, n in enumerate(self.meta[name])} for name in ("districts", "locations")}
+        sizes = {name: len(self.meta[name]) for name in ("districts", "locations")}
+
+        by_year = defaultdict(list)
+        try:
+            for chunk in pd.read_csv(csv_file, usecols=usecols, chunksize=self.chunk_rows, on_bad_lines='skip'):
+                for year, rows in self._encode(chunk, lookup, source):
+                    by_year[year].append(rows)
+        except Exception:
+            for name, n in sizes.items():   # 반쯤 늘어난 이름 사전은 되돌린다
+                del self.meta[name][n:]
+            raise
+        return {year: {k: np.concatenate([p[k] for p in parts]) for k in _ROW_KEYS} for year, parts in by_year.items()}
+
+    def _codes(self, name, series, lookup):
+        # 이름 사전은 추가만 하므로 기존 파티션의 코드는 그대로 유효하다
+        names, inv = np.unique(series.astype(str).str.strip().to_numpy(), return_inverse=True)
+        pos, table = lookup[name], self.meta[name]
+        for n in names:
+            if n not in pos:
+                pos[n] = len(table)
+                table.append(n)
+        return np.array([pos[n] for n in names], dtype=np.int32)[inv]
+
+    def _encode(self, chunk, lookup, source):
+        year = pd.to_numeric(chunk['Year'], errors='coerce')
+        code = pd.to_numeric(chunk['Code'], errors='coerce')
+        ok = (year.notna() & code.notna()).to_numpy()   # 연도/LOR 코드가 없는 행은 버린다
+        chunk = chunk[ok]
+        values = np.zeros((len(chunk), len(STORE_TYPES)), dtype=np.int32)
+        for i, t in enumerate(STORE_TYPES):
+            if t in chunk.columns:
+                values[:, i] = pd.to_numeric(chunk[t], errors='coerce').fillna(0).to_numpy(np.int32)
+        cols = {
+            'code': code[ok].to_numpy(np.int32),
+            'district_codes': self._codes("districts", chunk['District'], lookup).astype(np.int16),
+            'location_codes': self._codes("locations", chunk['Location'], lookup),
+            'values': values,
+            'source': np.full(len(chunk), source, dtype=np.int16),
+        }
+        years = year[ok].to_numpy(np.int32)
+        for y in np.unique(years):
+            mask = years == y
+            yield int(y), {k: v[mask] for k, v in cols.items()}
+
+    def _load_rows(self, year, mmap_mode='r'):
+        part = self.meta["partitions"].get(str(year))
+        if not part:
+            return None
+        path = self.root / part["dir"]
+        return {k: np.load(path / f"{k}.npy", mmap_mode=mmap_mode) for k in _ROW_KEYS}
+
+    def _load_live(self, year):
+        part = self.meta["partitions"].get(str(year))
+        return np.load(self.root / part["dir"] / "live.npy") if part else None
+
+    def _write_partition(self, year, replaced, new, ranks):
+        """예전 행 중 replaced 원본의 행을 빼고 new를 더한 뒤, 원본 순위로 살아 있는 행을 정한다."""
+        old = self._load_rows(year)
+        parts = list(new)
+        if old is not None:
+            keep = ~np.isin(old['source'], list(replaced))
+            parts.insert(0, {k: np.asarray(v)[keep] for k, v in old.items()})
+        rows = {k: np.ascontiguousarray(np.concatenate([p[k] for p in parts])) for k in _ROW_KEYS} if parts else None
+        if rows is None or not len(rows['code']):
+            self.meta["partitions"].pop(str(year), None)
+            return
+        rank_of = np.full(int(rows['source'].max()) + 1, -1, dtype=np.int64)
+        for source, rank in ranks.items():
+            if source < len(rank_of):
+                rank_of[source] = rank
+        live = _live_mask(rows['code'], rank_of[rows['source']])
+
+        rel = f"year={year}/g{self.meta['generation']}-{uuid.uuid4().hex[:8]}"
+        path = self.root / rel
+        path.mkdir(parents=True)
+        winners = {k: v[live] for k, v in rows.items()}
+        for k, v in {**rows, "live": live, **_summarize(winners, len(self.meta["districts"]))}.items():
+            np.save(path / f"{k}.npy", v)
+        self.meta["partitions"][str(year)] = {"dir": rel, "rows": int(live.sum())}
+
+    def _collect_garbage(self):
+        live = {p["dir"] for p in self.meta["partitions"].values()}
+        cutoff = time.time() - STALE_PARTITION_S
+        for year_dir in self.root.glob("year=*"):
+            for path in year_dir.iterdir():
+                rel = f"{year_dir.name}/{path.name}"
+                try:
+                    if rel not in live and path.stat().st_mtime < cutoff:
+                        shutil.rmtree(path, ignore_errors=True)
+                except OSError:
+                    pass
+
+    # --- 조회 ---
+    def _summary(self, year):
+        rel = self.meta["partitions"][str(year)]["dir"]
+        summary = self._summaries.get(rel)
+        if summary is None:
+            path = self.root / rel
+            summary = {k: np.load(path / f"{k}.npy") for k in _SUMMARY_KEYS}
+            self._summaries[rel] = summary
+        return summary
+
+    @staticmethod
+    def _weighted(counts, weights):
+        if weights is None:
+            return counts.sum(axis=1)
+        return counts @ np.array([weights.get(t, 0.0) for t in STORE_TYPES])
+
+    def district_totals(self, year, weights=None):
+        """한 연도의 구별 합계 (index=District). 그 연도 파티션의 집계만 읽는다.
+
+        weights(유형 -> 가중치)를 주면 가중 합계.
+        """
+        if str(year) not in self.meta["partitions"]:
+            return pd.Series(dtype=np.int64, index=pd.Index([], name='District'))
+        counts = self._weighted(self._summary(year)['district_counts'], weights)
+        names = self.meta["districts"][:len(counts)]
+        return pd.Series(counts, index=pd.Index(names, name='District')).sort_index()
+
+    def lor_totals(self, year, weights=None):
+        """한 연도의 LOR 코드별 합계 (index=Code). weights는 district_totals와 같다."""
+        if str(year) not in self.meta["partitions"]:
+            return pd.Series(dtype=np.int64, index=pd.Index([], name='Code'))
+        s = self._summary(year)
+        return pd.Series(self._weighted(s['lor_counts'], weights), index=pd.Index(s['lor_codes'], name='Code'))
+
+    def cube(self):
+        """모든 파티션의 집계를 쌓은 CrimeCube (행은 읽지 않는다). 파티션이 없으면 None."""
+        with self._lock:
+            meta, years = self.meta, self.years
+            if not years:
+                return None
+            summaries = [self._summary(y) for y in years]
+        districts, locations, types = meta["districts"], meta["locations"], STORE_TYPES
+
+        counts = np.zeros((len(years), len(districts), len(types)), dtype=np.int64)
+        for i, s in enumerate(summaries):
+            counts[i, :len(s['district_counts'])] = s['district_counts']
+        order = sorted(range(len(districts)), key=districts.__getitem__)
+        counts = counts[:, order]
+
+        lor_codes = np.unique(np.concatenate([s['lor_codes'] for s in summaries]))
+        lor_counts = np.zeros((len(years), len(lor_codes), len(types)), dtype=np.int64)
+        lor_locations = np.zeros(len(lor_codes), dtype=np.int64)
+        for i, s in enumerate(summaries):
+            pos = np.searchsorted(lor_codes, s['lor_codes'])
+            lor_counts[i, pos] = s['lor_counts']
+            lor_locations[pos] = s['lor_locations']   # 이름이 바뀌었으면 최근 연도 것
+        return CrimeCube(
+            years, [districts[i] for i in order], list(types), counts,
+            lor_codes, [locations[i] for i in lor_locations], lor_counts,
+            n_rows=sum(meta["partitions"][str(y)]["rows"] for y in years),
+            versions={y: meta["partitions"][str(y)]["dir"] for y in years},
+            rows=self.to_frame,
+        )
+
+    def to_frame(self, years=None):
+        """파티션의 행을 원본과 같은 모양의 DataFrame으로 (District/Location은 category)."""
+        districts, locations = self.meta["districts"], self.meta["locations"]
+        frames = []
+        for year in (years if years is not None else self.years):
+            rows = self._load_rows(year)
+            if rows is None:
+                continue
+            live = self._load_live(year)
+            rows = {k: np.asarray(v)[live] for k, v in rows.items()}
+            df = pd.DataFrame(np.asarray(rows['values']), columns=STORE_TYPES)
+            df.insert(0, 'Year', np.int32(year))
+            df.insert(1, 'District', pd.Categorical.from_codes(rows['district_codes'], districts))
+            df.insert(2, 'Code', np.asarray(rows['code']))
+            df.insert(3, 'Location', pd.Categorical.from_codes(rows['location_codes'], locations))
+            frames.append(df)
+        if not frames:
+            return pd.DataFrame(columns=['Year', 'District', 'Code', 'Location'] + STORE_TYPES)
+        df = pd.concat(frames, ignore_index=True)
+        df['District'] = df['District'].cat.set_categories(sorted(districts))
+        return df
+
+
+def load_crime_cube(csv_file, cache_dir=PARTITION_DIR):
+    """CSV를 cache_dir의 파티션 저장소에 반영하고(바뀐 경우만) 큐브를 만든다. 실패하면 None."""
+    try:
+        store = CrimeStore(cache_dir)
+        store.sync([csv_file])
+        return store.cube()
+    except Exception:
+        return None
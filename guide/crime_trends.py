@@ -0,0 +1,168 @@
+# ---------------------------------------------------------
+# 범죄 추세 분석: 연도 x LOR x 유형 배열 전체를 한 번에 계산한다 (파이썬 반복은 연도 축만)
+#   전년 대비 증감, z-score / 수정 z-score(MAD) 이상치, Holt 지수평활 예측(모든 시계열을 한꺼번에 적합)
+# ---------------------------------------------------------
+import numpy as np
+import pandas as pd
+
+TOTAL = "Total"        # 유형 축 끝에 붙이는 전체 합계 (TAB 4 범죄 유형의 합)
+ANOMALY_Z = 3.5        # 수정 z-score 기준 (Iglewicz-Hoaglin)
+MIN_BASE = 10          # 전년 값이 이보다 작으면 증감률을 계산하지 않는다 (작은 수의 큰 비율 변동)
+FIT_YEARS = 10         # 예측 모델은 최근 이만큼의 연도로 적합한다
+HORIZON = 2
+ALPHAS = (0.2, 0.4, 0.6, 0.8)
+BETAS = (0.05, 0.2, 0.5)
+
+
+def yoy_change(counts):
+    """연도 축(0) 기준 전년 대비 증감과 증감률[%]. 둘 다 (Y-1, ...) 배열."""
+    x = np.asarray(counts, dtype=np.float64)
+    prev, cur = x[:-1], x[1:]
+    diff = cur - prev
+    pct = np.full(diff.shape, np.nan)
+    np.divide(diff * 100, prev, out=pct, where=prev >= MIN_BASE)
+    return diff, pct
+
+
+def anomaly_scores(counts):
+    """시계열마다(연도 축) z-score와 수정 z-score(중앙값/MAD). 둘 다 입력과 같은 모양."""
+    x = np.asarray(counts, dtype=np.float64)
+    std = x.std(axis=0)
+    z = np.divide(x - x.mean(axis=0), std, out=np.zeros_like(x), where=std > 0)
+    med = np.median(x, axis=0)
+    mad = np.median(np.abs(x - med), axis=0)
+    robust = np.divide(0.6745 * (x - med), mad, out=np.zeros_like(x), where=mad > 0)
+    return z, robust
+
+
+def holt_forecast(counts, horizon=HORIZON, alphas=ALPHAS, betas=BETAS, fit_years=FIT_YEARS):
+    """Holt 선형 지수평활을 모든 시계열에 한 번에 적합해 앞으로 horizon년을 예측한다.
+
+    (alpha, beta) 격자를 새 축으로 펼쳐 한 번에 돌리고, 한 단계 앞 예측 오차(SSE)가
+    가장 작은 조합을 시계열마다 고른다. (forecast (horizon, ...), alpha (...), beta (...))
+    """
+    x = np.asarray(counts, dtype=np.float64)[-fit_years:]
+    shape = x.shape[1:]
+    x = x.reshape(len(x), -1)                                   # (Y, S)
+    a = np.repeat(np.asarray(alphas, dtype=float), len(betas))[:, None]   # (G, 1)
+    b = np.tile(np.asarray(betas, dtype=float), len(alphas))[:, None]
+
+    level = np.repeat(x[:1], len(a), axis=0)                    # (G, S)
+    trend = np.repeat(x[1:2] - x[:1], len(a), axis=0) if len(x) > 1 else np.zeros_like(level)
+    sse = np.zeros_like(level)
+    for t in range(1, len(x)):
+        pred = level + trend
+        sse += (x[t] - pred) ** 2
+        new_level = a * x[t] + (1 - a) * pred
+        trend = b * (new_level - level) + (1 - b) * trend
+        level = new_level
+
+    best = sse.argmin(axis=0)
+    cols = np.arange(x.shape[1])
+    steps = np.arange(1, horizon + 1, dtype=float)[:, None]
+    forecast = np.maximum(level[best, cols] + steps * trend[best, cols], 0)   # 건수는 음수가 될 수 없다
+    return forecast.reshape((horizon,) + shape), a[best, 0].reshape(shape), b[best, 0].reshape(shape)
+
+
+class CrimeTrends:
+    """CrimeCube 하나에 대한 추세 분석 결과 (LOR 단위 + 구 단위). 큐브와 같은 버전으로 캐시한다."""
+
+    def __init__(self, cube, horizon=HORIZON):
+        self.years = np.asarray(cube.years)
+        self.types = cube.crime_types + [TOTAL]
+        t_idx = [cube.types.index(t) for t in cube.crime_types]
+        self.lor_codes, self.lor_names = cube.lor_codes, cube.lor_names
+        self.districts = cube.districts
+
+        self.lor = self._with_total(cube.lor_counts[:, :, t_idx])          # (Y, L, T+1)
+        self.district = self._with_total(cube.counts[:, :, t_idx])         # (Y, D, T+1)
+        self.lor_diff, self.lor_pct = yoy_change(self.lor)
+        self.lor_z, self.lor_robust = anomaly_scores(self.lor)
+        self.lor_forecast = holt_forecast(self.lor, horizon)[0]            # (H, L, T+1)
+        self.district_diff, self.district_pct = yoy_change(self.district)
+        self.district_forecast = holt_forecast(self.district, horizon)[0]  # (H, D, T+1)
+
+    @staticmethod
+    def _with_total(counts):
+        counts = np.asarray(counts, dtype=np.int64)
+        return np.concatenate([counts, counts.sum(axis=2, keepdims=True)], axis=2)
+
+    @property
+    def latest_year(self):
+        return int(self.years[-1]) if len(self.years) else None
+
+    @property
+    def forecast_years(self):
+        return [self.latest_year + h + 1 for h in range(len(self.lor_forecast))]
+
+    def _year_pos(self, year):
+        y = int(np.searchsorted(self.years, year if year is not None else self.years[-1]))
+        return y if y < len(self.years) and (year is None or self.years[y] == year) else None
+
+    def top_changes(self, crime_type=TOTAL, year=None, n=10, rising=True):
+        """전년 대비 증감률이 가장 큰(rising=False면 가장 작은) LOR n개."""
+        y, t = self._year_pos(year), self.types.index(crime_type)
+        if not y:
+            return pd.DataFrame()
+        pct = self.lor_pct[y - 1, :, t]
+        valid = np.nonzero(~np.isnan(pct))[0]
+        order = valid[np.argsort(-pct[valid] if rising else pct[valid], kind="stable")][:n]
+        return pd.DataFrame({
+            "동네": [self.lor_names[i] for i in order],
+            "Code": self.lor_codes[order],
+            str(self.years[y - 1]): self.lor[y - 1, order, t],
+            str(self.years[y]): self.lor[y, order, t],
+            "증감": self.lor_diff[y - 1, order, t].astype(np.int64),
+            "증감률(%)": np.round(pct[order], 1),
+        })
+
+    def anomalies(self, year=None, threshold=ANOMALY_Z, n=20):
+        """해당 연도에 수정 z-score 절댓값이 threshold 이상인 (LOR, 유형). 점수가 큰 순."""
+        y = self._year_pos(year)
+        if y is None:
+            return pd.DataFrame()
+        robust = self.lor_robust[y]
+        li, ti = np.nonzero(np.abs(robust) >= threshold)
+        order = np.argsort(-np.abs(robust[li, ti]), kind="stable")[:n]
+        li, ti = li[order], ti[order]
+        return pd.DataFrame({
+            "동네": [self.lor_names[i] for i in li],
+            "유형": [self.types[i] for i in ti],
+            "건수": self.lor[y, li, ti],
+            "평년(중앙값)": np.median(self.lor[:, li, ti], axis=0),
+            "z": np.round(self.lor_z[y, li, ti], 2),
+            "수정 z": np.round(robust[li, ti], 2),
+        })
+
+    def forecast_table(self, crime_type=TOTAL, n=10):
+        """내년 예측 증가폭이 가장 큰 LOR n개."""
+        t = self.types.index(crime_type)
+        latest, nxt = self.lor[-1, :, t], self.lor_forecast[0, :, t]
+        order = np.argsort(-(nxt - latest), kind="stable")[:n]
+        return pd.DataFrame({
+            "동네": [self.lor_names[i] for i in order],
+            str(self.latest_year): latest[order],
+            f"{self.forecast_years[0]} 예측": np.rint(nxt[order]).astype(np.int64),
+            "예측 증감": np.rint(nxt[order] - latest[order]).astype(np.int64),
+        })
+
+    def district_outlook(self, crime_type=TOTAL, districts=None):
+        """구별 최신 연도 값, 전년 대비 증감률, 앞으로의 예측."""
+        t = self.types.index(crime_type)
+        idx = [i for i, d in enumerate(self.districts) if districts is None or d in districts]
+        out = pd.DataFrame({"구": [self.districts[i] for i in idx],
+                            str(self.latest_year): self.district[-1, idx, t]})
+        if len(self.years) > 1:
+            out["증감률(%)"] = np.round(self.district_pct[-1, idx, t], 1)
+        for h, year in enumerate(self.forecast_years):
+            out[f"{year} 예측"] = np.rint(self.district_forecast[h, idx, t]).astype(np.int64)
+        return out
+
+    def lor_change(self, crime_type=TOTAL, year=None):
+        """LOR 코드 -> 전년 대비 증감률[%] (계산할 수 없는 LOR은 빠진다). 지도 레이어용."""
+        y, t = self._year_pos(year), self.types.index(crime_type)
+        if not y:
+            return {}
+        pct = self.lor_pct[y - 1, :, t]
+        ok = ~np.isnan(pct)
+        return dict(zip(self.lor_codes[ok].tolist(), pct[ok].tolist()))
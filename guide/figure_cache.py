@@ -0,0 +1,153 @@
+# ---------------------------------------------------------
+# 범죄 대시보드 차트 캐시: (연도 파티션 버전, 구 집합, 유형) -> 직렬화된 Plotly figure JSON
+# 차트에는 큐브에서 집계한 배열만 넘기고, 모든 연도의 기본 화면은 백그라운드에서 미리 만든다.
+# 새 연도/정정 데이터가 들어와도 바뀌지 않은 연도의 차트는 그대로 쓴다.
+# ---------------------------------------------------------
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from guide.profiler import PROFILER
+
+MAX_FIGURES = 256
+
+
+def _bar_figure(names, counts):
+    import plotly.graph_objects as go
+    order = np.argsort(counts, kind="stable")   # 가로 막대는 아래에서 위로 커지게
+    names, counts = [names[i] for i in order], [int(counts[i]) for i in order]
+    fig = go.Figure(go.Bar(
+        x=counts, y=names, orientation='h', text=counts, texttemplate='%{text:.2s}', textposition='outside',
+        marker=dict(color=counts, coloraxis='coloraxis'),
+        hovertemplate='District=%{y}<br>Count=%{x}<extra></extra>',
+    ))
+    fig.update_layout(coloraxis=dict(colorscale='Reds', colorbar=dict(title='Count')),
+                      xaxis_title='Count', yaxis_title='District')
+    return fig
+
+
+def _pie_figure(names, counts):
+    import plotly.graph_objects as go
+    fig = go.Figure(go.Pie(labels=list(names), values=[int(c) for c in counts], hole=0.4,
+                           textposition='inside', textinfo='percent+label'))
+    return fig
+
+
+def _line_figure(years, totals):
+    import plotly.graph_objects as go
+    fig = go.Figure(go.Scatter(x=[int(y) for y in years], y=[int(t) for t in totals], mode='lines+markers',
+                               hovertemplate='Year=%{x}<br>총 범죄 수=%{y}<extra></extra>'))
+    fig.update_layout(xaxis=dict(title='Year', tickmode='linear'), yaxis_title='총 범죄 수')
+    return fig
+
+
+class FigureCache:
+    """CrimeCube 버전이 바뀌어도 이어 쓰는 차트 캐시 (LRU). 스레드 안전.
+
+    update()가 다른 세션/미리 만들기 도중에 self.cube를 바꿀 수 있으므로, 요청마다 큐브를 한 번만
+    읽어(cube 인자가 있으면 그것) 키 계산과 차트 만들기에 같은 큐브를 쓴다.
+    """
+
+    _pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="figures")
+
+    def __init__(self, cube=None, max_entries=MAX_FIGURES):
+        self.cube = cube
+        self.max_entries = max_entries
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(cube, kind, year, districts, types):
+        # 구/유형을 고르지 않았거나 전부 고른 경우는 같은 키 (가장 흔한 기본 화면)
+        # 연도 차트는 그 연도 파티션 버전, 연도별 추이는 전체 버전이 키에 들어간다
+        d = tuple(sorted(districts)) if districts and set(districts) != set(cube.districts) else None
+        t = tuple(types) if types and list(types) != cube.crime_types else None
+        version = cube.version if year is None else cube.versions.get(year)
+        return kind, year, version, d, t
+
+    def _get(self, key, build):
+        """캐시된 차트. JSON으로 저장하고, 화면에 넘길 Figure는 항목마다 한 번만 파싱한다.
+
+        돌려주는 Figure는 세션끼리 공유하므로 수정하면 안 된다 (st.plotly_chart는 복사해서 쓴다).
+        """
+        with self._lock:
+            entry = self._figures.get(key)
+            PROFILER.count_cache("figure", entry is not None)
+            if entry is not None:
+                self._figures.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if entry is None:
+            entry = [build().to_json(), None]
+            with self._lock:
+                entry = self._figures.setdefault(key, entry)
+                while len(self._figures) > self.max_entries:
+                    self._figures.popitem(last=False)
+        if entry[1] is None:
+            import plotly.io as pio
+            entry[1] = pio.from_json(entry[0], skip_invalid=True)
+        return entry[1]
+
+    def update(self, cube):
+        """새 큐브로 바꾼다. 캐시는 비우지 않고, 없는 기본 차트만 백그라운드에서 만든다."""
+        with self._lock:
+            if cube is self.cube:
+                return None
+            self.cube = cube
+        return self.warm_async(cube=cube)
+
+    def to_json(self, kind, year=None, districts=None, types=None, cube=None):
+        """저장된 figure JSON (없으면 None)."""
+        cube = cube or self.cube
+        with self._lock:
+            entry = self._figures.get(self._key(cube, kind, year, districts, types or cube.crime_types))
+        return entry[0] if entry else None
+
+    def district_bar(self, year, districts=None, types=None, cube=None):
+        cube = cube or self.cube
+        types = types or cube.crime_types
+
+        def build():
+            totals = cube.district_totals(year, types, districts or None)
+            return _bar_figure(list(totals.index), totals.to_numpy())
+        return self._get(self._key(cube, "bar", year, districts, types), build)
+
+    def type_pie(self, year, districts=None, types=None, cube=None):
+        cube = cube or self.cube
+        types = types or cube.crime_types
+
+        def build():
+            totals = cube.type_totals(year, types, districts or None)
+            return _pie_figure(list(totals.index), totals.to_numpy())
+        return self._get(self._key(cube, "pie", year, districts, types), build)
+
+    def yearly_line(self, types=None, cube=None):
+        # 연도별 추이는 선택한 연도/구와 무관하다
+        cube = cube or self.cube
+        types = types or cube.crime_types
+
+        def build():
+            totals = cube.yearly_totals(types)
+            return _line_figure(totals.index, totals.to_numpy())
+        return self._get(self._key(cube, "line", None, None, types), build)
+
+    def warm(self, years=None, cube=None):
+        """기본 화면(모든 구, 모든 유형)의 차트를 연도별로 만들어 둔다. 최신 연도부터."""
+        cube = cube or self.cube
+        self.yearly_line(cube=cube)
+        for year in (years if years is not None else [int(y) for y in cube.years[::-1]]):
+            self.district_bar(year, cube=cube)
+            self.type_pie(year, cube=cube)
+
+    def warm_async(self, years=None, cube=None):
+        # 시작할 때의 큐브로 끝까지 만든다 (도중에 update()가 와도 섞이지 않는다)
+        return self._pool.submit(self.warm, years, cube or self.cube)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._figures)
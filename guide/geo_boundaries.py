@@ -0,0 +1,216 @@
+# ---------------------------------------------------------
+# 행정 경계(구/LOR) GeoJSON 로컬 캐시 + 줌 단계별 단순화
+# ---------------------------------------------------------
+import hashlib
+import json
+import time
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import requests
+
+from guide.crime_store import CACHE_ROOT
+from guide.http_client import get_json
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data" / "geo"
+CACHE_DIR = CACHE_ROOT / "geo"
+
+# kind -> 파일 이름 / 원격 URL / 속성 키
+# LOR(Bezirksregion) 경계는 고정된 공개 URL이 없어 기본값이 없다. data/geo/에 파일을 넣거나
+# configure_source()로(앱에서는 secrets의 lor_geojson_url) 받을 곳을 지정하면 .cache/geo/에 한 번 받아 둔다.
+# 속성 키는 대소문자를 가리지 않는다 (배포처에 따라 BZR_ID / bzr_id).
+BOUNDARY_SOURCES = {
+    "bezirke": {
+        "file": "berlin_bezirke.geojson",
+        "url": "https://raw.githubusercontent.com/funkeinteraktiv/Berlin-Geodaten/master/berlin_bezirke.geojson",
+        "name_key": "name",
+        "code_key": None,
+    },
+    "lor": {
+        "file": "berlin_lor.geojson",
+        "url": None,
+        "name_key": "BZR_NAME",
+        "code_key": "BZR_ID",
+    },
+}
+
+# (최대 줌, Douglas-Peucker 허용 오차[도]) - 줌이 낮을수록 거칠게
+ZOOM_TOLERANCES = [(10, 0.002), (12, 0.0008), (14, 0.0002), (99, 0.00005)]
+COORD_DIGITS = 5
+
+
+def tolerance_for_zoom(zoom):
+    for max_zoom, tol in ZOOM_TOLERANCES:
+        if zoom <= max_zoom:
+            return tol
+    return ZOOM_TOLERANCES[-1][1]
+
+
+def configure_source(kind, url):
+    """원격 URL을 바꾼다. 바뀌었으면 이전 원본/단순화 결과와 실패 기록을 지우고 True."""
+    if not url or BOUNDARY_SOURCES[kind]["url"] == url:
+        return False
+    BOUNDARY_SOURCES[kind]["url"] = url
+    _failed_at.pop(kind, None)
+    _raw_cache.pop(kind, None)
+    _simplified_boundaries.cache_clear()
+    return True
+
+
+def _download_path(src):
+    # 받은 파일은 URL별로 둔다 (URL을 바꾸면 예전 URL에서 받은 파일을 읽지 않도록)
+    digest = hashlib.sha1(src["url"].encode()).hexdigest()[:10]
+    return CACHE_DIR / f"{Path(src['file']).stem}-{digest}.geojson"
+
+
+RETRY_AFTER_S = 300  # 다운로드 실패 후 다시 시도하기까지 대기 (매 rerun마다 막히지 않도록)
+
+_raw_cache = {}
+_failed_at = {}
+
+
+def load_raw_boundaries(kind):
+    """data/geo -> .cache/geo -> 원격 다운로드(1회) 순서로 원본 GeoJSON을 찾는다. 없으면 None.
+
+    실패는 RETRY_AFTER_S 동안만 기억하므로 네트워크가 돌아오면 다시 받는다.
+    """
+    if kind not in _raw_cache:
+        if time.time() - _failed_at.get(kind, 0) < RETRY_AFTER_S:
+            return None
+        data = _fetch_raw_boundaries(kind)
+        if data is None:
+            _failed_at[kind] = time.time()
+            return None
+        _raw_cache[kind] = data
+    return _raw_cache[kind]
+
+
+def _fetch_raw_boundaries(kind):
+    src = BOUNDARY_SOURCES[kind]
+    for path in (DATA_DIR / src["file"], _download_path(src) if src["url"] else None):
+        if path is not None and path.exists():
+            try:
+                with open(path, encoding="utf-8") as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                continue
+    if not src["url"]:
+        return None
+    try:
+        data = get_json(src["url"], timeout=(3, 10))
+    except (requests.RequestException, ValueError):
+        return None
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(_download_path(src), "w", encoding="utf-8") as f:
+            json.dump(data, f)
+    except OSError:
+        pass
+    return data
+
+
+def douglas_peucker(points, tolerance):
+    """(N, 2) 좌표 배열을 Douglas-Peucker로 단순화한다 (재귀 없이 스택 사용)."""
+    n = len(points)
+    if n < 3:
+        return points
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        seg = points[end] - points[start]
+        rel = points[start + 1:end] - points[start]
+        seg_len = np.hypot(seg[0], seg[1])
+        if seg_len == 0:
+            dist = np.hypot(rel[:, 0], rel[:, 1])
+        else:
+            dist = np.abs(seg[0] * rel[:, 1] - seg[1] * rel[:, 0]) / seg_len
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            mid = start + 1 + i
+            keep[mid] = True
+            stack.append((start, mid))
+            stack.append((mid, end))
+    return points[keep]
+
+
+def _simplify_ring(ring, tolerance):
+    pts = douglas_peucker(np.asarray(ring, dtype=float)[:, :2], tolerance)
+    if len(pts) < 4:
+        # 너무 작아진 링은 원본 유지 (폴리곤이 사라지지 않도록)
+        pts = np.asarray(ring, dtype=float)[:, :2]
+    return np.round(pts, COORD_DIGITS).tolist()
+
+
+def simplify_geometry(geom, tolerance):
+    gtype = geom.get("type")
+    coords = geom.get("coordinates", [])
+    if gtype == "Polygon":
+        return {"type": gtype, "coordinates": [_simplify_ring(r, tolerance) for r in coords]}
+    if gtype == "MultiPolygon":
+        return {"type": gtype, "coordinates": [[_simplify_ring(r, tolerance) for r in poly] for poly in coords]}
+    return geom
+
+
+def _prop(props, key):
+    if key is None:
+        return None
+    if key in props:
+        return props[key]
+    return next((v for k, v in props.items() if k.lower() == key.lower()), None)
+
+
+def feature_key(props, kind):
+    """피처를 범죄 데이터와 연결하는 키: 코드가 있으면 int 코드("010111" -> 10111), 없으면 공백 제거한 이름."""
+    src = BOUNDARY_SOURCES[kind]
+    code = _prop(props, src["code_key"])
+    if code not in (None, ""):
+        try:
+            return int(code)
+        except (TypeError, ValueError):
+            pass
+    return str(_prop(props, src["name_key"]) or "").strip()
+
+
+def simplified_boundaries(kind, tolerance):
+    """단순화된 경계를 (키, 이름, geometry) 튜플로 반환한다. 허용 오차 단계별로 한 번만 계산.
+
+    경계가 없을 때의 빈 결과는 캐시하지 않는다 (나중에 받으면 바로 쓰인다).
+    """
+    if not load_raw_boundaries(kind):
+        return ()
+    return _simplified_boundaries(kind, tolerance)
+
+
+@lru_cache(maxsize=None)
+def _simplified_boundaries(kind, tolerance):
+    raw = load_raw_boundaries(kind)
+    name_key = BOUNDARY_SOURCES[kind]["name_key"]
+    out = []
+    for feat in raw.get("features", []):
+        props = feat.get("properties") or {}
+        geom = feat.get("geometry")
+        if not geom:
+            continue
+        out.append((feature_key(props, kind), str(_prop(props, name_key) or "").strip(),
+                    simplify_geometry(geom, tolerance)))
+    return tuple(out)
+
+
+def build_choropleth_geojson(kind, tolerance, values, value_name="Total_Crime"):
+    """단순화된 경계에 값(dict: 키 -> 수치)을 미리 조인한 작은 GeoJSON. 경계가 없으면 None."""
+    feats = simplified_boundaries(kind, tolerance)
+    if not feats:
+        return None
+    features = []
+    for key, name, geom in feats:
+        features.append({
+            "type": "Feature",
+            "properties": {"name": name, "key": key, value_name: values.get(key)},
+            "geometry": geom,
+        })
+    return {"type": "FeatureCollection", "features": features}
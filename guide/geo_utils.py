@@ -0,0 +1,40 @@
+# ---------------------------------------------------------
+# 좌표 계산 공용 함수 (haversine, 간이 평면 투영)
+# ---------------------------------------------------------
+import numpy as np
+
+EARTH_RADIUS_M = 6371008.8
+# 베를린 위도(약 52.5도)에서 1도당 거리 [m]
+M_PER_DEG_LAT = 111_320.0
+M_PER_DEG_LNG = M_PER_DEG_LAT * np.cos(np.radians(52.5))
+
+
+def haversine_m(lat1, lng1, lat2, lng2):
+    """두 좌표(또는 배열) 사이의 대원 거리 [m]. numpy 브로드캐스팅 지원."""
+    lat1, lng1, lat2, lng2 = map(np.radians, (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def ring_area_centroid(ring):
+    """[lng, lat] 링의 면적[km²]과 무게중심(lat, lng). 베를린 위도 기준 평면 근사."""
+    x = ring[:, 0] * M_PER_DEG_LNG / 1000
+    y = ring[:, 1] * M_PER_DEG_LAT / 1000
+    x1, y1 = np.roll(x, -1), np.roll(y, -1)
+    cross = x * y1 - x1 * y
+    area = cross.sum() / 2
+    if abs(area) < 1e-12:
+        return 0.0, (float(ring[:, 1].mean()), float(ring[:, 0].mean()))
+    cx = ((x + x1) * cross).sum() / (6 * area)
+    cy = ((y + y1) * cross).sum() / (6 * area)
+    return abs(area), (cy * 1000 / M_PER_DEG_LAT, cx * 1000 / M_PER_DEG_LNG)
+
+
+def ring_contains(ring, lng, lat):
+    """ray casting 방식의 점-다각형 포함 판정 (ring: (N, 2) [lng, lat])."""
+    xs, ys = ring[:, 0], ring[:, 1]
+    xj, yj = np.roll(xs, 1), np.roll(ys, 1)
+    crosses = (ys > lat) != (yj > lat)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_int = (xj - xs) * (lat - ys) / (yj - ys) + xs
+    return bool(np.count_nonzero(crosses & (lng < x_int)) % 2)
@@ -0,0 +1,166 @@
+# ---------------------------------------------------------
+# 지오코딩 캐시: 질의 정규화 + 별칭 + 근사 일치 + 실패(negative) 캐시 (SQLite)
+# ---------------------------------------------------------
+import difflib
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+from guide.crime_store import CACHE_ROOT
+from guide.profiler import PROFILER
+
+DB_PATH = CACHE_ROOT / "geocode.sqlite"
+NEGATIVE_TTL_S = 24 * 3600   # "못 찾음" 결과를 다시 묻지 않는 기간
+FUZZY_CUTOFF = 0.88
+
+_FOLD = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss", "é": "e", "è": "e", "á": "a", "à": "a"})
+
+# 한국어/독일어 별칭 -> 대표 이름 (모두 정규화된 형태)
+ALIASES = {
+    "브란덴부르크 문": "brandenburger tor",
+    "brandenburg gate": "brandenburger tor",
+    "전승기념탑": "siegessaeule",
+    "victory column": "siegessaeule",
+    "베를린 돔": "berliner dom",
+    "berlin cathedral": "berliner dom",
+    "체크포인트 찰리": "checkpoint charlie",
+    "이스트 사이드 갤러리": "east side gallery",
+    "알렉산더 광장": "alexanderplatz",
+    "포츠담 광장": "potsdamer platz",
+    "티어가르텐": "tiergarten",
+    "박물관 섬": "museumsinsel",
+    "museum island": "museumsinsel",
+    "카이저 빌헬름 교회": "kaiser wilhelm gedaechtniskirche",
+    "쿠담": "kurfuerstendamm",
+    "쿠담 거리": "kurfuerstendamm",
+    "tv타워": "fernsehturm",
+    "tv tower": "fernsehturm",
+    "알렉산더 광장 tv타워": "fernsehturm",
+    "오버바움 다리": "oberbaumbruecke",
+    "마우어파크": "mauerpark",
+    "베를린 동물원": "zoologischer garten",
+    "berlin zoo": "zoologischer garten",
+    "베를린 장벽 기념관": "gedenkstaette berliner mauer",
+}
+
+
+def normalize_query(query):
+    """대소문자/공백/움라우트/ß 통일, 번호 접두사·괄호·끝의 'berlin' 제거."""
+    q = unicodedata.normalize("NFKC", query or "").lower().translate(_FOLD)
+    q = re.sub(r"\([^)]*\)", " ", q)          # "Mauerpark (마우어파크)" -> "mauerpark"
+    q = re.sub(r"^\s*\d+\.\s*", "", q)         # "1. 베를린 돔" -> "베를린 돔"
+    q = re.sub(r"[^\w\s]", " ", q)
+    q = re.sub(r"\s+", " ", q).strip()
+    q = re.sub(r"(\s|^)berlin$", "", q).strip() or q
+    return ALIASES.get(q, q)
+
+
+class GeocodeStore:
+    """정규화된 질의 -> (lat, lng, address). found=0 행은 negative 캐시."""
+
+    def __init__(self, db_path=DB_PATH):
+        self._lock = threading.Lock()
+        if str(db_path) != ":memory:":
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS geocode ("
+                " norm TEXT PRIMARY KEY, lat REAL, lng REAL, address TEXT,"
+                " found INTEGER NOT NULL, fetched_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+        # 근사 일치 후보는 별칭과 추천 코스 POI뿐이다. 주소처럼 번지 하나만 다른 질의가
+        # 같은 것으로 잡히지 않도록, 나머지 저장된 질의는 정확히 같을 때만 쓴다.
+        self._fuzzy = sorted(set(ALIASES) | set(ALIASES.values()))
+
+    def get(self, norm):
+        """(lat, lng, address) / 'miss'(negative 캐시 유효) / None(모름)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT lat, lng, address, found, fetched_at FROM geocode WHERE norm = ?", (norm,)
+            ).fetchone()
+        if row is None:
+            return None
+        if row[3]:
+            return row[0], row[1], row[2]
+        if time.time() - row[4] < NEGATIVE_TTL_S:
+            return "miss"
+        return None
+
+    def closest(self, norm):
+        """별칭/추천 코스 이름과의 근사 일치. 숫자(번지 등)가 들어간 질의는 근사 일치하지 않는다."""
+        if any(ch.isdigit() for ch in norm):
+            return None
+        match = difflib.get_close_matches(norm, self._fuzzy, n=1, cutoff=FUZZY_CUTOFF)
+        return self.get(ALIASES.get(match[0], match[0])) if match else None
+
+    def put(self, norm, lat, lng, address, replace=True, fuzzy=False):
+        """fuzzy=True면 근사 일치 후보에도 넣는다 (추천 코스 POI)."""
+        verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+        with self._lock:
+            self._conn.execute(
+                f"{verb} INTO geocode (norm, lat, lng, address, found, fetched_at) VALUES (?, ?, ?, ?, 1, ?)",
+                (norm, lat, lng, address, time.time()),
+            )
+            self._conn.commit()
+            if fuzzy and norm not in self._fuzzy:
+                self._fuzzy.append(norm)
+
+    def put_miss(self, norm):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO geocode (norm, lat, lng, address, found, fetched_at)"
+                " VALUES (?, NULL, NULL, NULL, 0, ?)", (norm, time.time()),
+            )
+            self._conn.commit()
+
+
+class Geocoder:
+    """로컬 캐시(정확 -> 별칭/코스 이름 근사) 후 gmaps.geocode. 결과/실패 모두 저장한다."""
+
+    def __init__(self, client, store):
+        self.client = client
+        self.store = store
+
+    def seed_courses(self, courses):
+        """추천 코스의 POI 좌표를 미리 넣어 둔다 (기존 값은 덮어쓰지 않음)."""
+        for items in courses.values():
+            for item in items:
+                norm = normalize_query(item['name'])
+                if norm:
+                    self.store.put(norm, item['lat'], item['lng'], f"{item['name']} (추천 코스)", replace=False,
+                                   fuzzy=True)
+
+    def geocode(self, query):
+        norm = normalize_query(query)
+        if not norm:
+            return None, None, None
+        hit = self.store.get(norm)
+        if hit is None:
+            hit = self.store.closest(norm)
+        PROFILER.count_cache("geocode", hit is not None)
+        if hit == "miss":
+            return None, None, None
+        if hit is not None:
+            return hit
+        if self.client is None:
+            return None, None, None
+        try:
+            with PROFILER.call("geocode") as info:
+                result = self.client.geocode(query)
+                info["bytes"] = len(repr(result))
+        except Exception as exc:
+            # 네트워크/쿼터/예산 소진은 negative 캐시하지 않는다 (저장된 질의는 위에서 이미 답했다)
+            PROFILER.count(f"geocode_failed:{type(exc).__name__}")
+            return None, None, None
+        if not result:
+            self.store.put_miss(norm)
+            return None, None, None
+        loc = result[0]['geometry']['location']
+        address = result[0]['formatted_address']
+        self.store.put(norm, loc['lat'], loc['lng'], address)
+        return loc['lat'], loc['lng'], address
@@ -0,0 +1,277 @@
+# ---------------------------------------------------------
+# Google API 스케줄러: places_nearby / geocode / distance_matrix 호출은 모두 여기를 지난다
+#   토큰 버킷(초당 호출 수) + 우선순위(화면 > 미리 가져오기) + 같은 우선순위 안에서는 세션별 라운드 로빈
+#   + 같은 요청 합치기 + 일일 예산(SQLite, 프로세스 공유). 예산을 넘으면 호출하지 않고 예외 -> 호출부가 캐시로 대체
+# ---------------------------------------------------------
+import contextvars
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+from guide.crime_store import CACHE_ROOT
+from guide.profiler import PROFILER, _Series
+
+DB_PATH = CACHE_ROOT / "google_budget.sqlite"
+VISIBLE, PREFETCH = 0, 1                 # 숫자가 작을수록 먼저
+PRIORITY_NAMES = ("visible", "prefetch")
+DEFAULT_RATE_PER_S = 10.0
+DEFAULT_BURST = 20
+DEFAULT_DAILY_BUDGET = 5000
+PREFETCH_RESERVE = 0.2                   # 남은 예산이 이 비율 아래면 미리 가져오기는 받지 않는다
+PREFETCH_TOKEN_RESERVE = 0.5             # 미리 가져오기가 쓰지 않고 남겨 두는 버스트 토큰 비율
+MAX_WAIT_S = 20.0                        # 호출부가 결과를 기다리는 최대 시간 (대기열 + 호출)
+WORKERS = 4
+
+BUDGET_MESSAGE = "오늘 Google API 예산 소진"
+
+# (세션 id, 우선순위). Streamlit 스크립트 스레드마다 bind_session()으로 정하고,
+# 다른 스레드로 넘길 때는 contextvars.copy_context()로 함께 넘긴다.
+_request_ctx = contextvars.ContextVar("google_request", default=("-", VISIBLE))
+
+
+def bind_session(session_id):
+    _request_ctx.set((session_id or "-", VISIBLE))
+
+
+@contextmanager
+def request_context(priority=None, session=None):
+    """이 블록 안의 Google 호출에 우선순위/세션을 붙인다 (미리 가져오기는 PREFETCH)."""
+    cur_session, cur_priority = _request_ctx.get()
+    token = _request_ctx.set((session or cur_session, cur_priority if priority is None else priority))
+    try:
+        yield
+    finally:
+        _request_ctx.reset(token)
+
+
+def today():
+    # Google 쿼터는 태평양 시간 자정에 초기화되지만 여기서는 UTC 날짜로 센다
+    return time.strftime("%Y-%m-%d", time.gmtime())
+
+
+class BudgetLedger:
+    """날짜별 호출 수. 여러 프로세스가 같은 파일을 쓰므로 확인과 증가를 SQL 한 문장으로 한다."""
+
+    def __init__(self, db_path=DB_PATH):
+        self._lock = threading.Lock()
+        if str(db_path) != ":memory:":
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS budget (day TEXT PRIMARY KEY, used INTEGER NOT NULL)")
+            self._conn.commit()
+
+    def used(self, day=None):
+        with self._lock:
+            row = self._conn.execute("SELECT used FROM budget WHERE day = ?", (day or today(),)).fetchone()
+        return row[0] if row else 0
+
+    def try_charge(self, limit, day=None):
+        """한도 안이면 1 늘리고 True."""
+        day = day or today()
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO budget (day, used) VALUES (?, 0)", (day,))
+            cur = self._conn.execute("UPDATE budget SET used = used + 1 WHERE day = ? AND used < ?", (day, limit))
+            self._conn.commit()
+        return cur.rowcount == 1
+
+
+class _Request:
+    __slots__ = ("key", "kind", "fn", "priority", "session", "future", "queued_at")
+
+    def __init__(self, key, kind, fn, priority, session):
+        self.key, self.kind, self.fn = key, kind, fn
+        self.priority, self.session = priority, session
+        self.future = Future()
+        self.queued_at = time.monotonic()
+
+
+class GoogleScheduler:
+    """요청을 우선순위 x 세션 대기열에 넣고, 워커가 토큰이 있을 때만 하나씩 꺼내 호출한다."""
+
+    def __init__(self, rate_per_s=DEFAULT_RATE_PER_S, burst=DEFAULT_BURST, daily_budget=DEFAULT_DAILY_BUDGET,
+                 ledger=None, workers=WORKERS, max_wait_s=MAX_WAIT_S, prefetch_reserve=PREFETCH_RESERVE):
+        self.rate_per_s = rate_per_s
+        self.burst = burst
+        self.daily_budget = daily_budget
+        self.max_wait_s = max_wait_s
+        self.prefetch_reserve = prefetch_reserve
+        self.ledger = ledger or BudgetLedger()
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._cond = threading.Condition()
+        self._queues = [OrderedDict() for _ in PRIORITY_NAMES]   # 우선순위별 {세션: deque}
+        self._pending = 0
+        self._inflight = {}                                        # key -> _Request (대기 중 + 실행 중)
+        self._waits = [_Series() for _ in PRIORITY_NAMES]
+        self.stats = defaultdict(int)
+        for i in range(workers):
+            threading.Thread(target=self._worker, name=f"google-{i}", daemon=True).start()
+
+    # --- 예산 ---------------------------------------------------------------------
+    def budget_left(self):
+        return max(self.daily_budget - self.ledger.used(), 0)
+
+    @property
+    def exhausted(self):
+        return self.budget_left() == 0
+
+    def _count(self, name):
+        self.stats[name] += 1
+        PROFILER.count(f"google_{name}")
+
+    # --- 제출 ---------------------------------------------------------------------
+    def submit(self, kind, key, fn, priority=None):
+        """Future를 돌려준다. 같은 key가 대기/실행 중이면 그 Future를 같이 쓴다.
+
+        예산이 없으면(PREFETCH는 예비분까지 남기고) 대기열에 넣지 않고 RuntimeError.
+        """
+        session, ctx_priority = _request_ctx.get()
+        priority = ctx_priority if priority is None else priority
+        left = self.budget_left()
+        with self._cond:
+            req = self._inflight.get(key)
+            if req is not None:
+                self._count("merged")
+                if priority < req.priority and self._dequeue(req):
+                    # 화면 요청이 대기 중인 미리 가져오기와 겹치면 앞 대기열로 옮긴다
+                    req.priority = priority
+                    self._enqueue(req)
+                return req.future
+            if left <= 0 or (priority == PREFETCH and left <= self.daily_budget * self.prefetch_reserve):
+                self._count(f"rejected_{PRIORITY_NAMES[priority]}")
+                raise RuntimeError(BUDGET_MESSAGE)
+            req = _Request(key, kind, fn, priority, session)
+            self._inflight[key] = req
+            self._enqueue(req)
+            self._count("submitted")
+            self._cond.notify()
+        return req.future
+
+    def call(self, kind, key, fn, priority=None):
+        """submit 후 결과를 기다린다. 오래 걸리면 TimeoutError (요청 자체는 계속 진행된다)."""
+        future = self.submit(kind, key, fn, priority)
+        try:
+            return future.result(timeout=self.max_wait_s)
+        except TimeoutError:
+            self._count("timeouts")
+            raise
+
+    # --- 대기열 -------------------------------------------------------------------
+    def _enqueue(self, req):
+        self._queues[req.priority].setdefault(req.session, deque()).append(req)
+        self._pending += 1
+
+    def _dequeue(self, req):
+        """아직 대기 중이면 빼고 True (이미 실행 중이면 False)."""
+        queue = self._queues[req.priority].get(req.session)
+        if queue is None or req not in queue:
+            return False
+        queue.remove(req)
+        if not queue:
+            del self._queues[req.priority][req.session]
+        self._pending -= 1
+        return True
+
+    def _pop(self):
+        # 높은 우선순위부터, 같은 우선순위 안에서는 세션을 돌아가며 하나씩
+        for sessions in self._queues:
+            if sessions:
+                session, queue = next(iter(sessions.items()))
+                req = queue.popleft()
+                if queue:
+                    sessions.move_to_end(session)
+                else:
+                    del sessions[session]
+                self._pending -= 1
+                return req
+        return None
+
+    def _take_token(self, keep=0.0):
+        """토큰을 하나 쓰고 0, 모자라면 다음 토큰까지 남은 시간[s]. keep만큼은 남겨 둔다."""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate_per_s)
+        self._refilled_at = now
+        if self._tokens >= 1 + keep:
+            self._tokens -= 1
+            return 0.0
+        return (1 + keep - self._tokens) / self.rate_per_s
+
+    # --- 실행 ---------------------------------------------------------------------
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                # 미리 가져오기는 버스트의 일부를 화면 요청 몫으로 남겨 두고 나간다
+                prefetch_only = not any(self._queues[p] for p in range(PREFETCH))
+                delay = self._take_token(self.burst * PREFETCH_TOKEN_RESERVE if prefetch_only else 0.0)
+                if delay:
+                    self._cond.wait(delay)
+                    continue
+                req = self._pop()
+                self._waits[req.priority].add(time.monotonic() - req.queued_at)
+            self._run(req)
+
+    def _run(self, req):
+        result, error = None, None
+        if not self.ledger.try_charge(self.daily_budget):
+            self._count(f"rejected_{PRIORITY_NAMES[req.priority]}")
+            error = RuntimeError(BUDGET_MESSAGE)
+        else:
+            self._count(f"calls_{req.kind}")
+            try:
+                result = req.fn()
+            except Exception as exc:
+                self._count("errors")
+                error = exc
+        with self._cond:
+            self._inflight.pop(req.key, None)
+        if error is not None:
+            req.future.set_exception(error)
+        else:
+            req.future.set_result(result)
+
+    # --- 지표 ---------------------------------------------------------------------
+    def snapshot(self):
+        used = self.ledger.used()
+        with self._cond:
+            queued = {name: sum(len(q) for q in self._queues[p].values()) for p, name in enumerate(PRIORITY_NAMES)}
+            return {
+                "day": today(),
+                "budget": self.daily_budget,
+                "used": used,
+                "left": max(self.daily_budget - used, 0),
+                "rate_per_s": self.rate_per_s,
+                "queued": queued,
+                "inflight": len(self._inflight),
+                "wait": {name: {"count": self._waits[p].count, **self._waits[p].quantiles()}
+                         for p, name in enumerate(PRIORITY_NAMES)},
+                "stats": dict(self.stats),
+            }
+
+
+class ScheduledClient:
+    """googlemaps.Client 자리에 넘기는 대리 객체. 같은 메서드를 스케줄러를 거쳐 부른다."""
+
+    def __init__(self, client, scheduler):
+        self.client = client
+        self.scheduler = scheduler
+
+    def _call(self, kind, *args, **kwargs):
+        key = (kind, json.dumps([args, kwargs], sort_keys=True, default=str))
+        return self.scheduler.call(kind, key, lambda: getattr(self.client, kind)(*args, **kwargs))
+
+    def places_nearby(self, *args, **kwargs):
+        return self._call("places_nearby", *args, **kwargs)
+
+    def geocode(self, *args, **kwargs):
+        return self._call("geocode", *args, **kwargs)
+
+    def distance_matrix(self, *args, **kwargs):
+        return self._call("distance_matrix", *args, **kwargs)
@@ -0,0 +1,105 @@
+# ---------------------------------------------------------
+# 공용 HTTP 클라이언트: 커넥션 풀 + 타임아웃 + 재시도 + TTL 캐시(stale-while-revalidate)
+# ---------------------------------------------------------
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from guide.profiler import PROFILER
+
+CONNECT_TIMEOUT_S = 3
+READ_TIMEOUT_S = 5
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """프로세스 공용 requests.Session (재시도 + 백오프)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(total=2, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                          allowed_methods=frozenset(["GET"]))
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=retry)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def get_json(url, timeout=(CONNECT_TIMEOUT_S, READ_TIMEOUT_S)):
+    with PROFILER.call(f"http:{urlparse(url).netloc}") as info:
+        resp = get_session().get(url, timeout=timeout)
+        resp.raise_for_status()
+        info["bytes"] = len(resp.content)
+        return resp.json()
+
+
+class CachedValue:
+    """값 + 신선도. stale=True면 만료됐거나 대체값(fallback)이다."""
+
+    def __init__(self, value, stale, fetched_at=None):
+        self.value = value
+        self.stale = stale
+        self.fetched_at = fetched_at
+
+
+class SWREndpoint:
+    """TTL 캐시. 만료된 값은 즉시 돌려주고 갱신은 백그라운드에서 한다.
+
+    값이 한 번도 없으면 fallback을 stale로 돌려주고 역시 백그라운드에서 가져온다.
+    그래서 get()은 절대 네트워크를 기다리지 않는다.
+    """
+
+    _pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="swr")
+
+    def __init__(self, name, fetch, ttl_s, fallback):
+        self.name = name
+        self.fetch = fetch
+        self.ttl_s = ttl_s
+        self.fallback = fallback
+        self._value = None
+        self._fetched_at = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        try:
+            value = self.fetch()
+        except Exception:
+            value = None
+        with self._lock:
+            if value is not None:
+                self._value = value
+                self._fetched_at = time.time()
+            self._refreshing = False
+
+    def _schedule_refresh(self):
+        # 호출자가 lock을 잡고 있어야 한다
+        if not self._refreshing:
+            self._refreshing = True
+            self._pool.submit(self._refresh)
+
+    def get(self):
+        with self._lock:
+            if self._value is None:
+                self._schedule_refresh()
+                return CachedValue(self.fallback, stale=True)
+            fresh = time.time() - self._fetched_at < self.ttl_s
+            if not fresh:
+                self._schedule_refresh()
+            return CachedValue(self._value, stale=not fresh, fetched_at=self._fetched_at)
+
+    def refresh_now(self):
+        """동기 갱신 (테스트/워밍업용)."""
+        with self._lock:
+            self._refreshing = True
+        self._refresh()
+        return self.get()
@@ -0,0 +1,253 @@
+# ---------------------------------------------------------
+# 코스 동선 최적화: 도보 거리 행렬(장소 쌍 LRU) + 방문 순서 풀이(정확해 / 2-opt, or-opt)
+# ---------------------------------------------------------
+import threading
+from collections import OrderedDict, defaultdict
+
+import numpy as np
+
+from guide.geo_utils import haversine_m
+
+WALK_SPEED_M_S = 1.3      # 약 4.7km/h
+DETOUR_FACTOR = 1.25      # 직선거리 -> 실제 도보거리 보정
+EXACT_MAX_STOPS = 10      # 이하면 Held-Karp로 정확해
+FOOD_PENALTY_M = 50_000   # 식당이 코스 중간 구간을 벗어나면 더하는 가상 거리
+GOOGLE_BLOCK = 10         # Distance Matrix 요청 1회당 출발/도착 최대 개수 (10 x 10 = 100 elements)
+MATRIX_MAX_PAIRS = 20_000 # 프로세스 전체에서 기억하는 Google 도보 거리 쌍 수 (넘으면 오래 안 쓴 쌍부터 버림)
+
+
+def stop_key(stop):
+    return (stop['name'], round(stop['lat'], 6), round(stop['lng'], 6))
+
+
+class DistanceMatrix:
+    """stops 순서의 도보 거리 행렬. haversine 추정은 매번 계산하고, backend(Google Distance Matrix)가
+    돌려준 실제 거리만 장소 쌍 단위 LRU에 기억해 덮어쓴다 (backend 실패한 쌍은 추정값 그대로).
+
+    backend 호출은 잠금 밖에서 하고 결과만 잠금 안에서 합친다: 느린 호출이 다른 세션을 막지 않는다.
+    """
+
+    def __init__(self, backend=None, max_pairs=MATRIX_MAX_PAIRS):
+        self.backend = backend
+        self.max_pairs = max_pairs
+        self._pairs = OrderedDict()     # (키, 키) 정렬된 쌍 -> 거리[m] (None = 경로 없음, 추정값 사용)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _pair(a, b):
+        return (a, b) if a <= b else (b, a)
+
+    def _lookup(self, keys):
+        """이미 아는 쌍 {쌍: 거리}와 아직 모르는 쌍 {쌍: (i, j)} (i < j, keys의 인덱스, 같은 쌍은 한 번)."""
+        known, missing = {}, {}
+        with self._lock:
+            for i in range(len(keys)):
+                for j in range(i + 1, len(keys)):
+                    pair = self._pair(keys[i], keys[j])
+                    if keys[i] == keys[j] or pair in known or pair in missing:
+                        continue
+                    if pair in self._pairs:
+                        self._pairs.move_to_end(pair)
+                        known[pair] = self._pairs[pair]
+                    else:
+                        missing[pair] = (i, j)
+        return known, missing
+
+    def _fetch(self, lat, lng, missing):
+        """모르는 쌍만 받는다 (과금되는 element 수 = 모르는 쌍 수). {쌍: 거리}
+
+        출발지별로 아직 필요한 도착지를 모으고, 도착지 목록이 같은 출발지끼리 한 요청에 묶는다.
+        """
+        dests = defaultdict(list)
+        for pair, (i, j) in missing.items():
+            dests[i].append(j)
+        groups = defaultdict(list)
+        for i, js in dests.items():
+            groups[tuple(sorted(js))].append(i)
+        index = {ij: pair for pair, ij in missing.items()}
+        got = {}
+        for cols, rows in groups.items():
+            for a in range(0, len(rows), GOOGLE_BLOCK):
+                rs = rows[a:a + GOOGLE_BLOCK]
+                for b in range(0, len(cols), GOOGLE_BLOCK):
+                    cs = cols[b:b + GOOGLE_BLOCK]
+                    try:
+                        block = self.backend([(lat[r], lng[r]) for r in rs], [(lat[c], lng[c]) for c in cs])
+                    except Exception:
+                        continue
+                    for x, r in enumerate(rs):
+                        for y, c in enumerate(cs):
+                            got[index[r, c]] = block[x][y]
+        return got
+
+    def _remember(self, got):
+        with self._lock:
+            for pair, d in got.items():
+                self._pairs[pair] = d
+                self._pairs.move_to_end(pair)
+            while len(self._pairs) > self.max_pairs:
+                self._pairs.popitem(last=False)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._pairs)
+
+    def matrix(self, stops):
+        """stops 순서의 (n, n) 거리 행렬 [m]."""
+        keys = [stop_key(s) for s in stops]
+        lat = np.array([s['lat'] for s in stops], dtype=float)
+        lng = np.array([s['lng'] for s in stops], dtype=float)
+        dist = haversine_m(lat[:, None], lng[:, None], lat[None, :], lng[None, :]) * DETOUR_FACTOR
+        if self.backend is None:
+            return dist
+        known, missing = self._lookup(keys)
+        if missing:
+            got = self._fetch(lat, lng, missing)
+            self._remember(got)
+            known.update(got)
+        for i in range(len(keys)):
+            for j in range(i + 1, len(keys)):
+                d = known.get(self._pair(keys[i], keys[j]))
+                if d is not None:
+                    dist[i, j] = dist[j, i] = d
+        return dist
+
+
+def google_walking_backend(client):
+    """gmaps.distance_matrix를 (출발 목록, 도착 목록) -> 거리[m] 2차원 리스트로 감싼다."""
+    def fetch(origins, destinations):
+        resp = client.distance_matrix(origins, destinations, mode="walking")
+        out = []
+        for row in resp.get('rows', []):
+            out.append([el['distance']['value'] if el.get('status') == 'OK' else None for el in row['elements']])
+        return out
+    return fetch
+
+
+# --- 순서 풀이 ---------------------------------------------------------------
+def food_band(n):
+    """식당이 있어도 되는 위치 범위 (양 끝 1/3은 제외, 최소한 처음/마지막은 아님)."""
+    edge = max(1, n // 3) if n >= 3 else 0
+    return edge, n - 1 - edge
+
+
+def path_cost(order, dist, food_mask):
+    order = np.asarray(order)
+    cost = dist[order[:-1], order[1:]].sum() if len(order) > 1 else 0.0
+    lo, hi = food_band(len(order))
+    pos = np.nonzero(food_mask[order])[0]
+    return float(cost + FOOD_PENALTY_M * np.count_nonzero((pos < lo) | (pos > hi)))
+
+
+def _held_karp(dist, food_mask, start=None):
+    n = len(dist)
+    lo, hi = food_band(n)
+    size = 1 << n
+    cost = np.full((size, n), np.inf)
+    parent = np.full((size, n), -1, dtype=int)
+    starts = [start] if start is not None else range(n)
+    for s in starts:
+        cost[1 << s, s] = FOOD_PENALTY_M if food_mask[s] and not (lo <= 0 <= hi) else 0.0
+    popcount = np.array([bin(m).count("1") for m in range(size)])
+    for mask in range(1, size):
+        k = popcount[mask]   # 다음에 추가될 위치 = k
+        if k >= n:
+            continue
+        row = cost[mask]
+        ends = np.nonzero(np.isfinite(row))[0]
+        if not len(ends):
+            continue
+        for j in range(n):
+            if mask & (1 << j):
+                continue
+            cand = row[ends] + dist[ends, j]
+            best = int(np.argmin(cand))
+            val = cand[best] + (FOOD_PENALTY_M if food_mask[j] and not (lo <= k <= hi) else 0.0)
+            nm = mask | (1 << j)
+            if val < cost[nm, j]:
+                cost[nm, j] = val
+                parent[nm, j] = ends[best]
+    full = size - 1
+    end = int(np.argmin(cost[full]))
+    order, mask = [], full
+    while end != -1:
+        order.append(end)
+        prev = parent[mask, end]
+        mask ^= 1 << end
+        end = prev
+    return order[::-1]
+
+
+def _nearest_neighbor(dist, start):
+    n = len(dist)
+    order, left = [start], set(range(n)) - {start}
+    while left:
+        cur = order[-1]
+        nxt = min(left, key=lambda j: dist[cur, j])
+        order.append(nxt)
+        left.remove(nxt)
+    return order
+
+
+def _improve(order, dist, food_mask, fixed_start):
+    """2-opt(구간 뒤집기) + or-opt(1~3개 구간 옮기기)를 개선이 없을 때까지 반복."""
+    best = list(order)
+    best_cost = path_cost(best, dist, food_mask)
+    first = 1 if fixed_start else 0
+    improved = True
+    while improved:
+        improved = False
+        n = len(best)
+        for i in range(first, n - 1):
+            for j in range(i + 1, n):
+                cand = best[:i] + best[i:j + 1][::-1] + best[j + 1:]
+                c = path_cost(cand, dist, food_mask)
+                if c < best_cost - 1e-9:
+                    best, best_cost, improved = cand, c, True
+        for seg_len in (1, 2, 3):
+            for i in range(first, n - seg_len + 1):
+                seg = best[i:i + seg_len]
+                rest = best[:i] + best[i + seg_len:]
+                for k in range(first, len(rest) + 1):
+                    if k == i:
+                        continue
+                    cand = rest[:k] + seg + rest[k:]
+                    c = path_cost(cand, dist, food_mask)
+                    if c < best_cost - 1e-9:
+                        best, best_cost, improved = cand, c, True
+                        break
+    return best
+
+
+def solve_order(dist, food_mask, keep_start=False):
+    """열린 경로(돌아오지 않음)의 방문 순서. keep_start면 0번 장소에서 출발."""
+    n = len(dist)
+    if n <= 2:
+        return list(range(n))
+    food_mask = np.asarray(food_mask, dtype=bool)
+    if n <= EXACT_MAX_STOPS:
+        return _held_karp(dist, food_mask, 0 if keep_start else None)
+    starts = [0] if keep_start else range(n)
+    best = min((_nearest_neighbor(dist, s) for s in starts), key=lambda o: path_cost(o, dist, food_mask))
+    return _improve(best, dist, food_mask, keep_start)
+
+
+class ItineraryEngine:
+    def __init__(self, backend=None):
+        self.matrix = DistanceMatrix(backend)
+
+    def plan(self, stops, keep_start=False, optimize=True):
+        """순서가 정해진 stops와 구간별 거리/시간을 담은 dict."""
+        stops = list(stops)
+        dist = self.matrix.matrix(stops)
+        food = [s.get('type') == 'food' for s in stops]
+        order = solve_order(dist, food, keep_start) if optimize else list(range(len(stops)))
+        legs = [float(dist[a, b]) for a, b in zip(order[:-1], order[1:])]
+        total = sum(legs)
+        return {
+            "stops": [stops[i] for i in order],
+            "order": order,
+            "legs_m": legs,
+            "total_m": total,
+            "total_min": total / WALK_SPEED_M_S / 60,
+        }
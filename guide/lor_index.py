@@ -0,0 +1,141 @@
+# ---------------------------------------------------------
+# LOR(동네) 공간 인덱스: 점 포함 검색, 반경 내 범죄 밀도, 안전 점수
+# ---------------------------------------------------------
+from collections import defaultdict
+
+import numpy as np
+
+from guide.geo_boundaries import simplified_boundaries
+from guide.geo_utils import haversine_m, ring_area_centroid, ring_contains
+
+GRID_CELL_DEG = 0.01  # 격자 한 칸 (약 1.1km x 0.7km)
+
+
+def _polygons(geom):
+    coords = geom.get("coordinates", [])
+    if geom.get("type") == "Polygon":
+        coords = [coords]
+    elif geom.get("type") != "MultiPolygon":
+        return []
+    return [[np.asarray(r, dtype=float)[:, :2] for r in poly] for poly in coords if poly]
+
+
+def _cell(lng, lat):
+    return int(np.floor(lng / GRID_CELL_DEG)), int(np.floor(lat / GRID_CELL_DEG))
+
+
+class LorIndex:
+    """LOR 폴리곤 위의 균일 격자 인덱스.
+
+    격자 칸마다 bbox가 겹치는 LOR 목록을 미리 저장하므로, 점 검색은 칸 1개의 후보만
+    폴리곤 판정하면 된다. 반경/뷰포트 질의는 무게중심/bbox 배열에 대한 벡터 연산이다.
+    """
+
+    def __init__(self, features):
+        self.keys, self.names, self.polys = [], [], []
+        bboxes, centroids, areas = [], [], []
+        for key, name, geom in features:
+            polys = _polygons(geom)
+            if not polys:
+                continue
+            pts = np.vstack([poly[0] for poly in polys])
+            outer = [ring_area_centroid(poly[0]) for poly in polys]
+            area = sum(a for a, _ in outer)
+            main = max(outer, key=lambda o: o[0])[1]
+            self.keys.append(key)
+            self.names.append(name)
+            self.polys.append(polys)
+            bboxes.append((pts[:, 0].min(), pts[:, 1].min(), pts[:, 0].max(), pts[:, 1].max()))
+            centroids.append(main)
+            areas.append(max(area, 1e-6))
+        self.bboxes = np.asarray(bboxes, dtype=float).reshape(-1, 4)  # (west, south, east, north)
+        self.centroids = np.asarray(centroids, dtype=float).reshape(-1, 2)  # (lat, lng)
+        self.areas_km2 = np.asarray(areas, dtype=float)
+        self.key_pos = {k: i for i, k in enumerate(self.keys)}
+
+        self.grid = defaultdict(list)
+        for i, (w, s, e, n) in enumerate(self.bboxes):
+            c0, r0 = _cell(w, s)
+            c1, r1 = _cell(e, n)
+            for cx in range(c0, c1 + 1):
+                for cy in range(r0, r1 + 1):
+                    self.grid[(cx, cy)].append(i)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def locate(self, lat, lng):
+        """점을 포함하는 LOR 키. 없으면 None."""
+        for i in self.grid.get(_cell(lng, lat), ()):
+            w, s, e, n = self.bboxes[i]
+            if not (w <= lng <= e and s <= lat <= n):
+                continue
+            for poly in self.polys[i]:
+                if ring_contains(poly[0], lng, lat) and not any(ring_contains(h, lng, lat) for h in poly[1:]):
+                    return self.keys[i]
+        return None
+
+    def within_radius(self, lat, lng, radius_m):
+        """무게중심이 반경 안에 있는 LOR 인덱스 배열."""
+        if not len(self):
+            return np.empty(0, dtype=int)
+        d = haversine_m(lat, lng, self.centroids[:, 0], self.centroids[:, 1])
+        return np.nonzero(d <= radius_m)[0]
+
+    def in_viewport(self, south, west, north, east):
+        """bbox가 화면 영역과 겹치는 LOR 인덱스 배열."""
+        b = self.bboxes
+        hit = (b[:, 0] <= east) & (b[:, 2] >= west) & (b[:, 1] <= north) & (b[:, 3] >= south)
+        return np.nonzero(hit)[0]
+
+    def coverage(self, codes):
+        """범죄 데이터의 LOR 코드 중 경계가 있는 비율 (코드 체계가 다른 파일이면 0에 가깝다)."""
+        codes = set(codes)
+        return len(codes & set(self.keys)) / len(codes) if codes else 0.0
+
+    def value_array(self, values):
+        """dict(키 -> 값)를 인덱스 순서의 배열로 (없는 키는 0)."""
+        return np.asarray([values.get(k, 0) for k in self.keys], dtype=float)
+
+    def densities(self, values):
+        """LOR별 범죄 밀도 [건/km²]."""
+        return self.value_array(values) / self.areas_km2
+
+    def density_within(self, lat, lng, radius_m, values):
+        """반경 r 안의 범죄 밀도 [건/km²]. 반경 안에 무게중심이 없으면 포함 LOR 값을 쓴다."""
+        idx = self.within_radius(lat, lng, radius_m)
+        if not len(idx):
+            key = self.locate(lat, lng)
+            if key is None:
+                return None
+            idx = np.asarray([self.key_pos[key]])
+        vals = self.value_array(values)
+        return float(vals[idx].sum() / self.areas_km2[idx].sum())
+
+
+class SafetyScorer:
+    """위치별 안전 점수(0~100, 높을수록 안전). 주변 밀도의 전체 LOR 대비 백분위로 계산."""
+
+    def __init__(self, index, values, radius_m=500):
+        self.index = index
+        self.values = values
+        self.radius_m = radius_m
+        self.sorted_density = np.sort(index.densities(values)) if len(index) else np.empty(0)
+
+    def score(self, lat, lng):
+        if not len(self.sorted_density):
+            return None
+        density = self.index.density_within(lat, lng, self.radius_m, self.values)
+        if density is None:
+            return None
+        pct = np.searchsorted(self.sorted_density, density, side='right') / len(self.sorted_density)
+        return int(round(100 * (1 - pct)))
+
+
+def build_lor_index(tolerance=0.00005):
+    """캐시된 LOR 경계로 인덱스를 만든다. 경계 파일이 없으면 None."""
+    features = simplified_boundaries("lor", tolerance)
+    if not features:
+        return None
+    index = LorIndex(features)
+    return index if len(index) else None
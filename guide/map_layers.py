@@ -0,0 +1,163 @@
+# ---------------------------------------------------------
+# 지도 레이어 관리: 입력값을 키로 Folium 레이어를 캐시하고 바뀐 레이어만 다시 만든다
+# ---------------------------------------------------------
+from collections import OrderedDict
+
+import branca.colormap
+import folium
+
+from guide.profiler import PROFILER
+
+DEFAULT_CENTER = [52.5200, 13.4050]
+
+# 장소 타입별 마커 모양
+PLACE_STYLES = {
+    'restaurant': {"name": "식당", "color": 'green', "icon": 'cutlery'},
+    'lodging': {"name": "숙소", "color": 'blue', "icon": 'bed'},
+    'tourist_attraction': {"name": "명소", "color": 'purple', "icon": 'camera'},
+}
+
+
+class LayerCache:
+    """key -> folium.FeatureGroup LRU. 같은 입력이면 같은 객체를 돌려준다.
+
+    st_folium이 렌더링 중에 레이어를 수정(_id, parent)하므로 세션마다 하나씩 둔다.
+    """
+
+    def __init__(self, max_layers=32):
+        self.max_layers = max_layers
+        self._layers = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build):
+        layer = self._layers.get(key)
+        PROFILER.count_cache("map_layer", layer is not None)
+        if layer is None:
+            self.misses += 1
+            layer = build()
+            self._layers[key] = layer
+            while len(self._layers) > self.max_layers:
+                self._layers.popitem(last=False)
+        else:
+            self.hits += 1
+            self._layers.move_to_end(key)
+        return layer
+
+
+def base_map(zoom_start=14, location=None):
+    """레이어 없는 기본 지도. 내용이 항상 같으므로 st_folium이 다시 마운트하지 않는다."""
+    return folium.Map(location=location or DEFAULT_CENTER, zoom_start=zoom_start)
+
+
+def place_popup_html(p, extra_html=""):
+    return (
+        f"<div style='font-family:sans-serif; width:150px'>"
+        f"<b>{p['name']}</b><br>"
+        f"⭐{p['rating']}<br>"
+        f"{extra_html}"
+        f"<a href='{p['link']}' target='_blank' style='text-decoration:none; color:blue;'>👉 구글 상세정보</a>"
+        f"</div>"
+    )
+
+
+def places_key(place_type, places):
+    """장소 목록 내용으로 만든 레이어 키 (같은 결과면 같은 키)."""
+    return ("places", place_type, tuple((p['name'], p['lat'], p['lng']) for p in places))
+
+
+def _cluster_icon(count, color):
+    size = 28 if count < 10 else 34 if count < 100 else 42
+    return folium.DivIcon(
+        icon_size=(size, size), icon_anchor=(size // 2, size // 2),
+        html=(f"<div style='width:{size}px;height:{size}px;border-radius:50%;background:{color};opacity:0.8;"
+              f"color:white;font:bold 12px sans-serif;display:flex;align-items:center;justify-content:center'>"
+              f"{count}</div>"),
+    )
+
+
+def build_poi_layer(place_type, clusters, singles):
+    """클러스터 + 개별 마커. 팝업 HTML은 넣지 않고 툴팁만 (상세는 클릭 시 따로 불러온다)."""
+    style = PLACE_STYLES[place_type]
+    fg = folium.FeatureGroup(name=style["name"])
+    for c in clusters:
+        folium.Marker([c['lat'], c['lng']], tooltip=f"{style['name']} {c['count']}곳",
+                      icon=_cluster_icon(c['count'], style["color"])).add_to(fg)
+    for p in singles:
+        folium.Marker(
+            [p['lat'], p['lng']], tooltip=p['name'],
+            icon=folium.Icon(color=style["color"], icon=style["icon"], prefix='fa')
+        ).add_to(fg)
+    return fg
+
+
+def build_search_layer(sm):
+    fg = folium.FeatureGroup(name="검색")
+    folium.Marker(
+        [sm['lat'], sm['lng']],
+        popup=sm['name'],
+        icon=folium.Icon(color='red', icon='info-sign')
+    ).add_to(fg)
+    return fg
+
+
+def build_value_layer(name, geojson, value_key, aliases, colors=('#ffffb2', '#fd8d3c', '#bd0026'), opacity=0.4,
+                      value_range=None):
+    """properties[value_key] 값으로 칠한 GeoJSON 레이어 (Choropleth 대신 동적 추가가 가능한 형태).
+
+    value_range=(vmin, vmax)를 주면 색 범위를 고정한다 (증감률처럼 0이 가운데여야 할 때).
+    """
+    values = [f['properties'].get(value_key) for f in geojson['features']]
+    values = [v for v in values if v is not None]
+    vmin, vmax = value_range or ((min(values), max(values)) if values else (0, 1))
+    colormap = branca.colormap.LinearColormap(list(colors), vmin=vmin, vmax=max(vmax, vmin + 1))
+
+    def style(feature):
+        v = feature['properties'].get(value_key)
+        return {"fillColor": colormap(v) if v is not None else "#cccccc",
+                "color": "#555", "weight": 0.5, "fillOpacity": opacity}
+
+    fg = folium.FeatureGroup(name=name)
+    folium.GeoJson(
+        geojson, style_function=style,
+        tooltip=folium.GeoJsonTooltip(["name", value_key], aliases=list(aliases)),
+    ).add_to(fg)
+    return fg
+
+
+def course_popup_html(i, item):
+    link = f"https://www.google.com/search?q={item['name'].replace(' ', '+')}+Berlin"
+    return (
+        f"<div style='font-family:sans-serif; width:180px'>"
+        f"<b>{i+1}. {item['name']}</b><br>"
+        f"{item['desc']}<br>"
+        f"<a href='{link}' target='_blank' style='color:blue;'>👉 구글 상세정보</a>"
+        f"</div>"
+    )
+
+
+def build_course_layer(name, items):
+    fg = folium.FeatureGroup(name=name)
+    points = []
+    for i, item in enumerate(items):
+        loc = [item['lat'], item['lng']]
+        points.append(loc)
+        color = 'orange' if item['type'] == 'food' else 'blue'
+        icon = 'cutlery' if item['type'] == 'food' else 'camera'
+        folium.Marker(
+            loc, popup=course_popup_html(i, item), tooltip=f"{i+1}. {item['name']}",
+            icon=folium.Icon(color=color, icon=icon)
+        ).add_to(fg)
+    folium.PolyLine(points, color="red", weight=4, opacity=0.7).add_to(fg)
+    return fg
+
+
+def build_safe_route_layer(name, legs):
+    """안전 경로 구간들(SafetyGrid.route 결과)을 잇는 선."""
+    fg = folium.FeatureGroup(name=name)
+    for leg in legs:
+        folium.PolyLine(
+            leg['path'], color="green", weight=5, opacity=0.8,
+            tooltip=f"{leg['length_m']:.0f}m · 위험도 {leg['risk'] * 100:.0f} (직선 {leg['direct_risk'] * 100:.0f})",
+        ).add_to(fg)
+    return fg
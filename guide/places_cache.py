@@ -0,0 +1,344 @@
+# ---------------------------------------------------------
+# Google Places 캐시: geohash 타일 + TTL + LRU(SQLite) + 동시 요청 합치기
+# ---------------------------------------------------------
+import contextvars
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from googlemaps.exceptions import ApiError
+
+from guide.crime_store import CACHE_ROOT
+from guide.profiler import PROFILER
+
+DB_PATH = CACHE_ROOT / "places.sqlite"
+TILE_PRECISION = 6          # geohash 6자리 = 약 1.2km x 0.6km
+DEFAULT_TTL_S = 24 * 3600
+DEFAULT_MAX_ENTRIES = 5000
+NEXT_PAGE_DELAY_S = 2.0     # next_page_token은 발급 직후 잠시 동안 유효하지 않다 (INVALID_REQUEST)
+PAGE_TOKEN_MAX_AGE_S = 120  # 토큰은 몇 분 안에 만료되므로, 이보다 오래된 토큰은 쓰지 않고 앞 페이지부터 다시 받는다
+ACCESS_TOUCH_S = 60         # last_access는 이만큼 지났을 때만 다시 쓴다 (읽을 때마다 커밋하지 않도록)
+PAGE_WORKERS = 2            # 2페이지 이상 요청 전용 스레드 (토큰 대기가 첫 페이지 요청을 막지 않도록)
+PREFETCH_TRACKED = 2000     # 적중률 계산용으로 기억하는 미리 받은 키 수
+
+PLACE_DESC = {'restaurant': "맛집", 'lodging': "숙소", 'tourist_attraction': "명소"}
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+# --- geohash ---------------------------------------------------------------
+def geohash_encode(lat, lng, precision=TILE_PRECISION):
+    lat_rng, lng_rng = [-90.0, 90.0], [-180.0, 180.0]
+    out, bits, ch, even = [], 0, 0, True
+    while len(out) < precision:
+        rng, val = (lng_rng, lng) if even else (lat_rng, lat)
+        mid = (rng[0] + rng[1]) / 2
+        ch <<= 1
+        if val >= mid:
+            ch |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            out.append(_BASE32[ch])
+            bits, ch = 0, 0
+    return "".join(out)
+
+
+def geohash_bounds(gh):
+    """(south, west, north, east)"""
+    lat_rng, lng_rng = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for c in gh:
+        cd = _BASE32.index(c)
+        for shift in range(4, -1, -1):
+            rng = lng_rng if even else lat_rng
+            mid = (rng[0] + rng[1]) / 2
+            if (cd >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return lat_rng[0], lng_rng[0], lat_rng[1], lng_rng[1]
+
+
+def geohash_center(gh):
+    s, w, n, e = geohash_bounds(gh)
+    return (s + n) / 2, (w + e) / 2
+
+
+def geohash_neighbors(gh):
+    """주변 8개 타일."""
+    s, w, n, e = geohash_bounds(gh)
+    dlat, dlng = n - s, e - w
+    lat, lng = (s + n) / 2, (w + e) / 2
+    return [geohash_encode(lat + dy * dlat, lng + dx * dlng, len(gh))
+            for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dy or dx]
+
+
+# --- 결과 변환 ---------------------------------------------------------------
+def to_place(place, place_type):
+    name = place.get('name', 'Unknown')
+    search_query = f"{name} Berlin".replace(" ", "+")
+    return {
+        "name": name,
+        "lat": place['geometry']['location']['lat'],
+        "lng": place['geometry']['location']['lng'],
+        "rating": place.get('rating', 'N/A'),
+        "address": place.get('vicinity', ''),
+        "type": place_type,
+        "desc": PLACE_DESC.get(place_type, "장소"),
+        "link": f"https://www.google.com/search?q={search_query}",
+    }
+
+
+# --- 저장소 ------------------------------------------------------------------
+class PlacesCache:
+    """(type, tile, radius, page) -> 결과 목록. TTL 만료 + 최근 사용 기준 LRU 축출."""
+
+    def __init__(self, db_path=DB_PATH, ttl_s=DEFAULT_TTL_S, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        if str(db_path) != ":memory:":
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS places ("
+                " key TEXT PRIMARY KEY, payload TEXT NOT NULL, next_token TEXT,"
+                " fetched_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_places_access ON places(last_access)")
+            self._conn.commit()
+
+    def get(self, key, stale_ok=False, touch=True):
+        """(results, next_token) 또는 None (없거나 만료).
+
+        만료된 행은 지우지 않는다: 예산 소진/장애 때 stale_ok=True로 대신 쓴다 (공간은 LRU가 정리).
+        touch=False면 LRU 시각을 건드리지 않는다 (있는지 확인만 할 때).
+        next_token은 '다음 페이지가 있다'는 표시로만 믿고, 호출에는 fresh_token()을 쓴다.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, next_token, fetched_at, last_access FROM places WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (now - row[2] > self.ttl_s and not stale_ok):
+                return None
+            if touch and now - row[3] > ACCESS_TOUCH_S:
+                self._conn.execute("UPDATE places SET last_access = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+        return json.loads(row[0]), row[1]
+
+    def fresh_token(self, key, max_age_s=PAGE_TOKEN_MAX_AGE_S):
+        """max_age_s 안에 받은 행의 next_token, 아니면 None."""
+        with self._lock:
+            row = self._conn.execute("SELECT next_token, fetched_at FROM places WHERE key = ?", (key,)).fetchone()
+        if row is None or time.time() - row[1] > max_age_s:
+            return None
+        return row[0]
+
+    def put(self, key, results, next_token=None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO places (key, payload, next_token, fetched_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(results, ensure_ascii=False), next_token, now, now),
+            )
+            overflow = self._conn.execute("SELECT COUNT(*) FROM places").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM places WHERE key IN"
+                    " (SELECT key FROM places ORDER BY last_access ASC LIMIT ?)", (overflow,)
+                )
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM places").fetchone()[0]
+
+
+class PlacesService:
+    """places_nearby 호출을 타일 단위로 캐시하고, 같은 키의 동시 요청은 한 번만 보낸다."""
+
+    def __init__(self, client, cache, max_workers=4):
+        self.client = client
+        self.cache = cache
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="places")
+        self._page_pool = ThreadPoolExecutor(max_workers=PAGE_WORKERS, thread_name_prefix="places-page")
+        self._prefetched = OrderedDict()   # 미리 받았지만 아직 화면 요청이 읽지 않은 키
+        self.prefetch_fetched = 0
+        self.prefetch_used = 0
+
+    @staticmethod
+    def tile_for(lat, lng):
+        return geohash_encode(lat, lng, TILE_PRECISION)
+
+    @staticmethod
+    def cache_key(place_type, tile, radius_m, page):
+        return f"{place_type}:{tile}:{radius_m}:{page}"
+
+    def _coalesced(self, key, fetch):
+        """같은 key를 이미 가져오는 중이면 그 결과를 기다린다."""
+        with self._inflight_lock:
+            fut = self._inflight.get(key)
+            owner = fut is None
+            if owner:
+                fut = Future()
+                self._inflight[key] = fut
+        if not owner:
+            return fut.result()
+        try:
+            result = fetch()
+            fut.set_result(result)
+            return result
+        except BaseException as exc:
+            fut.set_exception(exc)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+    def _store(self, key, place_type, resp):
+        results = [to_place(p, place_type) for p in resp.get('results', [])]
+        token = resp.get('next_page_token')
+        self.cache.put(key, results, token)
+        return results, token
+
+    def _download_first(self, place_type, tile, radius_m):
+        """타일 중심 기준 첫 페이지를 받아 캐시에 넣는다."""
+        lat, lng = geohash_center(tile)
+        with PROFILER.call("places_nearby") as info:
+            resp = self.client.places_nearby(location=(lat, lng), radius=radius_m, type=place_type)
+            info["bytes"] = len(json.dumps(resp))
+        return self._store(self.cache_key(place_type, tile, radius_m, 0), place_type, resp)
+
+    def _download_page(self, key, place_type, token):
+        with PROFILER.call("places_nearby_page") as info:
+            try:
+                resp = self.client.places_nearby(page_token=token)
+            except ApiError as exc:
+                # 발급 직후의 토큰은 INVALID_REQUEST로 거절된다: 잠시 기다렸다 한 번만 다시 보낸다
+                if exc.status != 'INVALID_REQUEST':
+                    raise
+                time.sleep(NEXT_PAGE_DELAY_S)
+                resp = self.client.places_nearby(page_token=token)
+            info["bytes"] = len(json.dumps(resp))
+        return self._store(key, place_type, resp)
+
+    def _fresh_token(self, place_type, tile, radius_m, page):
+        """page 다음 페이지를 받을 수 있는 토큰. 캐시의 토큰이 오래됐으면 첫 페이지부터 다시 받아 새로 얻는다."""
+        token = self.cache.fresh_token(self.cache_key(place_type, tile, radius_m, page))
+        if token:
+            return token
+        PROFILER.count("places_token_refresh")
+        if page == 0:
+            return self._download_first(place_type, tile, radius_m)[1]
+        prev = self._fresh_token(place_type, tile, radius_m, page - 1)
+        if not prev:
+            return None
+        return self._download_page(self.cache_key(place_type, tile, radius_m, page), place_type, prev)[1]
+
+    def _fetch_page(self, place_type, tile, radius_m, page):
+        key = self.cache_key(place_type, tile, radius_m, page)
+        hit = self.cache.get(key)
+        PROFILER.count_cache("places_tile", hit is not None)
+        if hit is not None:
+            with self._inflight_lock:
+                prefetched = self._prefetched.pop(key, None)
+            if prefetched is not None:
+                self.prefetch_used += 1
+                PROFILER.count("prefetch_used")
+            return hit
+
+        def fetch():
+            hit = self.cache.get(key)
+            if hit is not None:
+                return hit
+            if page == 0:
+                return self._download_first(place_type, tile, radius_m)
+            prev = self._fetch_page(place_type, tile, radius_m, page - 1)
+            if not prev[1]:
+                return [], None
+            token = self._fresh_token(place_type, tile, radius_m, page - 1)
+            if not token:
+                return [], None
+            return self._download_page(key, place_type, token)
+
+        def fetch_or_stale():
+            try:
+                return fetch()
+            except Exception:
+                # 예산 소진/쿼터/네트워크 오류: 만료된 캐시라도 있으면 그것을 보여준다
+                stale = self.cache.get(key, stale_ok=True)
+                PROFILER.count_cache("places_stale", stale is not None)
+                if stale is None:
+                    raise
+                return stale
+
+        return self._coalesced(key, fetch_or_stale)
+
+    def nearby(self, place_type, lat, lng, radius_m=2000, pages=1):
+        """타일 중심 기준 주변 장소. pages만큼의 페이지를 (필요할 때만) 가져와 이어 붙인다."""
+        if self.client is None:
+            return []
+        tile = self.tile_for(lat, lng)
+        out = []
+        try:
+            for page in range(pages):
+                results, token = self._fetch_page(place_type, tile, radius_m, page)
+                out.extend(results)
+                if not token:
+                    break
+        except Exception as exc:
+            # 캐시에도 없는 페이지: 받은 데까지만 보여주고 원인은 지표로 남긴다 (예산 소진은 스케줄러가 센다)
+            PROFILER.count(f"places_failed:{type(exc).__name__}")
+        return out
+
+    def is_cached(self, place_type, lat, lng, radius_m=2000):
+        return self.cache.get(self.cache_key(place_type, self.tile_for(lat, lng), radius_m, 0), touch=False) is not None
+
+    def prefetch(self, place_type, lat, lng, radius_m=2000):
+        """첫 페이지를 캐시에 미리 받아 둔다. 새로 받았으면 True.
+
+        _coalesced를 거치지 않으므로, 그사이 같은 타일의 화면 요청은 스케줄러에서 이 요청과 합쳐지며
+        우선순위를 올린다 (여기서 기다리게 하면 PREFETCH 대기열 뒤에 묶인다).
+        """
+        if self.client is None:
+            return False
+        tile = self.tile_for(lat, lng)
+        key = self.cache_key(place_type, tile, radius_m, 0)
+        if self.cache.get(key) is not None:
+            return False
+        self._download_first(place_type, tile, radius_m)
+        with self._inflight_lock:
+            self._prefetched[key] = time.time()
+            while len(self._prefetched) > PREFETCH_TRACKED:
+                self._prefetched.popitem(last=False)
+            self.prefetch_fetched += 1
+        return True
+
+    def has_more(self, place_type, lat, lng, radius_m=2000, pages=1):
+        """이미 받은 마지막 페이지에 다음 페이지 토큰이 있는지 (네트워크 호출 없음)."""
+        hit = self.cache.get(self.cache_key(place_type, self.tile_for(lat, lng), radius_m, pages - 1), touch=False)
+        return bool(hit and hit[1])
+
+    def nearby_many(self, place_types, lat, lng, radius_m=2000, pages=None):
+        """여러 타입을 병렬로 가져온다. pages: {type: 페이지 수}."""
+        pages = pages or {}
+        # 세션/우선순위(google_scheduler의 contextvar)를 작업 스레드로 넘긴다
+        # 다음 페이지는 토큰 대기(NEXT_PAGE_DELAY_S)가 있을 수 있어 따로 돌린다
+        futures = {t: (self._page_pool if pages.get(t, 1) > 1 else self._pool).submit(
+                       contextvars.copy_context().run, self.nearby, t, lat, lng, radius_m, pages.get(t, 1))
+                   for t in place_types}
+        return {t: f.result() for t, f in futures.items()}
@@ -0,0 +1,83 @@
+# ---------------------------------------------------------
+# 대량 POI용 격자 클러스터링 (줌 단계별 사전 계산) + 화면 영역 컬링
+# ---------------------------------------------------------
+import numpy as np
+
+MIN_ZOOM, MAX_ZOOM = 8, 18
+CLUSTER_PX = 60          # 이 픽셀 크기 격자 안의 점들을 하나로 묶는다
+TILE_PX = 256
+
+
+def _mercator(lat, lng):
+    """Web Mercator 0~1 좌표."""
+    x = (np.asarray(lng, dtype=float) + 180.0) / 360.0
+    s = np.sin(np.radians(np.clip(lat, -85.0, 85.0)))
+    y = 0.5 - np.log((1 + s) / (1 - s)) / (4 * np.pi)
+    return x, y
+
+
+class ZoomLevel:
+    """한 줌 단계의 클러스터: 대표 좌표, 개수, 구성원 인덱스(offsets로 잘라 씀)."""
+
+    def __init__(self, lat, lng, x, y, zoom):
+        cell = CLUSTER_PX / (TILE_PX * 2 ** zoom)
+        cx = np.floor(x / cell).astype(np.int64)
+        cy = np.floor(y / cell).astype(np.int64)
+        ids = cx * (1 << 31) + cy
+        uniq, inverse, counts = np.unique(ids, return_inverse=True, return_counts=True)
+        order = np.argsort(inverse, kind="stable")
+        self.members = order
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+        self.count = counts
+        self.lat = np.bincount(inverse, weights=lat) / counts
+        self.lng = np.bincount(inverse, weights=lng) / counts
+
+    def member_indices(self, c):
+        return self.members[self.offsets[c]:self.offsets[c + 1]]
+
+
+class PoiIndex:
+    """POI 목록(dict: lat, lng, ...)을 줌 단계별로 미리 묶어 두고 화면 안의 것만 돌려준다."""
+
+    def __init__(self, points):
+        self.points = list(points)
+        self.lat = np.asarray([p['lat'] for p in self.points], dtype=float)
+        self.lng = np.asarray([p['lng'] for p in self.points], dtype=float)
+        x, y = _mercator(self.lat, self.lng)
+        self.levels = {z: ZoomLevel(self.lat, self.lng, x, y, z) for z in range(MIN_ZOOM, MAX_ZOOM + 1)} \
+            if self.points else {}
+
+    def __len__(self):
+        return len(self.points)
+
+    def query(self, zoom, viewport=None, pad=0.2):
+        """(clusters, singles) 반환.
+
+        clusters: [{"lat", "lng", "count", "members": [point, ...]}], singles: [point, ...]
+        viewport: (south, west, north, east). pad 비율만큼 바깥까지 포함해 가장자리 깜빡임을 줄인다.
+        """
+        if not self.points:
+            return [], []
+        level = self.levels[int(min(max(round(zoom), MIN_ZOOM), MAX_ZOOM))]
+        mask = np.ones(len(level.count), dtype=bool)
+        if viewport:
+            s, w, n, e = viewport
+            dlat, dlng = (n - s) * pad, (e - w) * pad
+            mask = (level.lat >= s - dlat) & (level.lat <= n + dlat) & (level.lng >= w - dlng) & (level.lng <= e + dlng)
+        clusters, singles = [], []
+        for c in np.nonzero(mask)[0]:
+            idx = level.member_indices(c)
+            if len(idx) == 1:
+                singles.append(self.points[idx[0]])
+            else:
+                clusters.append({"lat": float(level.lat[c]), "lng": float(level.lng[c]), "count": int(level.count[c]),
+                                 "members": [self.points[i] for i in idx]})
+        return clusters, singles
+
+    def nearest(self, lat, lng, max_deg=1e-4):
+        """클릭 좌표에 가장 가까운 POI (없으면 None)."""
+        if not self.points:
+            return None
+        d = (self.lat - lat) ** 2 + (self.lng - lng) ** 2
+        i = int(np.argmin(d))
+        return self.points[i] if d[i] <= max_deg ** 2 else None
@@ -0,0 +1,111 @@
+# ---------------------------------------------------------
+# 장소 미리 가져오기: 다음에 켤 법한 타일(코스 정류장, 검색 위치와 주변 타일)을 백그라운드에서 캐시에 넣는다
+#   Google 호출은 스케줄러의 PREFETCH 우선순위로 나가고, 시간당 호출 수와 한 번에 넣는 작업 수를 제한한다
+# ---------------------------------------------------------
+import contextvars
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from guide.google_scheduler import PREFETCH, request_context
+from guide.places_cache import geohash_center, geohash_neighbors
+from guide.profiler import PROFILER
+
+PLACE_TYPES = ('restaurant', 'lodging', 'tourist_attraction')
+MAX_JOBS_PER_TRIGGER = 16       # 검색/테마 선택 한 번에 넣는 (타입, 타일) 작업 수
+HOURLY_BUDGET = 300             # 프로세스 전체에서 한 시간에 미리 가져오기로 쓰는 호출 수
+WORKERS = 2
+
+
+class Prefetcher:
+    """(타입, 타일) 작업을 중복 없이 스레드 풀에 넣는다. 이미 캐시에 있으면 예산을 쓰지 않는다."""
+
+    def __init__(self, places, hourly_budget=HOURLY_BUDGET, max_jobs=MAX_JOBS_PER_TRIGGER, workers=WORKERS):
+        self.places = places
+        self.hourly_budget = hourly_budget
+        self.max_jobs = max_jobs
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self._queued = set()
+        self._spent = deque()     # 최근 한 시간 동안 예산을 쓴 시각
+        self.stats = defaultdict(int)
+
+    def _count(self, name):
+        self.stats[name] += 1
+        PROFILER.count(f"prefetch_{name}")
+
+    def _take_budget(self):
+        now = time.time()
+        while self._spent and now - self._spent[0] > 3600:
+            self._spent.popleft()
+        if len(self._spent) >= self.hourly_budget:
+            return False
+        self._spent.append(now)
+        return True
+
+    def schedule(self, jobs, radius_m=2000):
+        """jobs: [(place_type, lat, lng)] 앞쪽이 더 중요. 넣은 작업 수를 돌려준다."""
+        submitted, seen = 0, set()
+        for place_type, lat, lng in jobs:
+            if submitted >= self.max_jobs:
+                break
+            key = (place_type, self.places.tile_for(lat, lng), radius_m)
+            if key in seen:
+                continue
+            seen.add(key)
+            if self.places.is_cached(place_type, lat, lng, radius_m):
+                self._count("skipped_cached")
+                continue
+            with self._lock:
+                if key in self._queued:
+                    continue
+                if not self._take_budget():
+                    self._count("dropped_budget")
+                    break
+                self._queued.add(key)
+            # 세션 id를 작업 스레드로 넘긴다 (스케줄러의 세션별 공정 대기열)
+            self._pool.submit(contextvars.copy_context().run, self._run, key, lat, lng)
+            submitted += 1
+        return submitted
+
+    def _run(self, key, lat, lng):
+        place_type, _, radius_m = key
+        try:
+            with request_context(priority=PREFETCH):
+                self._count("fetched" if self.places.prefetch(place_type, lat, lng, radius_m) else "skipped_cached")
+        except Exception:
+            # 예산 예비분 도달/쿼터/네트워크 오류: 미리 가져오기는 버린다 (화면 요청이 다시 시도한다)
+            self._count("failed")
+        finally:
+            with self._lock:
+                self._queued.discard(key)
+
+    def around(self, lat, lng, visible_types=(), radius_m=2000):
+        """새 지도 중심: 중심 타일의 꺼진 타입 -> 주변 8타일의 켜진 타입 순.
+
+        중심 타일의 켜진 타입은 지금 실행이 바로 가져오므로 넣지 않는다. 주변 타일의 꺼진 타입까지
+        넣으면 호출은 세 배인데 쓰이는 일은 드물어서 뺐다 (bench의 적중률로 확인).
+        """
+        neighbors = [geohash_center(gh) for gh in geohash_neighbors(self.places.tile_for(lat, lng))]
+        jobs = [(t, lat, lng) for t in PLACE_TYPES if t not in visible_types]
+        jobs += [(t, a, b) for t in visible_types for a, b in neighbors]
+        return self.schedule(jobs, radius_m)
+
+    def along(self, stops, place_types=PLACE_TYPES, radius_m=2000):
+        """코스 정류장마다 (검색하면 지도 중심이 정류장 좌표가 된다) 모든 타입의 첫 페이지."""
+        return self.schedule([(t, s['lat'], s['lng']) for s in stops for t in place_types], radius_m)
+
+    def snapshot(self):
+        fetched, used = self.places.prefetch_fetched, self.places.prefetch_used
+        with self._lock:
+            queued = len(self._queued)
+            spent = len(self._spent)
+        return {
+            **dict(self.stats),
+            "queued": queued,
+            "budget_used_1h": spent,
+            "hourly_budget": self.hourly_budget,
+            "used": used,
+            "hit_rate": used / fetched if fetched else None,   # 미리 받은 타일 중 화면 요청이 실제로 읽은 비율
+        }
@@ -0,0 +1,176 @@
+# ---------------------------------------------------------
+# rerun 프로파일러: 단계별 시간, 캐시 적중률, 외부 호출 지연/크기, 이벤트 횟수, JSON/Prometheus 내보내기
+# ---------------------------------------------------------
+import functools
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+
+SAMPLES_PER_METRIC = 1000   # 분위수 계산에 쓰는 최근 표본 수
+
+
+class _Series:
+    def __init__(self):
+        self.samples = deque(maxlen=SAMPLES_PER_METRIC)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value):
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+
+    def quantiles(self):
+        if not self.samples:
+            return {"p50": None, "p95": None}
+        arr = np.fromiter(self.samples, dtype=float)
+        p50, p95 = np.percentile(arr, [50, 95])
+        return {"p50": float(p50), "p95": float(p95)}
+
+
+class Profiler:
+    """프로세스 전체 집계 + 스레드(=Streamlit 세션 실행)별 현재 rerun 기록."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.stages = defaultdict(_Series)          # 단계 이름 -> 소요 시간[s]
+        self.cache = defaultdict(lambda: [0, 0])    # 캐시 이름 -> [hit, miss]
+        self.calls = defaultdict(_Series)           # 외부 호출 이름 -> 지연[s]
+        self.call_bytes = defaultdict(int)
+        self.call_errors = defaultdict(int)
+        self.counters = defaultdict(int)            # 이벤트 이름 -> 횟수
+        self.last_run = {}
+
+    # --- 단계 타이머 -----------------------------------------------------------
+    def begin_run(self):
+        """스크립트 실행 시작. 이후 stage() 기록은 end_run()까지 last_run으로 모인다."""
+        self._local.current = {}
+        self._local.started = time.perf_counter()
+
+    def end_run(self, name="rerun"):
+        current = getattr(self._local, "current", None)
+        if current is None:
+            return
+        elapsed = time.perf_counter() - self._local.started
+        current[name] = elapsed
+        self._local.current = None
+        with self._lock:
+            self.stages[name].add(elapsed)
+            self.last_run = current
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            current = getattr(self._local, "current", None)
+            if current is not None:
+                current[name] = current.get(name, 0.0) + elapsed
+            with self._lock:
+                self.stages[name].add(elapsed)
+
+    # --- 캐시 / 외부 호출 -------------------------------------------------------
+    def count_cache(self, name, hit):
+        with self._lock:
+            self.cache[name][0 if hit else 1] += 1
+
+    def record_call(self, name, seconds, payload_bytes=0, error=False):
+        with self._lock:
+            self.calls[name].add(seconds)
+            self.call_bytes[name] += payload_bytes
+            if error:
+                self.call_errors[name] += 1
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    @contextmanager
+    def call(self, name):
+        """외부 호출 시간 측정. yield된 dict의 'bytes'에 응답 크기를 넣으면 같이 기록된다."""
+        info = {"bytes": 0}
+        start = time.perf_counter()
+        error = False
+        try:
+            yield info
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.record_call(name, time.perf_counter() - start, info["bytes"], error)
+
+    def cached(self, name, cache_decorator):
+        """st.cache_data / st.cache_resource 같은 데코레이터를 감싸 적중/실패를 센다.
+
+        실제 함수 본문이 실행되면 miss, 아니면 hit.
+        """
+        def deco(fn):
+            local = threading.local()
+
+            @functools.wraps(fn)
+            def body(*args, **kwargs):
+                local.miss = True
+                return fn(*args, **kwargs)
+
+            cached_fn = cache_decorator(body)
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                local.miss = False
+                result = cached_fn(*args, **kwargs)
+                self.count_cache(name, hit=not local.miss)
+                return result
+
+            wrapper.clear = getattr(cached_fn, "clear", None)
+            return wrapper
+        return deco
+
+    # --- 내보내기 ---------------------------------------------------------------
+    def snapshot(self):
+        with self._lock:
+            return {
+                "last_run": dict(self.last_run),
+                "stages": {k: {"count": s.count, "total_s": s.total, **s.quantiles()} for k, s in self.stages.items()},
+                "cache": {k: {"hit": h, "miss": m, "hit_rate": h / (h + m) if h + m else None}
+                          for k, (h, m) in self.cache.items()},
+                "calls": {k: {"count": s.count, "total_s": s.total, "bytes": self.call_bytes[k],
+                              "errors": self.call_errors[k], **s.quantiles()} for k, s in self.calls.items()},
+                "counters": dict(self.counters),
+            }
+
+    def to_prometheus(self, prefix="berlin_guide"):
+        snap = self.snapshot()
+        lines = [f"# TYPE {prefix}_stage_seconds summary"]
+        for name, s in snap["stages"].items():
+            for q, key in (("0.5", "p50"), ("0.95", "p95")):
+                if s[key] is not None:
+                    lines.append(f'{prefix}_stage_seconds{{stage="{name}",quantile="{q}"}} {s[key]:.6f}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {s["total_s"]:.6f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {s["count"]}')
+        lines.append(f"# TYPE {prefix}_cache_requests_total counter")
+        for name, c in snap["cache"].items():
+            lines.append(f'{prefix}_cache_requests_total{{cache="{name}",result="hit"}} {c["hit"]}')
+            lines.append(f'{prefix}_cache_requests_total{{cache="{name}",result="miss"}} {c["miss"]}')
+        lines.append(f"# TYPE {prefix}_external_call_seconds summary")
+        for name, c in snap["calls"].items():
+            for q, key in (("0.5", "p50"), ("0.95", "p95")):
+                if c[key] is not None:
+                    lines.append(f'{prefix}_external_call_seconds{{call="{name}",quantile="{q}"}} {c[key]:.6f}')
+            lines.append(f'{prefix}_external_call_seconds_sum{{call="{name}"}} {c["total_s"]:.6f}')
+            lines.append(f'{prefix}_external_call_seconds_count{{call="{name}"}} {c["count"]}')
+            lines.append(f'{prefix}_external_call_bytes_total{{call="{name}"}} {c["bytes"]}')
+            lines.append(f'{prefix}_external_call_errors_total{{call="{name}"}} {c["errors"]}')
+        lines.append(f"# TYPE {prefix}_events_total counter")
+        for name, n in snap["counters"].items():
+            lines.append(f'{prefix}_events_total{{event="{name}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+
+# 프로세스 공용 인스턴스
+PROFILER = Profiler()
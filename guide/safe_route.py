@@ -0,0 +1,286 @@
+# ---------------------------------------------------------
+# 안전 경로: 동네(LOR, 없으면 구) 범죄 밀도로 칠한 비용 격자 위의 A*
+# 경계 -> 격자 라벨은 디스크에 한 번만 만들고, 범죄 데이터가 바뀌면 값이 바뀐 동네의 칸만 다시 쓴다.
+# 먼 거리는 거친 격자에서 통로를 먼저 찾고 그 통로 안에서만 세밀 격자를 탐색한다.
+# ---------------------------------------------------------
+import hashlib
+import heapq
+import json
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from guide.crime_store import CACHE_ROOT
+from guide.geo_boundaries import douglas_peucker, load_raw_boundaries, simplified_boundaries
+from guide.geo_utils import M_PER_DEG_LAT, M_PER_DEG_LNG, haversine_m
+from guide.lor_index import _polygons
+
+CACHE_DIR = CACHE_ROOT / "route"
+BERLIN_BBOX = (52.33, 13.08, 52.68, 13.77)   # south, west, north, east
+CELL_M = 100
+COARSE = 8               # 거친 격자 한 칸 = 세밀 격자 8 x 8
+CORRIDOR = 1             # 거친 경로 주변 몇 칸까지 세밀 탐색을 허용할지
+DIRECT_MAX_CELLS = 6000  # 출발/도착을 감싼 창(+여유)이 이보다 작으면 바로 세밀 격자에서 찾는다
+WINDOW_MARGIN = 10       # 창 여유 [칸]
+RISK_WEIGHT = 2.0        # 가장 위험한 칸의 비용 = 거리 x (1 + RISK_WEIGHT)
+RISK_PERCENTILE = 95     # 밀도를 이 분위수로 나눠 0~1로 자른다
+MAX_ROUTES = 256
+
+# 보행자 기준 범죄 유형 가중치 (대인 범죄일수록 크다)
+TYPE_WEIGHTS = {
+    'Street_robbery': 3.0, 'Agg_assault': 3.0, 'Robbery': 2.5, 'Injury': 2.0, 'Threat': 1.5, 'Drugs': 1.0,
+    'Theft': 0.5, 'Arson': 0.3, 'Bike': 0.3, 'From_car': 0.2, 'Burglary': 0.2, 'Fire': 0.2, 'Damage': 0.2,
+    'Car': 0.1, 'Graffiti': 0.1,
+}
+
+_NEIGHBORS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+
+def rasterize(features, bbox=BERLIN_BBOX, cell_m=CELL_M):
+    """(키, 이름, geometry) 목록을 격자로 칠한다. (라벨 (H, W) int32, -1 = 바깥)과 키 목록."""
+    s, w, n, e = bbox
+    dlat, dlng = cell_m / M_PER_DEG_LAT, cell_m / M_PER_DEG_LNG
+    height, width = int(math.ceil((n - s) / dlat)), int(math.ceil((e - w) / dlng))
+    labels = np.full((height, width), -1, dtype=np.int32)
+    keys = []
+    for key, _, geom in features:
+        label = len(keys)
+        keys.append(key)
+        for poly in _polygons(geom):
+            pts = np.vstack(poly)
+            r0 = max(int((pts[:, 1].min() - s) / dlat), 0)
+            r1 = min(int((pts[:, 1].max() - s) / dlat) + 1, height)
+            c0 = max(int((pts[:, 0].min() - w) / dlng), 0)
+            c1 = min(int((pts[:, 0].max() - w) / dlng) + 1, width)
+            if r0 >= r1 or c0 >= c1:
+                continue
+            lat = s + (np.arange(r0, r1) + 0.5) * dlat
+            lng = w + (np.arange(c0, c1) + 0.5) * dlng
+            lat, lng = np.meshgrid(lat, lng, indexing='ij')
+            inside = np.zeros(lat.shape, dtype=bool)
+            for ring in poly:   # 바깥 링과 구멍을 모두 짝홀 규칙으로
+                xs, ys = ring[:, 0], ring[:, 1]
+                xj, yj = np.roll(xs, 1), np.roll(ys, 1)
+                for x0, y0, x1, y1 in zip(xs, ys, xj, yj):
+                    if y0 == y1:
+                        continue
+                    crosses = (y0 > lat) != (y1 > lat)
+                    x_int = (x1 - x0) * (lat - y0) / (y1 - y0) + x0
+                    inside ^= crosses & (lng < x_int)
+            labels[r0:r1, c0:c1][inside] = label
+    return labels, keys
+
+
+def _astar(cost, width, start, goal, allowed, cell_m):
+    """8방향 격자 A*. cost/allowed는 평탄화한 리스트/bytearray. 칸 번호 경로 (못 찾으면 None).
+
+    allowed의 가장자리 칸은 막혀 있어야 한다 (이웃 칸 번호가 다음 줄로 넘어가지 않도록).
+    """
+    gr, gc = divmod(goal, width)
+    diag = math.sqrt(2)
+    octile = (diag - 1) * cell_m
+
+    best = {start: 0.0}
+    came = {start: -1}
+    heap = [(0.0, 0.0, 0.0, start)]
+    steps = [(dr * width + dc, (diag if dr and dc else 1.0) * cell_m / 2) for dr, dc in _NEIGHBORS]
+    while heap:
+        _, _, g, i = heapq.heappop(heap)
+        if i == goal:
+            path = []
+            while i != -1:
+                path.append(i)
+                i = came[i]
+            return path[::-1]
+        if g > best[i]:
+            continue
+        ci = cost[i]
+        for di, half in steps:
+            j = i + di
+            if not allowed[j]:
+                continue
+            ng = g + (ci + cost[j]) * half
+            if ng < best.get(j, math.inf):
+                best[j] = ng
+                came[j] = i
+                r, c = divmod(j, width)
+                dr, dc = abs(r - gr), abs(c - gc)
+                h = (dr + dc) * cell_m + (octile - cell_m) * (dr if dr < dc else dc)   # 비용 배율의 최솟값은 1
+                heapq.heappush(heap, (ng + h, h, ng, j))   # f가 같으면 목표에 가까운 칸부터
+    return None
+
+
+def _open_mask(shape):
+    mask = np.zeros(shape, dtype=bool)
+    mask[1:-1, 1:-1] = True
+    return mask
+
+
+class SafetyGrid:
+    """범죄 밀도 비용 격자와 경로 탐색. 스레드 안전.
+
+    cost[r, c] = 1 + RISK_WEIGHT * risk (risk = 동네 가중 범죄 밀도 / 95분위수, 0~1, 경계 밖은 1).
+    """
+
+    def __init__(self, labels, keys, kind, bbox=BERLIN_BBOX, cell_m=CELL_M):
+        self.labels = labels
+        self.keys = keys
+        self.kind = kind
+        self.bbox = bbox
+        self.cell_m = cell_m
+        self.height, self.width = labels.shape
+        self.dlat, self.dlng = cell_m / M_PER_DEG_LAT, cell_m / M_PER_DEG_LNG
+        inside = labels >= 0
+        self.areas_km2 = np.bincount(labels[inside], minlength=len(keys)) * (cell_m / 1000) ** 2
+        self.version = None
+        self._lut = np.ones(len(keys))
+        # 경계 밖(데이터 없음)은 가장 위험한 칸으로 둔다 (도시 밖으로 돌아가는 경로를 막는다)
+        self.risk = np.where(inside, 0.0, 1.0)
+        self.cost = 1 + RISK_WEIGHT * self.risk
+        self._lock = threading.Lock()
+        self._routes = OrderedDict()
+        self._refresh()
+
+    def _refresh(self):
+        # A*는 파이썬 리스트 인덱싱이 numpy 스칼라 접근보다 훨씬 빠르다
+        self._cost_list = self.cost.ravel().tolist()
+        h, w = self.height, self.width
+        pad = np.pad(self.cost, ((0, -h % COARSE), (0, -w % COARSE)), constant_values=1 + RISK_WEIGHT)
+        self.coarse = pad.reshape(pad.shape[0] // COARSE, COARSE, pad.shape[1] // COARSE, COARSE).mean(axis=(1, 3))
+        self._coarse_list = self.coarse.ravel().tolist()
+
+    def update(self, version, values):
+        """values: 키 -> 가중 범죄 수. 값이 바뀐 키의 칸만 다시 쓴다. 바뀐 칸 수."""
+        with self._lock:
+            if version == self.version:
+                return 0
+            density = np.array([values.get(k, 0) for k in self.keys], dtype=float) / np.maximum(self.areas_km2, 1e-6)
+            scale = np.percentile(density[self.areas_km2 > 0], RISK_PERCENTILE) if len(density) else 0
+            risk = np.clip(density / scale, 0, 1) if scale > 0 else np.zeros_like(density)
+            lut = 1 + RISK_WEIGHT * risk
+            changed = np.nonzero(lut != self._lut)[0]
+            n_cells = 0
+            if len(changed):
+                mask = np.isin(self.labels, changed)
+                n_cells = int(mask.sum())
+                self.cost[mask] = lut[self.labels[mask]]
+                self.risk[mask] = risk[self.labels[mask]]
+                self._lut = lut
+                self._refresh()
+            self.version = version
+            self._routes.clear()
+            return n_cells
+
+    # --- 좌표 <-> 칸 ---
+    def cell(self, lat, lng):
+        s, w, _, _ = self.bbox
+        r = min(max(int((lat - s) / self.dlat), 1), self.height - 2)   # 가장자리 칸은 탐색에서 뺀다
+        c = min(max(int((lng - w) / self.dlng), 1), self.width - 2)
+        return r * self.width + c
+
+    def center(self, i):
+        r, c = divmod(i, self.width)
+        s, w, _, _ = self.bbox
+        return s + (r + 0.5) * self.dlat, w + (c + 0.5) * self.dlng
+
+    # --- 탐색 ---
+    def _allowed(self, start, goal):
+        """세밀 탐색을 허용할 칸. 가까우면 두 점을 감싼 창, 멀면 거친 경로 주변 통로."""
+        (r0, c0), (r1, c1) = divmod(start, self.width), divmod(goal, self.width)
+        ra, rb = max(min(r0, r1) - WINDOW_MARGIN, 0), min(max(r0, r1) + WINDOW_MARGIN + 1, self.height)
+        ca, cb = max(min(c0, c1) - WINDOW_MARGIN, 0), min(max(c0, c1) + WINDOW_MARGIN + 1, self.width)
+        mask = np.zeros((self.height, self.width), dtype=bool)
+        if (rb - ra) * (cb - ca) <= DIRECT_MAX_CELLS:
+            mask[ra:rb, ca:cb] = True
+            return bytearray((mask & _open_mask(mask.shape)).tobytes())
+        ch, cw = self.coarse.shape
+        clamp = lambda r, c: min(max(r // COARSE, 1), ch - 2) * cw + min(max(c // COARSE, 1), cw - 2)  # noqa: E731
+        coarse_path = _astar(self._coarse_list, cw, clamp(r0, c0), clamp(r1, c1),
+                             bytearray(_open_mask(self.coarse.shape).tobytes()), self.cell_m * COARSE)
+        coarse_mask = np.zeros(self.coarse.shape, dtype=bool)
+        for i in coarse_path:
+            r, c = divmod(i, cw)
+            coarse_mask[max(r - CORRIDOR, 0):r + CORRIDOR + 1, max(c - CORRIDOR, 0):c + CORRIDOR + 1] = True
+        fine = np.kron(coarse_mask, np.ones((COARSE, COARSE), dtype=bool))
+        mask[:] = fine[:self.height, :self.width]
+        return bytearray((mask & _open_mask(mask.shape)).tobytes())
+
+    def _exposure(self, cells):
+        risk = self.risk.ravel()[cells]
+        return float(risk.mean()) if len(risk) else 0.0
+
+    def _line_cells(self, a, b):
+        n = max(int(haversine_m(a[0], a[1], b[0], b[1]) / (self.cell_m / 2)), 1)
+        t = np.linspace(0, 1, n + 1)
+        return np.unique([self.cell(a[0] + (b[0] - a[0]) * x, a[1] + (b[1] - a[1]) * x) for x in t])
+
+    def route(self, a, b):
+        """a -> b (lat, lng) 가장 위험이 낮은 도보 경로.
+
+        dict(path=[(lat, lng)], length_m, risk, direct_m, direct_risk). risk는 지나는 칸의 평균 위험(0~1).
+        """
+        key = (self.version, round(a[0], 5), round(a[1], 5), round(b[0], 5), round(b[1], 5))
+        with self._lock:
+            hit = self._routes.get(key)
+            if hit is not None:
+                self._routes.move_to_end(key)
+                return hit
+        start, goal = self.cell(*a), self.cell(*b)
+        cells = _astar(self._cost_list, self.width, start, goal, self._allowed(start, goal), self.cell_m)
+        if cells is None:   # 통로가 끊긴 경우는 없지만 혹시 모르니 전체 격자에서
+            cells = _astar(self._cost_list, self.width, start, goal,
+                           bytearray(_open_mask(self.cost.shape).tobytes()), self.cell_m)
+        pts = np.array([a] + [self.center(i) for i in cells[1:-1]] + [b], dtype=float)
+        # 계단 모양을 펴서 보낸다 (허용 오차: 칸 크기의 절반)
+        simple = douglas_peucker(pts[:, ::-1], self.dlng / 2)[:, ::-1]
+        length = float(haversine_m(pts[:-1, 0], pts[:-1, 1], pts[1:, 0], pts[1:, 1]).sum())
+        result = {
+            "path": [tuple(p) for p in simple.tolist()],
+            "length_m": length,
+            "risk": self._exposure(cells),
+            "direct_m": float(haversine_m(a[0], a[1], b[0], b[1])),
+            "direct_risk": self._exposure(self._line_cells(a, b)),
+        }
+        with self._lock:
+            self._routes[key] = result
+            while len(self._routes) > MAX_ROUTES:
+                self._routes.popitem(last=False)
+        return result
+
+    def route_along(self, stops):
+        """코스 순서대로 구간마다 안전 경로. 구간 결과 목록."""
+        return [self.route((p['lat'], p['lng']), (q['lat'], q['lng'])) for p, q in zip(stops[:-1], stops[1:])]
+
+
+def _load_labels(kind, features):
+    raw = json.dumps([(k, g) for k, _, g in features], sort_keys=True, default=str)
+    sig = hashlib.sha1(f"{raw}:{BERLIN_BBOX}:{CELL_M}".encode()).hexdigest()[:16]
+    path = CACHE_DIR / f"labels_{kind}_{sig}.npz"
+    try:
+        with np.load(path, allow_pickle=False) as f:
+            return f["labels"], f["keys"].tolist()
+    except (OSError, ValueError, KeyError):
+        pass
+    labels, keys = rasterize(features)
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp.npz")
+        np.savez(tmp, labels=labels, keys=np.asarray(keys))
+        tmp.replace(path)
+    except OSError:
+        pass
+    return labels, keys
+
+
+def build_safety_grid(tolerance=0.0002, kinds=("lor", "bezirke")):
+    """LOR 경계로(없으면 구 경계로) 격자를 칠한다. 경계가 하나도 없으면 None."""
+    for kind in kinds:
+        if load_raw_boundaries(kind) is None:
+            continue
+        features = simplified_boundaries(kind, tolerance)
+        if features:
+            labels, keys = _load_labels(kind, features)
+            return SafetyGrid(labels, keys, kind)
+    return None
@@ -0,0 +1,324 @@
+# ---------------------------------------------------------
+# 앱 공용 서비스: 클라이언트/저장소/데이터는 st.cache_resource로 프로세스 전체가 공유한다
+# 무거운 SDK(googlemaps, google.generativeai, folium)는 처음 쓰일 때 불러온다.
+# ---------------------------------------------------------
+import os
+from glob import glob
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from guide.chat_engine import ChatEngine, FakeBackend, GeminiBackend
+from guide.community_store import CommunityStore
+from guide.courses import load_courses
+from guide.crime_store import PARTITION_DIR, CrimeStore, file_signature
+from guide.crime_trends import CrimeTrends
+from guide.figure_cache import FigureCache
+from guide.geo_boundaries import build_choropleth_geojson, configure_source, load_raw_boundaries
+from guide.geocoding import GeocodeStore, Geocoder
+from guide.google_scheduler import (DEFAULT_BURST, DEFAULT_DAILY_BUDGET, DEFAULT_RATE_PER_S, GoogleScheduler,
+                                    ScheduledClient, bind_session)
+from guide.http_client import SWREndpoint, get_json
+from guide.itinerary import ItineraryEngine, google_walking_backend
+from guide.lor_index import SafetyScorer, build_lor_index
+from guide.places_cache import PlacesCache, PlacesService
+from guide.poi_cluster import PoiIndex
+from guide.prefetch import HOURLY_BUDGET, Prefetcher
+from guide.profiler import PROFILER
+from guide.safe_route import TYPE_WEIGHTS, build_safety_grid
+
+CRIME_CSV = "Berlin_crimes.csv"
+CRIME_DROP_DIR = "crime_drops"   # 새 연도/정정 CSV를 여기에 넣으면 다음 rerun에 반영된다
+REC_PAGE_SIZE = 10
+REVIEW_PAGE_SIZE = 20
+
+
+# --- 외부 클라이언트 -------------------------------------------------------------
+@st.cache_resource
+def get_google_scheduler():
+    # 프로세스 전체가 하나의 토큰 버킷/대기열을 쓴다. 일일 예산은 SQLite로 프로세스끼리도 공유한다
+    return GoogleScheduler(
+        rate_per_s=float(st.secrets.get("google_rate_per_s", DEFAULT_RATE_PER_S)),
+        burst=int(st.secrets.get("google_burst", DEFAULT_BURST)),
+        daily_budget=int(st.secrets.get("google_daily_budget", DEFAULT_DAILY_BUDGET)),
+    )
+
+
+def bind_google_session():
+    """이번 실행의 Google 호출을 현재 Streamlit 세션 것으로 표시한다 (세션별 공정 대기열)."""
+    ctx = get_script_run_ctx()
+    bind_session(ctx.session_id if ctx else None)
+
+
+@st.cache_resource
+def get_gmaps_client():
+    # 모든 호출이 스케줄러(속도 제한/우선순위/예산)를 거치도록 감싸서 돌려준다
+    key = st.secrets.get("google_maps_api_key", "")
+    if not key:
+        return None
+    try:
+        import googlemaps
+        return ScheduledClient(googlemaps.Client(key=key), get_google_scheduler())
+    except Exception:
+        return None
+
+
+@st.cache_resource
+def get_chat_engine():
+    # chat_backend = "fake" 이면 API 없이 부하 테스트용 가짜 모델을 쓴다
+    if st.secrets.get("chat_backend", "gemini") == "fake":
+        return ChatEngine(FakeBackend())
+    api_key = st.secrets.get("gemini_api_key", "")
+    if not api_key: return None
+    try:
+        return ChatEngine(GeminiBackend(api_key=api_key))
+    except Exception:
+        return None
+
+
+def get_gemini_response(prompt, history=()):
+    engine = get_chat_engine()
+    if engine is None:
+        yield "API 키 확인 필요"
+        return
+    try:
+        yield from engine.respond(list(history), prompt)
+    except Exception:
+        yield "AI 응답 오류"
+
+
+# --- 헤더 지표 (TTL이 지나도 이전 값을 바로 보여주고 백그라운드에서 갱신) -------------------
+def _fetch_exchange_rate():
+    return get_json("https://api.exchangerate-api.com/v4/latest/EUR")['rates']['KRW']
+
+
+def _fetch_weather():
+    return get_json("https://api.open-meteo.com/v1/forecast?latitude=52.52&longitude=13.41&current_weather=true")['current_weather']
+
+
+@st.cache_resource
+def get_header_endpoints():
+    return {
+        "exchange_rate": SWREndpoint("exchange_rate", _fetch_exchange_rate,
+                                     st.secrets.get("exchange_rate_ttl_s", 3600), 1450.0),
+        "weather": SWREndpoint("weather", _fetch_weather, st.secrets.get("weather_ttl_s", 600),
+                               {"temperature": 15.0, "weathercode": 0}),
+    }
+
+
+def get_exchange_rate():
+    return get_header_endpoints()["exchange_rate"].get()
+
+
+def get_weather():
+    return get_header_endpoints()["weather"].get()
+
+
+# --- 장소 / 지오코딩 / 코스 ---------------------------------------------------------
+@st.cache_resource
+def get_places_service():
+    # 프로세스 전체가 공유: 세션이 달라도 같은 타일 요청은 한 번만 나간다
+    return PlacesService(get_gmaps_client(), PlacesCache())
+
+
+@st.cache_resource
+def get_prefetcher():
+    # 다음에 켤 법한 장소 타일을 미리 받아 get_places_service()의 캐시에 넣는다
+    return Prefetcher(get_places_service(), hourly_budget=int(st.secrets.get("prefetch_hourly_budget", HOURLY_BUDGET)))
+
+
+@st.cache_resource
+def get_geocoder():
+    geocoder = Geocoder(get_gmaps_client(), GeocodeStore())
+    geocoder.seed_courses(load_courses())
+    return geocoder
+
+
+def get_coordinates_google(query):
+    return get_geocoder().geocode(query)
+
+
+@PROFILER.cached("poi_index", st.cache_resource(max_entries=64))
+def get_poi_index(key, _places):
+    return PoiIndex(_places)
+
+
+@st.cache_resource
+def get_itinerary_engine():
+    # distance_backend = "google" 이면 Distance Matrix API의 실제 도보 거리를 쓴다
+    gmaps = get_gmaps_client()
+    if gmaps and st.secrets.get("distance_backend", "haversine") == "google":
+        return ItineraryEngine(google_walking_backend(gmaps))
+    return ItineraryEngine()
+
+
+# --- 범죄 데이터 -------------------------------------------------------------------
+def crime_sources():
+    """(원본 CSV, 서명) 목록. 기본 CSV + crime_drops/*.csv (이름순)."""
+    out = []
+    for csv_file in [CRIME_CSV] + sorted(glob(os.path.join(CRIME_DROP_DIR, "*.csv"))):
+        try:
+            out.append((csv_file, file_signature(csv_file)))
+        except OSError:
+            pass
+    return tuple(out)
+
+
+@st.cache_resource
+def get_crime_store():
+    # crime_store_dir로 위치 변경 가능 (벤치마크의 합성 데이터가 섞이지 않도록)
+    return CrimeStore(st.secrets.get("crime_store_dir") or PARTITION_DIR)
+
+
+@PROFILER.cached("crime_sync", st.cache_resource(max_entries=8))
+def _sync_crime_store(sources):
+    # 원본 서명이 바뀔 때만 해당 파일을 청크로 읽어 바뀐 연도의 파티션만 다시 쓴다
+    get_crime_store().sync([f for f, _ in sources])
+    return get_crime_store().version
+
+
+def get_crime_version():
+    """현재 범죄 데이터 버전. 저장소가 비어 있으면 None."""
+    store = get_crime_store()
+    try:
+        _sync_crime_store(crime_sources())
+    except Exception:
+        pass
+    return store.version if store.years else None
+
+
+def get_latest_crime_version():
+    """최신 연도 파티션의 버전. 지도처럼 최신 연도만 쓰는 캐시의 키."""
+    if get_crime_version() is None: return None
+    store = get_crime_store()
+    return store.partition_version(store.latest_year)
+
+
+@PROFILER.cached("crime_cube", st.cache_resource(max_entries=2))
+def _load_crime_cube(version):
+    # 버전이 바뀌어도 저장소는 바뀐 파티션의 집계만 새로 읽는다
+    return get_crime_store().cube()
+
+
+def get_crime_cube():
+    version = get_crime_version()
+    return _load_crime_cube(version) if version else None
+
+
+@PROFILER.cached("crime_trends", st.cache_resource(max_entries=2))
+def _load_crime_trends(version):
+    # 증감/이상치/예측은 모든 LOR x 유형 시계열을 한 번에 계산해 큐브와 같은 버전으로 둔다
+    cube = _load_crime_cube(version)
+    return CrimeTrends(cube) if cube is not None else None
+
+
+def get_crime_trends():
+    version = get_crime_version()
+    return _load_crime_trends(version) if version else None
+
+
+def load_and_process_crime_data():
+    # 최신 연도는 파티션 메타데이터에서, 합계는 그 연도 파티션의 집계에서 읽는다
+    if get_crime_version() is None: return pd.DataFrame()
+    store = get_crime_store()
+    return store.district_totals(store.latest_year).reset_index(name='Total_Crime')
+
+
+@st.cache_resource
+def _get_figure_cache():
+    return FigureCache()
+
+
+def get_figure_cache():
+    cube = get_crime_cube()
+    if cube is None: return None
+    figures = _get_figure_cache()
+    figures.update(cube)   # 새 큐브면 바뀐 연도의 기본 차트만 백그라운드에서 만든다
+    return figures
+
+
+@PROFILER.cached("crime_geojson", st.cache_data)
+def get_crime_choropleth_geojson(version, tolerance):
+    # 경계는 로컬 캐시에서, 범죄 합계는 한 번만 조인 (최신 연도 파티션 버전 x tolerance 단계별 캐시)
+    crime_df = load_and_process_crime_data()
+    if crime_df.empty: return None
+    values = dict(zip(crime_df['District'], crime_df['Total_Crime'].astype(int)))
+    return build_choropleth_geojson("bezirke", tolerance, values)
+
+
+def lor_boundaries_available():
+    # secrets의 lor_geojson_url이 있으면 data/geo/에 파일이 없을 때 거기서 한 번 받아 .cache/geo/에 둔다
+    if configure_source("lor", st.secrets.get("lor_geojson_url")) and _get_lor_index.clear:
+        _get_lor_index.clear()   # 다른 URL의 경계로 만든 인덱스는 버린다
+    return load_raw_boundaries("lor") is not None
+
+
+@PROFILER.cached("lor_index", st.cache_resource)
+def _get_lor_index():
+    return build_lor_index()
+
+
+def get_lor_index():
+    """LOR 인덱스. 경계가 아직 없으면 None (None은 캐시하지 않으므로 나중에 받으면 바로 만든다)."""
+    return _get_lor_index() if lor_boundaries_available() else None
+
+
+@PROFILER.cached("safety_scorer", st.cache_resource)
+def _get_safety_scorer(version):
+    # LOR 경계가 있을 때만 불린다 (없을 때의 None이 버전별로 캐시되지 않도록)
+    store = get_crime_store()
+    values = {int(k): int(v) for k, v in store.lor_totals(store.latest_year).items()}
+    return SafetyScorer(_get_lor_index(), values)
+
+
+def get_safety_scorer():
+    version = get_latest_crime_version()
+    if not version or get_lor_index() is None: return None
+    return _get_safety_scorer(version)
+
+
+# --- 안전 경로 ---------------------------------------------------------------------
+@PROFILER.cached("safety_grid", st.cache_resource)
+def _get_safety_grid(kinds):
+    # 경계를 격자로 칠한 라벨은 디스크에 캐시되고, 범죄 데이터가 바뀌면 비용만 다시 계산한다
+    # 격자를 못 만들면 예외로 끝내서 캐시에 남기지 않는다 (다음 실행에서 다시 시도)
+    grid = build_safety_grid(kinds=kinds)
+    if grid is None: raise RuntimeError(f"안전 격자를 만들 경계가 없습니다: {kinds}")
+    return grid
+
+
+def get_safe_router():
+    """최신 연도 범죄 밀도로 맞춘 SafetyGrid. 경계나 데이터가 없으면 None."""
+    # LOR 경계가 나중에 생기면 구 단위 격자 대신 LOR 격자를 새로 만든다
+    kinds = ("lor", "bezirke") if lor_boundaries_available() else ("bezirke",)
+    version = get_latest_crime_version()
+    if version is None or all(load_raw_boundaries(k) is None for k in kinds): return None
+    try:
+        grid = _get_safety_grid(kinds)
+    except RuntimeError:
+        return None
+    if grid.version != version:
+        store = get_crime_store()
+        if grid.kind == "lor":
+            values = {int(k): float(v) for k, v in store.lor_totals(store.latest_year, TYPE_WEIGHTS).items()}
+        else:
+            values = {str(k): float(v) for k, v in store.district_totals(store.latest_year, TYPE_WEIGHTS).items()}
+        grid.update(version, values)
+    return grid
+
+
+# --- 수다방 / 지도 레이어 -------------------------------------------------------------
+@st.cache_resource
+def get_community_store():
+    # 모든 세션이 공유하는 영구 저장소 (community_db_path로 위치 변경 가능)
+    db_path = st.secrets.get("community_db_path")
+    return CommunityStore(db_path) if db_path else CommunityStore()
+
+
+def get_layer_cache():
+    # 레이어 캐시는 세션별 (st_folium이 렌더링 중 레이어 객체를 수정하기 때문)
+    if 'map_layers' not in st.session_state:
+        from guide.map_layers import LayerCache
+        st.session_state['map_layers'] = LayerCache()
+    return st.session_state['map_layers']
@@ -0,0 +1,28 @@
+# ---------------------------------------------------------
+# 테스트 공통: guide 모듈을 불러오기 전에 캐시 위치를 임시 폴더로 돌린다 (실제 .cache/를 건드리지 않도록)
+# ---------------------------------------------------------
+import itertools
+import os
+import tempfile
+import time
+
+os.environ["BERLIN_GUIDE_CACHE_DIR"] = tempfile.mkdtemp(prefix="berlin-test-")
+
+import pandas as pd  # noqa: E402
+import pytest  # noqa: E402
+
+from guide.crime_store import CRIME_TYPES  # noqa: E402
+
+
+@pytest.fixture
+def write_crimes():
+    """write_crimes(path, [(year, district, code, value)]) -> 모든 유형이 value인 CSV (수정시각 갱신)."""
+    tick = itertools.count(1)
+
+    def write(path, rows):
+        pd.DataFrame([{"Year": y, "District": d, "Code": c, "Location": f"LOR {c}", **{t: v for t in CRIME_TYPES}}
+                      for y, d, c, v in rows]).to_csv(path, index=False)
+        mtime = time.time_ns() + next(tick) * 1_000_000   # 같은 크기로 바로 다시 써도 서명이 바뀌게
+        os.utime(path, ns=(mtime, mtime))
+        return path
+    return write
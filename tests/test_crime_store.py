@@ -0,0 +1,84 @@
+import numpy as np
+
+from guide.crime_store import CRIME_TYPES, CrimeStore, load_crime_cube
+
+N_TYPES = len(CRIME_TYPES)
+
+
+def lor(store, year):
+    # lor_totals는 모든 유형의 합: 행 값 x 유형 수
+    return {int(k): int(v) // N_TYPES for k, v in store.lor_totals(year).items()}
+
+
+def test_sync_builds_partitions_and_cube(tmp_path, write_crimes):
+    base = write_crimes(tmp_path / "base.csv", [(2012, "Mitte", 1, 2), (2012, "Pankow", 2, 3), (2013, "Mitte", 1, 4)])
+    store = CrimeStore(tmp_path / "store")
+    assert store.sync([base]) == [2012, 2013]
+    assert store.sync([base]) == []                 # 서명이 같으면 다시 읽지 않는다
+    cube = store.cube()
+    assert list(cube.years) == [2012, 2013]
+    assert cube.district_totals(2012).to_dict() == {"Mitte": 2 * N_TYPES, "Pankow": 3 * N_TYPES}
+    assert cube.yearly_totals().tolist() == [5 * N_TYPES, 4 * N_TYPES]
+    assert cube.n_rows == 3
+
+
+def test_later_source_wins_regardless_of_ingest_order(tmp_path, write_crimes):
+    base = write_crimes(tmp_path / "base.csv", [(2012, "Mitte", 1, 1), (2012, "Mitte", 2, 1)])
+    drop = write_crimes(tmp_path / "drop.csv", [(2012, "Mitte", 1, 9)])
+    store = CrimeStore(tmp_path / "store")
+    store.sync([base, drop])
+    assert lor(store, 2012) == {1: 9, 2: 1}
+    # 기본 CSV를 다시 배포(서명만 바뀜)해도 정정 행이 이긴다
+    write_crimes(base, [(2012, "Mitte", 1, 1), (2012, "Mitte", 2, 1)])
+    assert store.sync([base, drop]) == [2012]
+    assert lor(store, 2012) == {1: 9, 2: 1}
+
+
+def test_rows_removed_from_a_source_disappear(tmp_path, write_crimes):
+    base = write_crimes(tmp_path / "base.csv", [(2012, "Mitte", 1, 1), (2012, "Mitte", 2, 1), (2013, "Mitte", 1, 1)])
+    drop = write_crimes(tmp_path / "drop.csv", [(2012, "Mitte", 1, 9)])
+    store = CrimeStore(tmp_path / "store")
+    store.sync([base, drop])
+
+    write_crimes(drop, [(2013, "Mitte", 1, 5)])    # 2012 정정을 빼고 2013 정정으로
+    assert store.sync([base, drop]) == [2012, 2013]
+    assert lor(store, 2012) == {1: 1, 2: 1}          # 가려졌던 원본 행이 다시 보인다
+    assert lor(store, 2013) == {1: 5}
+
+    write_crimes(base, [(2012, "Mitte", 1, 1), (2013, "Mitte", 1, 1)])
+    store.sync([base, drop])
+    assert lor(store, 2012) == {1: 1}
+
+    store.sync([base])                              # 목록에서 빠진 원본은 지운다
+    assert lor(store, 2013) == {1: 1}
+    assert len(store.to_frame()) == 2
+
+
+def test_source_order_change_re_resolves(tmp_path, write_crimes):
+    a = write_crimes(tmp_path / "a.csv", [(2012, "Mitte", 1, 1)])
+    b = write_crimes(tmp_path / "b.csv", [(2012, "Mitte", 1, 2)])
+    store = CrimeStore(tmp_path / "store")
+    store.sync([a, b])
+    assert lor(store, 2012) == {1: 2}
+    store.sync([b, a])
+    assert lor(store, 2012) == {1: 1}
+
+
+def test_rejected_file_keeps_previous_rows(tmp_path, write_crimes):
+    base = write_crimes(tmp_path / "base.csv", [(2012, "Mitte", 1, 1)])
+    store = CrimeStore(tmp_path / "store")
+    store.sync([base])
+    base.write_text("Year,District\n2012,Mitte\n")
+    assert store.sync([base]) == []
+    assert "필수 컬럼" in store.errors[str(base)]
+    assert lor(store, 2012) == {1: 1}
+    assert store.meta["districts"] == ["Mitte"]
+
+
+def test_store_reopens_from_disk(tmp_path, write_crimes):
+    base = write_crimes(tmp_path / "base.csv", [(2012, "Mitte", 1, 1), (2014, "Pankow", 3, 2)])
+    cube = load_crime_cube(base, tmp_path / "store")
+    again = CrimeStore(tmp_path / "store")
+    assert again.sync([base]) == []
+    assert again.version == CrimeStore(tmp_path / "store").version
+    np.testing.assert_array_equal(again.cube().counts, cube.counts)
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from guide.crime_store import CRIME_TYPES, CrimeStore
+from guide.crime_trends import MIN_BASE, TOTAL, CrimeTrends, anomaly_scores, holt_forecast, yoy_change
+
+
+def test_yoy_change_skips_small_bases():
+    diff, pct = yoy_change([[MIN_BASE - 1, 100], [MIN_BASE * 3, 150]])
+    assert diff.tolist() == [[MIN_BASE * 2 + 1, 50]]
+    assert np.isnan(pct[0, 0]) and pct[0, 1] == 50
+
+
+def test_anomaly_scores_flag_a_spike():
+    series = np.array([[10, 5], [11, 5], [9, 5], [10, 5], [60, 5]], dtype=float)
+    z, robust = anomaly_scores(series)
+    assert np.argmax(robust[:, 0]) == 4 and robust[4, 0] > 3.5
+    assert not robust[:, 1].any() and not z[:, 1].any()     # 변화가 없는 시계열은 0 (0으로 나누지 않는다)
+
+
+def test_holt_forecast_follows_a_linear_trend():
+    years = np.arange(12, dtype=float)
+    up, down = 100 + 10 * years, 50 - 10 * years
+    forecast, alpha, beta = holt_forecast(np.stack([up, down], axis=1), horizon=2)
+    assert forecast.shape == (2, 2) and alpha.shape == beta.shape == (2,)
+    np.testing.assert_allclose(forecast[:, 0], [220, 230])
+    assert (forecast[:, 1] == 0).all()                       # 건수는 음수로 예측하지 않는다
+
+
+def test_crime_trends_tables(tmp_path, write_crimes):
+    rows = []
+    for i, year in enumerate(range(2015, 2021)):
+        rows += [(year, "Mitte", 1, 20), (year, "Mitte", 2, 20 + 10 * i), (year, "Pankow", 3, 5)]
+    rows[-2] = (2020, "Mitte", 2, 200)                       # 마지막 해의 급증
+    store = CrimeStore(tmp_path / "store")
+    store.sync([write_crimes(tmp_path / "crimes.csv", rows)])
+    trends = CrimeTrends(store.cube())
+
+    assert trends.latest_year == 2020 and trends.forecast_years == [2021, 2022]
+    assert trends.types[-1] == TOTAL
+    top = trends.top_changes(CRIME_TYPES[0], n=5)
+    assert top["Code"].tolist() == [2, 1]                # 기준값이 작은 LOR 3은 빠진다
+    assert top.iloc[0]["증감"] == 200 - 60
+    assert set(trends.anomalies()["동네"]) == {"LOR 2"}
+    assert trends.lor_change(CRIME_TYPES[0]) == pytest.approx({1: 0.0, 2: 140 / 60 * 100})
+    outlook = trends.district_outlook(districts=["Mitte"])
+    assert outlook["구"].tolist() == ["Mitte"] and "2021 예측" in outlook
+    assert trends.top_changes(year=2015).empty                # 전년이 없는 해
@@ -0,0 +1,82 @@
+import pytest
+
+from guide import geocoding
+from guide.geocoding import GeocodeStore, Geocoder, normalize_query
+
+
+class FakeClient:
+    """질의를 기록하고 answers에 있는 좌표만 돌려주는 gmaps 대역."""
+
+    def __init__(self, answers=None, error=None):
+        self.answers = answers or {}
+        self.error = error
+        self.queries = []
+
+    def geocode(self, query):
+        self.queries.append(query)
+        if self.error:
+            raise self.error
+        if query not in self.answers:
+            return []
+        lat, lng = self.answers[query]
+        return [{"geometry": {"location": {"lat": lat, "lng": lng}}, "formatted_address": query}]
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("Kurfürstendamm", "kurfuerstendamm"),
+    ("  Straße  des 17. Juni ", "strasse des 17 juni"),
+    ("1. 베를린 돔", "berliner dom"),
+    ("Mauerpark (마우어파크)", "mauerpark"),
+    ("Alexanderplatz, Berlin", "alexanderplatz"),
+    ("Berlin", "berlin"),
+    ("Brandenburg Gate", "brandenburger tor"),
+    ("", ""),
+])
+def test_normalize_query(query, expected):
+    assert normalize_query(query) == expected
+
+
+def test_hits_and_misses_are_cached():
+    client = FakeClient({"Alexanderplatz": (52.52, 13.41)})
+    geo = Geocoder(client, GeocodeStore(":memory:"))
+    assert geo.geocode("Alexanderplatz")[:2] == (52.52, 13.41)
+    assert geo.geocode("alexanderplatz berlin")[:2] == (52.52, 13.41)
+    assert geo.geocode("Nirgendwo 1") == (None, None, None)
+    assert geo.geocode("nirgendwo 1") == (None, None, None)
+    assert client.queries == ["Alexanderplatz", "Nirgendwo 1"]
+
+
+def test_expired_miss_is_asked_again(monkeypatch):
+    client = FakeClient()
+    geo = Geocoder(client, GeocodeStore(":memory:"))
+    geo.geocode("Nirgendwo")
+    monkeypatch.setattr(geocoding, "NEGATIVE_TTL_S", -1)
+    geo.geocode("Nirgendwo")
+    assert len(client.queries) == 2
+
+
+def test_client_errors_are_not_cached_as_misses():
+    store = GeocodeStore(":memory:")
+    assert Geocoder(FakeClient(error=RuntimeError("quota")), store).geocode("Mauerpark") == (None, None, None)
+    assert store.get("mauerpark") is None
+    client = FakeClient({"Mauerpark": (52.54, 13.40)})
+    assert Geocoder(client, store).geocode("Mauerpark")[:2] == (52.54, 13.40)
+
+
+def test_fuzzy_match_only_for_known_names():
+    store = GeocodeStore(":memory:")
+    client = FakeClient()
+    geo = Geocoder(client, store)
+    geo.seed_courses({"c": [{"name": "Fernsehturm", "lat": 52.5208, "lng": 13.4094}]})
+    assert geo.geocode("TV Tower")[:2] == (52.5208, 13.4094)        # 별칭
+    assert geo.geocode("fernsehturn")[:2] == (52.5208, 13.4094)     # 오타 근사 일치
+    store.put("torstrasse 10", 52.5, 13.4, "Torstraße 10")
+    assert store.closest("torstrasse 11") is None                    # 번지만 다른 주소는 근사 일치하지 않음
+    assert client.queries == []
+
+
+def test_seed_does_not_overwrite_fetched_coordinates():
+    store = GeocodeStore(":memory:")
+    store.put("mauerpark", 1.0, 2.0, "fetched")
+    Geocoder(None, store).seed_courses({"c": [{"name": "Mauerpark", "lat": 3.0, "lng": 4.0}]})
+    assert store.get("mauerpark") == (1.0, 2.0, "fetched")
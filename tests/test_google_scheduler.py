@@ -0,0 +1,95 @@
+import threading
+
+import pytest
+
+from guide.google_scheduler import (BUDGET_MESSAGE, PREFETCH, VISIBLE, BudgetLedger, GoogleScheduler,
+                                    ScheduledClient, request_context)
+
+
+def scheduler(**kwargs):
+    kwargs.setdefault("ledger", BudgetLedger(":memory:"))
+    kwargs.setdefault("rate_per_s", 1000.0)
+    kwargs.setdefault("burst", 100)
+    kwargs.setdefault("max_wait_s", 5.0)
+    return GoogleScheduler(**kwargs)
+
+
+def test_ledger_charges_up_to_the_limit():
+    ledger = BudgetLedger(":memory:")
+    assert [ledger.try_charge(2, day="d") for _ in range(3)] == [True, True, False]
+    assert ledger.used("d") == 2 and ledger.used("other") == 0
+
+
+def test_calls_stop_when_the_budget_is_spent():
+    s = scheduler(daily_budget=2)
+    assert s.call("geocode", "a", lambda: 1) == 1
+    assert s.call("geocode", "b", lambda: 2) == 2
+    assert s.exhausted
+    with pytest.raises(RuntimeError, match=BUDGET_MESSAGE):
+        s.call("geocode", "c", lambda: 3)
+    assert s.stats["rejected_visible"] == 1
+
+
+def test_prefetch_keeps_a_budget_reserve():
+    s = scheduler(daily_budget=10, prefetch_reserve=0.5)
+    for i in range(5):
+        s.call("places_nearby", f"k{i}", lambda: None)
+    with pytest.raises(RuntimeError):
+        s.call("places_nearby", "p", lambda: None, priority=PREFETCH)
+    assert s.call("places_nearby", "v", lambda: "ok", priority=VISIBLE) == "ok"
+
+
+def test_identical_requests_are_merged():
+    s = scheduler(workers=1)
+    gate, calls = threading.Event(), []
+
+    def slow():
+        calls.append(1)
+        gate.wait(5)
+        return "x"
+
+    first = s.submit("geocode", "same", slow)
+    second = s.submit("geocode", "same", slow)
+    gate.set()
+    assert first.result(5) == second.result(5) == "x"
+    assert len(calls) == 1 and s.stats["merged"] == 1
+
+
+def test_visible_requests_run_before_queued_prefetches():
+    s = scheduler(workers=1)
+    gate, order = threading.Event(), []
+    blocker = s.submit("geocode", "block", lambda: gate.wait(5))
+    prefetches = [s.submit("places_nearby", f"p{i}", lambda i=i: order.append(f"p{i}"), priority=PREFETCH)
+                  for i in range(3)]
+    visible = s.submit("places_nearby", "v", lambda: order.append("v"), priority=VISIBLE)
+    gate.set()
+    for f in [blocker, visible, *prefetches]:
+        f.result(5)
+    assert order[0] == "v"
+
+
+def test_sessions_take_turns_within_a_priority():
+    s = scheduler(workers=1)
+    gate, order = threading.Event(), []
+    blocker = s.submit("geocode", "block", lambda: gate.wait(5))
+    futures = []
+    for session, n in (("a", 3), ("b", 1)):
+        with request_context(session=session):
+            futures += [s.submit("geocode", f"{session}{i}", lambda k=f"{session}{i}": order.append(k)) for i in range(n)]
+    gate.set()
+    for f in [blocker, *futures]:
+        f.result(5)
+    assert order.index("b0") == 1                    # a가 3개를 먼저 넣었어도 b는 두 번째로 나간다
+
+
+def test_scheduled_client_passes_arguments_and_errors():
+    class Client:
+        def geocode(self, address):
+            if address == "bad":
+                raise ValueError("bad request")
+            return [address]
+
+    client = ScheduledClient(Client(), scheduler())
+    assert client.geocode("Mitte") == ["Mitte"]
+    with pytest.raises(ValueError):
+        client.geocode("bad")
@@ -0,0 +1,108 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from guide.itinerary import (EXACT_MAX_STOPS, DistanceMatrix, ItineraryEngine, _held_karp, _improve,
+                             _nearest_neighbor, path_cost, solve_order)
+
+
+def random_dist(n, seed):
+    rng = np.random.default_rng(seed)
+    pts = rng.uniform(0, 5000, size=(n, 2))
+    return np.linalg.norm(pts[:, None] - pts[None, :], axis=2)
+
+
+def brute_force(dist, food, start=None):
+    n = len(dist)
+    orders = (o for o in itertools.permutations(range(n)) if start is None or o[0] == start)
+    return min(path_cost(o, dist, food) for o in orders)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_held_karp_matches_brute_force(seed):
+    dist = random_dist(7, seed)
+    food = np.zeros(7, dtype=bool)
+    food[seed % 7] = True
+    order = _held_karp(dist, food)
+    assert sorted(order) == list(range(7))
+    assert path_cost(order, dist, food) == pytest.approx(brute_force(dist, food))
+    fixed = _held_karp(dist, food, start=0)
+    assert fixed[0] == 0
+    assert path_cost(fixed, dist, food) == pytest.approx(brute_force(dist, food, start=0))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_local_search_is_close_to_exact(seed):
+    n = EXACT_MAX_STOPS
+    dist = random_dist(n, 100 + seed)
+    food = np.zeros(n, dtype=bool)
+    exact = path_cost(_held_karp(dist, food), dist, food)
+    start = _nearest_neighbor(dist, 0)
+    improved = _improve(start, dist, food, fixed_start=False)
+    assert sorted(improved) == list(range(n))
+    assert exact - 1e-6 <= path_cost(improved, dist, food) <= path_cost(start, dist, food)
+    assert path_cost(improved, dist, food) <= exact * 1.15
+
+
+def test_large_course_uses_heuristic_and_keeps_start():
+    n = EXACT_MAX_STOPS + 5
+    dist = random_dist(n, 7)
+    order = solve_order(dist, np.zeros(n, dtype=bool), keep_start=True)
+    assert order[0] == 0 and sorted(order) == list(range(n))
+
+
+def test_food_stop_is_kept_out_of_the_ends():
+    # 일직선 위 5곳: 식당(0번)은 거리상 끝이지만 가운데 구간에 놓여야 한다
+    xs = np.array([0.0, 100, 200, 300, 400])
+    dist = np.abs(xs[:, None] - xs[None, :])
+    food = np.array([True, False, False, False, False])
+    order = solve_order(dist, food)
+    assert order.index(0) not in (0, len(order) - 1)
+
+
+def stops(n):
+    return [{"name": f"s{i}", "lat": 52.5 + i * 0.003, "lng": 13.4 + i * 0.002} for i in range(n)]
+
+
+class CountingBackend:
+    def __init__(self, fail=False):
+        self.elements = 0
+        self.calls = 0
+        self.fail = fail
+
+    def __call__(self, origins, destinations):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("budget")
+        self.elements += len(origins) * len(destinations)
+        return [[1000.0 + i + j for j in range(len(destinations))] for i in range(len(origins))]
+
+
+def test_distance_matrix_bills_only_missing_pairs():
+    backend = CountingBackend()
+    matrix = DistanceMatrix(backend)
+    m = matrix.matrix(stops(10))
+    assert backend.elements == 45 and len(matrix) == 45
+    np.testing.assert_array_equal(m, m.T)
+    assert np.all(np.diag(m) == 0)
+    matrix.matrix(stops(11))
+    assert backend.elements == 55                    # 새 장소 1곳 = 10쌍
+    matrix.matrix(stops(11)[::-1] + [stops(1)[0]])
+    assert backend.elements == 55                    # 순서가 바뀌거나 중복돼도 다시 묻지 않는다
+
+
+def test_distance_matrix_is_bounded_and_falls_back_to_estimate():
+    matrix = DistanceMatrix(CountingBackend(), max_pairs=20)
+    matrix.matrix(stops(12))
+    assert len(matrix) == 20
+    failing = DistanceMatrix(CountingBackend(fail=True))
+    m = failing.matrix(stops(4))
+    assert len(failing) == 0 and m[0, 1] > 0          # 실패한 쌍은 haversine 추정으로 채우고 기억하지 않는다
+
+
+def test_engine_plan_reports_legs():
+    plan = ItineraryEngine().plan(stops(6))
+    assert len(plan["legs_m"]) == 5
+    assert plan["total_m"] == pytest.approx(sum(plan["legs_m"]))
+    assert sorted(s["name"] for s in plan["stops"]) == sorted(s["name"] for s in stops(6))
@@ -0,0 +1,7 @@
+# 탭별 화면 모듈. 선택된 탭의 모듈만 불러오고 실행한다 (지도/차트 SDK도 그때 로드)
+TABS = [
+    ("🗺️ 구글 지도 탐험", "explore"),
+    ("🚩 추천 코스 (6 Themes)", "courses"),
+    ("💬 여행자 수다방", "community"),
+    ("📊 범죄 통계 분석", "stats"),
+]
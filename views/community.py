@@ -0,0 +1,120 @@
+# ---------------------------------------------------------
+# TAB 3: 수다방 & AI (추천 + 대댓글 기능 포함)
+# ---------------------------------------------------------
+import sqlite3
+
+import streamlit as st
+
+from guide.courses import load_courses
+from guide.profiler import PROFILER
+from guide.services import REC_PAGE_SIZE, REVIEW_PAGE_SIZE, get_community_store, get_gemini_response
+
+
+def _save(write, *args):
+    """수다방 쓰기. 지연/DB 오류는 경고로 보여주고 False (저장되지 않았다)."""
+    try:
+        write(*args)
+        return True
+    except (TimeoutError, sqlite3.Error) as exc:
+        st.warning(f"⚠️ 저장하지 못했습니다: {exc}")
+        return False
+
+
+def render():
+    courses = load_courses()
+    col_chat, col_ai = st.columns([1, 1])
+
+    with col_chat:
+        st.subheader("💬 장소별 리뷰")
+        input_method = st.radio("장소 선택 방식", ["목록에서 선택", "직접 입력하기"], horizontal=True, label_visibility="collapsed")
+        all_places_list = sorted(list(set([p['name'] for v in courses.values() for p in v])))
+
+        if input_method == "목록에서 선택":
+            sel_place = st.selectbox("리뷰할 장소", all_places_list)
+        else:
+            sel_place = st.text_input("장소 이름 입력")
+
+        store = get_community_store()
+        review_pages = st.session_state.setdefault('review_page', {})   # 장소 -> 리뷰 페이지
+        if sel_place:
+            with st.form("msg_form", clear_on_submit=True):
+                txt = st.text_input(f"'{sel_place}' 후기 입력")
+                if st.form_submit_button("등록") and txt and _save(store.add_review, sel_place, txt):
+                    review_pages[sel_place] = 0
+                    st.rerun()
+
+            # 최신순으로 한 페이지씩
+            total_reviews = store.count_reviews(sel_place)
+            n_review_pages = max(1, -(-total_reviews // REVIEW_PAGE_SIZE))
+            review_page = min(review_pages.get(sel_place, 0), n_review_pages - 1)
+            reviews = store.list_reviews(sel_place, review_page, REVIEW_PAGE_SIZE)
+            if reviews:
+                st.write("---")
+                for review in reviews:
+                    c1, c2 = st.columns([8, 1])
+                    c1.info(f"🗣️ {review['body']}")
+                    if c2.button("🗑️", key=f"del_review_{review['id']}") and _save(store.delete_review, review['id']):
+                        st.rerun()
+            if n_review_pages > 1:
+                r1, r2, r3 = st.columns([1, 2, 1])
+                if r1.button("◀ 최신", key="review_prev", disabled=review_page == 0):
+                    review_pages[sel_place] = review_page - 1
+                    st.rerun()
+                r2.caption(f"{review_page + 1} / {n_review_pages} 페이지 (총 {total_reviews}개)")
+                if r3.button("이전 ▶", key="review_next", disabled=review_page >= n_review_pages - 1):
+                    review_pages[sel_place] = review_page + 1
+                    st.rerun()
+
+        st.divider()
+
+        # [섹션 2] 나만의 추천 (대댓글 기능 포함)
+        st.subheader("👍 나만의 장소 추천해요")
+        with st.form("recommend_form", clear_on_submit=True):
+            rec_place = st.text_input("장소 이름")
+            rec_desc = st.text_input("이유 (한 줄)")
+            if st.form_submit_button("추천 등록") and rec_place and _save(store.add_recommendation, rec_place, rec_desc):
+                st.session_state['rec_page'] = 0
+                st.rerun()
+
+        # 한 페이지씩만 그린다
+        total_recs = store.count_recommendations()
+        n_pages = max(1, -(-total_recs // REC_PAGE_SIZE))
+        page = min(st.session_state['rec_page'], n_pages - 1)
+        for i, rec in enumerate(store.list_recommendations(page, REC_PAGE_SIZE)):
+            st.markdown(f"**{page * REC_PAGE_SIZE + i + 1}. {rec['place']}**")
+            c1, c2 = st.columns([8, 1])
+            c1.success(rec['desc'])
+
+            if c2.button("🗑️", key=f"del_rec_{rec['id']}") and _save(store.delete_recommendation, rec['id']):
+                st.rerun()
+
+            for reply in rec['replies']:
+                st.caption(f"↳ 💬 {reply}")
+
+            with st.expander("💬 댓글 달기"):
+                reply_txt = st.text_input("댓글 내용", key=f"reply_input_{rec['id']}")
+                if st.button("등록", key=f"reply_btn_{rec['id']}") and reply_txt and _save(store.add_reply, rec['id'], reply_txt):
+                    st.rerun()
+            st.write("---")
+
+        if n_pages > 1:
+            p1, p2, p3 = st.columns([1, 2, 1])
+            if p1.button("◀ 이전", disabled=page == 0):
+                st.session_state['rec_page'] = page - 1
+                st.rerun()
+            p2.caption(f"{page + 1} / {n_pages} 페이지 (총 {total_recs}개)")
+            if p3.button("다음 ▶", disabled=page >= n_pages - 1):
+                st.session_state['rec_page'] = page + 1
+                st.rerun()
+
+    with col_ai:
+        st.subheader("🤖 Gemini 가이드")
+        chat_area = st.container(height=500)
+        for msg in st.session_state['messages']:
+            chat_area.chat_message(msg['role']).write(msg['content'])
+        if prompt := st.chat_input("질문하세요..."):
+            st.session_state['messages'].append({"role": "user", "content": prompt})
+            chat_area.chat_message("user").write(prompt)
+            with chat_area.chat_message("assistant"), PROFILER.stage("gemini"):
+                resp = st.write_stream(get_gemini_response(prompt, st.session_state['messages'][:-1]))
+            st.session_state['messages'].append({"role": "assistant", "content": resp})
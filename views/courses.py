@@ -0,0 +1,89 @@
+# ---------------------------------------------------------
+# TAB 2: 추천 코스 (식당 1개, 중간 배치)
+# ---------------------------------------------------------
+import streamlit as st
+from streamlit_folium import st_folium
+
+from guide.courses import load_courses
+from guide.map_layers import base_map, build_course_layer, build_safe_route_layer
+from guide.profiler import PROFILER
+from guide.services import get_itinerary_engine, get_layer_cache, get_prefetcher, get_safe_router
+
+
+def render():
+    courses = load_courses()
+    st.subheader("🌟 테마별 추천 코스")
+    theme_names = list(courses.keys())
+    selected_theme = st.radio("테마 선택:", theme_names, horizontal=True)
+    c_data = courses[selected_theme]
+    if st.session_state.get('prefetched_theme') != selected_theme:
+        # 코스를 고르면 다음은 대개 정류장 주변 탐색: 정류장 타일의 장소를 미리 받아 둔다
+        get_prefetcher().along(c_data)
+        st.session_state['prefetched_theme'] = selected_theme
+
+    engine = get_itinerary_engine()
+    optimize_route = st.toggle("🧭 최적 동선으로 정렬 (식당은 중간 유지)", False)
+    plan = engine.plan(c_data, optimize=optimize_route)
+    route = plan['stops']
+    st.caption(f"총 {plan['total_m'] / 1000:.1f}km · 도보 약 {plan['total_min']:.0f}분")
+
+    # 안전 경로: 정류장 사이를 범죄 밀도가 낮은 쪽으로 잇는다
+    router = get_safe_router()
+    safe_route = st.toggle("🛡️ 안전 경로로 잇기 (범죄 밀도 회피)", False, disabled=router is None)
+    feature_groups = []
+    if safe_route and router is not None:
+        with PROFILER.stage("safe_route"):
+            legs = router.route_along(route)
+        feature_groups.append(get_layer_cache().get(
+            ("safe_route", router.version, selected_theme, tuple(plan['order'])),
+            lambda: build_safe_route_layer("안전 경로", legs)))
+        safe_m = sum(leg['length_m'] for leg in legs)
+        direct_m = sum(leg['direct_m'] for leg in legs)
+        risk = sum(leg['risk'] * leg['length_m'] for leg in legs) / max(safe_m, 1)
+        direct_risk = sum(leg['direct_risk'] * leg['direct_m'] for leg in legs) / max(direct_m, 1)
+        st.caption(f"🛡️ 안전 경로 {safe_m / 1000:.1f}km · 지나는 동네 위험도 {risk * 100:.0f} "
+                   f"(직선 연결 {direct_risk * 100:.0f})")
+
+    c_col1, c_col2 = st.columns([1.5, 1])
+
+    with c_col1:
+        course_layer = get_layer_cache().get(("course", selected_theme, tuple(plan['order'])),
+                                             lambda: build_course_layer(selected_theme, route))
+        st_folium(
+            base_map(13), key="course_map", width="100%", height=500,
+            center=(c_data[2]['lat'], c_data[2]['lng']), feature_group_to_add=[course_layer] + feature_groups,
+            returned_objects=[],
+        )
+
+    with c_col2:
+        st.markdown(f"### {selected_theme}")
+        st.markdown("---")
+        for item in route:
+            icon_str = "🍽️" if item['type'] == 'food' else "📸" if item['type'] == 'view' else "🚶"
+            with st.expander(f"{icon_str} {item['name']}", expanded=True):
+                st.write(f"_{item['desc']}_")
+                q = item['name'].replace(" ", "+") + "+Berlin"
+                st.markdown(f"[🔍 구글 검색 바로가기](https://www.google.com/search?q={q})")
+
+    # 나만의 코스: 추천 코스 장소 + 지도에서 불러온 장소 중 최대 30곳
+    with st.expander("🧩 나만의 코스 만들기 (최대 30곳)"):
+        candidates = {f"{p['name']} ({t})": p for t, items in courses.items() for p in items}
+        for place_type, places in st.session_state.get('explore_places', {}).items():
+            for p in places:
+                candidates[f"{p['name']} · {p['desc']}"] = {**p, "type": "food" if place_type == 'restaurant' else "view"}
+        picked = st.multiselect("방문할 장소", list(candidates), max_selections=30)
+        keep_start = st.checkbox("첫 번째로 고른 장소에서 출발", True)
+        if len(picked) >= 2:
+            custom = engine.plan([candidates[k] for k in picked], keep_start=keep_start)
+            st.caption(f"총 {custom['total_m'] / 1000:.1f}km · 도보 약 {custom['total_min']:.0f}분")
+            custom_layer = get_layer_cache().get(
+                ("custom_course", tuple(picked), keep_start),
+                lambda: build_course_layer("나만의 코스", [{"desc": p.get('desc', ''), **p} for p in custom['stops']])
+            )
+            st_folium(
+                base_map(13), key="custom_course_map", width="100%", height=450,
+                center=(custom['stops'][0]['lat'], custom['stops'][0]['lng']), feature_group_to_add=custom_layer,
+                returned_objects=[],
+            )
+            for i, (p, leg) in enumerate(zip(custom['stops'], [0.0] + custom['legs_m'])):
+                st.write(f"{i+1}. {p['name']}" + (f" — {leg:.0f}m" if i else ""))
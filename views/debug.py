@@ -0,0 +1,51 @@
+# ---------------------------------------------------------
+# 성능 패널 (사이드바, ?debug=1 또는 secrets의 show_debug_panel)
+# ---------------------------------------------------------
+import json
+
+import pandas as pd
+import streamlit as st
+
+from guide.profiler import PROFILER
+from guide.services import get_google_scheduler, get_prefetcher
+
+
+def enabled():
+    # ?debug=1 또는 secrets의 show_debug_panel = true 일 때만 성능 패널을 보여준다
+    return st.query_params.get("debug") == "1" or bool(st.secrets.get("show_debug_panel", False))
+
+
+def render():
+    snap = PROFILER.snapshot()
+    with st.sidebar.expander("⏱️ 성능 (debug)", expanded=True):
+        st.caption(f"직전 실행: {snap['last_run'].get('rerun', 0) * 1000:.0f} ms")
+        last = [{"단계": k, "ms": round(v * 1000, 1)} for k, v in snap['last_run'].items()]
+        st.dataframe(pd.DataFrame(last), hide_index=True, use_container_width=True)
+        stages = [{"단계": k, "횟수": v['count'], "p50 ms": round(v['p50'] * 1000, 1), "p95 ms": round(v['p95'] * 1000, 1)}
+                  for k, v in snap['stages'].items() if v['p50'] is not None]
+        st.dataframe(pd.DataFrame(stages), hide_index=True, use_container_width=True)
+        caches = [{"캐시": k, "hit": v['hit'], "miss": v['miss'], "적중률": f"{v['hit_rate']:.0%}" if v['hit_rate'] is not None else "-"}
+                  for k, v in snap['cache'].items()]
+        if caches:
+            st.dataframe(pd.DataFrame(caches), hide_index=True, use_container_width=True)
+        calls = [{"호출": k, "횟수": v['count'], "p50 ms": round(v['p50'] * 1000, 1), "p95 ms": round(v['p95'] * 1000, 1),
+                  "KB": round(v['bytes'] / 1024, 1), "오류": v['errors']}
+                 for k, v in snap['calls'].items() if v['p50'] is not None]
+        if calls:
+            st.dataframe(pd.DataFrame(calls), hide_index=True, use_container_width=True)
+        google = get_google_scheduler().snapshot()
+        st.caption(f"Google API {google['day']}: {google['used']}/{google['budget']}회 · "
+                   f"대기 {google['queued']['visible']}+{google['queued']['prefetch']} · 진행 {google['inflight']}")
+        waits = [{"우선순위": k, "횟수": v['count'], "대기 p50 ms": round(v['p50'] * 1000, 1),
+                  "대기 p95 ms": round(v['p95'] * 1000, 1)} for k, v in google['wait'].items() if v['p50'] is not None]
+        if waits:
+            st.dataframe(pd.DataFrame(waits), hide_index=True, use_container_width=True)
+        if google['stats']:
+            st.dataframe(pd.DataFrame([{"이벤트": k, "횟수": v} for k, v in sorted(google['stats'].items())]),
+                         hide_index=True, use_container_width=True)
+        prefetch = get_prefetcher().snapshot()
+        hit_rate = f" · 적중률 {prefetch['hit_rate']:.0%}" if prefetch['hit_rate'] is not None else ""
+        st.caption(f"미리 가져오기: 받음 {prefetch.get('fetched', 0)} · 사용 {prefetch['used']}{hit_rate}")
+        d1, d2 = st.columns(2)
+        d1.download_button("JSON", json.dumps(snap, ensure_ascii=False, indent=2), "profile.json", "application/json")
+        d2.download_button("Prometheus", PROFILER.to_prometheus(), "metrics.prom", "text/plain")
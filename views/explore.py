@@ -0,0 +1,184 @@
+# ---------------------------------------------------------
+# TAB 1: 자유 탐험 (Google Places API)
+# ---------------------------------------------------------
+import streamlit as st
+from streamlit_folium import st_folium
+
+from guide.geo_boundaries import simplified_boundaries, tolerance_for_zoom
+from guide.map_layers import (base_map, build_poi_layer, build_safe_route_layer, build_search_layer, build_value_layer,
+                               place_popup_html, places_key)
+from guide.profiler import PROFILER
+from guide.services import (get_crime_choropleth_geojson, get_crime_trends, get_crime_version, get_google_scheduler,
+                            get_latest_crime_version, get_layer_cache, get_lor_index, get_places_service, get_poi_index,
+                            get_safe_router, get_safety_scorer, load_and_process_crime_data)
+
+
+LOR_MIN_COVERAGE = 0.9   # 범죄 데이터 LOR 코드 중 경계가 있어야 하는 비율 (아래면 경고)
+
+
+def get_viewport():
+    # st_folium이 돌려준 마지막 화면 영역 (south, west, north, east). 아직 없으면 None
+    b = st.session_state.get('map_bounds')
+    try:
+        return (float(b['_southWest']['lat']), float(b['_southWest']['lng']),
+                float(b['_northEast']['lat']), float(b['_northEast']['lng']))
+    except (TypeError, KeyError, ValueError):
+        return None
+
+
+def safety_badge_html(scorer, lat, lng):
+    if scorer is None: return ""
+    score = scorer.score(lat, lng)
+    if score is None: return ""
+    return f"🛡️ 안전 점수 {score}/100<br>"
+
+
+def render(show_crime, show_lor, place_types, show_trend=False):
+    center = st.session_state['map_center']
+    layers = get_layer_cache()
+    feature_groups = []
+
+    # 검색 핀
+    if st.session_state['search_marker']:
+        sm = st.session_state['search_marker']
+        feature_groups.append(layers.get(("search", sm['lat'], sm['lng'], sm['name']), lambda: build_search_layer(sm)))
+
+    # 1. 범죄 지도
+    crime_sig = get_latest_crime_version()
+    if show_crime:
+        with PROFILER.stage("crime_data"):
+            crime_df = load_and_process_crime_data()
+            crime_geo = None
+            if not crime_df.empty:
+                tolerance = tolerance_for_zoom(st.session_state['map_zoom'])
+                crime_geo = get_crime_choropleth_geojson(crime_sig, tolerance)
+        if crime_geo:
+            feature_groups.append(layers.get(
+                ("crime", crime_sig, tolerance),
+                lambda: build_value_layer("범죄", crime_geo, "Total_Crime", ["구", "범죄 수"])
+            ))
+        else:
+            st.caption("⚠️ 구 경계 데이터를 불러오지 못해 범죄 지도를 표시하지 않습니다. (data/geo/ 확인)")
+
+    # 1-2. 동네(LOR) 범죄 밀도 / 전년 대비 증감 - 현재 화면에 걸친 LOR만 그린다
+    scorer = get_safety_scorer()
+    if show_lor or show_trend:
+        lor_index = get_lor_index()
+        if lor_index is None or scorer is None:
+            st.caption("⚠️ LOR 경계 데이터가 없어 동네 레이어를 표시하지 않습니다. "
+                       "(data/geo/berlin_lor.geojson 또는 secrets의 lor_geojson_url, README 참고)")
+        else:
+            if lor_index.coverage(scorer.values) < LOR_MIN_COVERAGE:
+                st.caption(f"⚠️ LOR 경계 코드가 범죄 데이터와 {lor_index.coverage(scorer.values):.0%}만 맞습니다. "
+                           "범죄 통계와 같은 Bezirksregion 경계인지 확인하세요.")
+            viewport = get_viewport()
+            if viewport:
+                visible = lor_index.in_viewport(*viewport)
+            else:
+                visible = lor_index.within_radius(center[0], center[1], 3000)
+            tolerance = tolerance_for_zoom(st.session_state['map_zoom'])
+
+            def lor_layer(name, values, unit, **style):
+                def build():
+                    lor_features = [
+                        {"type": "Feature", "geometry": geom, "properties": {"name": n, "value": round(values[key], 1)}}
+                        for key, n, geom in simplified_boundaries("lor", tolerance) if key in values
+                    ]
+                    return build_value_layer(name, {"type": "FeatureCollection", "features": lor_features},
+                                             "value", ["동네", unit], opacity=0.45, **style)
+                return build
+
+            # 화면에 걸친 LOR이 하나도 없으면 레이어를 만들지 않는다 (빈 GeoJSON에는 툴팁 필드가 없다)
+            if show_lor and len(visible):
+                density = lor_index.densities(scorer.values)
+                visible_keys = {lor_index.keys[i]: float(density[i]) for i in visible}
+                feature_groups.append(layers.get(("lor", crime_sig, tolerance, tuple(sorted(visible_keys))),
+                                                 lor_layer("동네 범죄 밀도", visible_keys, "건/km²")))
+            trends = get_crime_trends() if show_trend else None
+            if trends is not None:
+                change = trends.lor_change()
+                visible_change = {lor_index.keys[i]: change[lor_index.keys[i]] for i in visible if lor_index.keys[i] in change}
+            if trends is not None and visible_change:
+                feature_groups.append(layers.get(
+                    ("lor_trend", get_crime_version(), tolerance, tuple(sorted(visible_change))),
+                    lor_layer(f"전년 대비 증감 ({trends.latest_year})", visible_change, "증감률(%)",
+                              colors=('#2166ac', '#f7f7f7', '#b2182b'), value_range=(-50, 50)),
+                ))
+
+    # 2. 구글 플레이스 데이터 (켜진 타입을 병렬로 가져온다)
+    places_service = get_places_service()
+    with PROFILER.stage("places"):
+        places_by_type = places_service.nearby_many(place_types, center[0], center[1], 2000, st.session_state['places_pages'])
+    if place_types and get_google_scheduler().exhausted:
+        st.caption("⚠️ 오늘 Google API 사용 한도에 도달해 저장된(만료된 것 포함) 장소만 표시합니다.")
+    # 나만의 코스(TAB 2)가 API를 다시 부르지 않도록 받은 장소를 남겨 둔다
+    st.session_state['explore_places'] = places_by_type
+    # 화면 안의 POI만, 현재 줌에 맞게 묶어서 보낸다 (팝업은 클릭 시 아래 상세 카드로)
+    zoom = st.session_state['map_zoom']
+    viewport = get_viewport()
+    viewport_key = tuple(round(v, 3) for v in viewport) if viewport else None
+    poi_indexes, visible_clusters = {}, {}
+    for place_type in place_types:
+        places = places_by_type[place_type]
+        key = places_key(place_type, places)
+        poi_indexes[place_type] = poi = get_poi_index(key, places)
+        clusters, singles = poi.query(zoom, viewport)
+        for c in clusters:
+            visible_clusters[(round(c['lat'], 5), round(c['lng'], 5))] = c
+        feature_groups.append(layers.get(key + (zoom, viewport_key), lambda: build_poi_layer(place_type, clusters, singles)))
+
+    # 3. 안전 경로 (클릭한 장소 카드에서 요청하면 검색 위치/지도 중심 -> 장소)
+    router = get_safe_router()
+    safe_request = st.session_state.get('safe_route')
+    if safe_request and router is not None:
+        with PROFILER.stage("safe_route"):
+            leg = router.route(safe_request['from'], safe_request['to'])
+        feature_groups.append(layers.get(("safe_route", router.version, safe_request['from'], safe_request['to']),
+                                         lambda: build_safe_route_layer("안전 경로", [leg])))
+        route_col, clear_col = st.columns([4, 1])
+        route_col.caption(f"🛡️ {safe_request['name']}까지 안전 경로 {leg['length_m'] / 1000:.1f}km · "
+                          f"지나는 동네 위험도 {leg['risk'] * 100:.0f} (직선 {leg['direct_risk'] * 100:.0f})")
+        if clear_col.button("경로 지우기", key="clear_safe_route"):
+            st.session_state['safe_route'] = None
+            st.rerun()
+
+    # 기본 지도는 매번 같으므로 다시 그리지 않고, 레이어와 중심만 바뀐 것을 보낸다
+    with PROFILER.stage("st_folium"):
+        map_state = st_folium(
+            base_map(14), key="explore_map", width="100%", height=600,
+            center=tuple(center), feature_group_to_add=feature_groups,
+            returned_objects=["zoom", "bounds", "last_object_clicked"],
+        )
+    if map_state and map_state.get('zoom'):
+        st.session_state['map_zoom'] = map_state['zoom']
+    if map_state and map_state.get('bounds'):
+        st.session_state['map_bounds'] = map_state['bounds']
+
+    # 클릭한 마커의 상세 정보 (필요할 때만 만든다)
+    clicked = map_state.get('last_object_clicked') if map_state else None
+    if clicked and clicked.get('lat') is not None:
+        poi = next((p for idx in poi_indexes.values() if (p := idx.nearest(clicked['lat'], clicked['lng']))), None)
+        if poi:
+            with st.container(border=True):
+                st.markdown(place_popup_html(poi, safety_badge_html(scorer, poi['lat'], poi['lng'])) +
+                            f"<small>{poi['address']}</small>", unsafe_allow_html=True)
+                if router is not None and st.button("🛡️ 여기까지 안전 경로", key="safe_route_to_poi"):
+                    sm = st.session_state['search_marker']
+                    origin = (sm['lat'], sm['lng']) if sm else tuple(center)
+                    st.session_state['safe_route'] = {"from": origin, "to": (poi['lat'], poi['lng']), "name": poi['name']}
+                    st.rerun()
+        elif (cluster := visible_clusters.get((round(clicked['lat'], 5), round(clicked['lng'], 5)))):
+            with st.container(border=True):
+                st.markdown(f"**{cluster['count']}곳** — 지도를 확대하면 개별 장소가 보입니다.")
+                st.caption(", ".join(p['name'] for p in cluster['members'][:10]))
+
+    # 다음 페이지는 요청할 때만 불러온다
+    more_types = [t for t in place_types
+                  if places_service.has_more(t, center[0], center[1], 2000, st.session_state['places_pages'].get(t, 1))]
+    if more_types:
+        more_cols = st.columns(len(more_types))
+        labels = {'restaurant': "🍽️ 음식점", 'lodging': "🏨 숙박시설", 'tourist_attraction': "📸 관광지"}
+        for col, t in zip(more_cols, more_types):
+            if col.button(f"{labels[t]} 더 보기", key=f"more_{t}"):
+                st.session_state['places_pages'][t] = st.session_state['places_pages'].get(t, 1) + 1
+                st.rerun()
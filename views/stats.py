@@ -0,0 +1,105 @@
+# ---------------------------------------------------------
+# TAB 4: 범죄 통계 분석
+# ---------------------------------------------------------
+import os
+
+import streamlit as st
+
+from guide.profiler import PROFILER
+from guide.crime_trends import ANOMALY_Z, TOTAL
+from guide.services import CRIME_DROP_DIR, get_crime_cube, get_crime_store, get_crime_trends, get_figure_cache
+
+
+def render():
+    st.header("📊 베를린 범죄 데이터 대시보드")
+    cube = get_crime_cube()
+    figures = get_figure_cache()
+    st.caption(f"데이터 원본: Berlin_crimes.csv + {CRIME_DROP_DIR}/*.csv"
+               + (f" ({len(cube.years)}개 연도 파티션, {cube.n_rows:,}행)" if cube is not None else ""))
+    for path, reason in get_crime_store().errors.items():
+        st.warning(f"⚠️ {os.path.basename(path)} 반영 안 됨: {reason}")
+
+    if cube is not None and figures is not None and len(cube.years):
+        c_filter1, c_filter2 = st.columns(2)
+        with c_filter1:
+            years = [int(y) for y in cube.years[::-1]]
+            selected_year = st.selectbox("📅 분석 연도", years)
+        with c_filter2:
+            districts = list(cube.districts)
+            selected_districts = st.multiselect("🏙️ 구(District) 선택", districts, default=districts)
+
+        available_types = cube.crime_types
+        district_filter = selected_districts or None
+        district_sum = cube.district_totals(selected_year, available_types, district_filter)
+        type_sum = cube.type_totals(selected_year, available_types, district_filter)
+
+        st.markdown("### 📌 핵심 지표")
+        kpi1, kpi2, kpi3 = st.columns(3)
+
+        total_crimes = int(type_sum.sum())
+        most_crime_district = district_sum.idxmax()
+        most_common_crime = type_sum.idxmax()
+
+        kpi1.metric("총 범죄 발생", f"{total_crimes:,}건")
+        kpi2.metric("최다 발생 지역", most_crime_district)
+        kpi3.metric("최다 빈번 범죄", most_common_crime)
+
+        st.divider()
+
+        chart_col1, chart_col2 = st.columns(2)
+
+        # 차트는 (연도, 구 집합, 유형) 단위로 캐시된다. 연도/구를 바꾸면 조회만 한다
+        # 위 지표와 같은 큐브로 그린다 (그사이 다른 세션이 새 큐브로 바꿔도 섞이지 않는다)
+        with chart_col1, PROFILER.stage("plotly"):
+            st.subheader("🏙️ 구별 범죄 순위")
+            st.plotly_chart(figures.district_bar(selected_year, selected_districts, available_types, cube), use_container_width=True)
+
+        with chart_col2, PROFILER.stage("plotly"):
+            st.subheader("🥧 범죄 유형 비율")
+            st.plotly_chart(figures.type_pie(selected_year, selected_districts, available_types, cube), use_container_width=True)
+
+        st.subheader("📈 연도별 추이")
+        with PROFILER.stage("plotly"):
+            st.plotly_chart(figures.yearly_line(available_types, cube), use_container_width=True)
+
+        trends = get_crime_trends()
+        if trends is not None and len(trends.years) > 1:
+            render_trends(trends, selected_year, selected_districts)
+
+    else:
+        st.error("데이터 로드 실패")
+
+
+def render_trends(trends, selected_year, selected_districts):
+    # 증감/이상치/예측은 캐시된 CrimeTrends에서 표만 잘라 온다
+    st.divider()
+    st.markdown("### 🔬 추세 분석")
+    type_labels = {TOTAL: "전체"}
+    crime_type = st.selectbox("🧪 분석 유형", [TOTAL] + trends.types[:-1], format_func=lambda t: type_labels.get(t, t))
+
+    st.subheader("🏙️ 구별 전망")
+    st.dataframe(trends.district_outlook(crime_type, selected_districts or None), hide_index=True,
+                 use_container_width=True)
+
+    st.subheader(f"🏘️ 동네(LOR)별 전년 대비 증감 ({selected_year})")
+    st.caption("구 선택과 무관하게 베를린 전체 LOR 기준. 전년 값이 작은 동네는 증감률을 계산하지 않습니다.")
+    col_up, col_down = st.columns(2)
+    with col_up:
+        st.markdown("**📈 급증**")
+        st.dataframe(trends.top_changes(crime_type, selected_year), hide_index=True, use_container_width=True)
+    with col_down:
+        st.markdown("**📉 급감**")
+        st.dataframe(trends.top_changes(crime_type, selected_year, rising=False), hide_index=True,
+                     use_container_width=True)
+
+    st.subheader(f"🚨 이상치 ({selected_year})")
+    st.caption(f"동네 x 유형별 연도 시계열에서 수정 z-score(중앙값/MAD)의 절댓값이 {ANOMALY_Z} 이상인 경우")
+    anomalies = trends.anomalies(selected_year)
+    if anomalies.empty:
+        st.info("이상치가 없습니다.")
+    else:
+        st.dataframe(anomalies, hide_index=True, use_container_width=True)
+
+    st.subheader(f"🔮 {trends.forecast_years[0]}년 예측 (증가 예상 동네)")
+    st.caption("동네 x 유형 시계열 전체에 Holt 지수평활을 한 번에 적합한 결과")
+    st.dataframe(trends.forecast_table(crime_type), hide_index=True, use_container_width=True)